@@ -1,27 +1,34 @@
-from flask import Flask, render_template, request, jsonify, session, redirect
+from flask import Flask, Blueprint, render_template, request, jsonify, session, redirect, Response, stream_with_context
 from config import Config
-from extensions import mysql, bcrypt
+from extensions import (
+    db, passwords, db_pool, view_counter, search_index, similar_index, trending, response_cache,
+    user_stats, profile_cache, recipe_generator, media_store, assets, viewer_state, metrics
+)
+from db_pool import PoolTimeout
+from recipe_generator import GeneratorBusy, IncompleteRecipe
+from media import UploadError
+from passwords import HasherBusy
+import counters
+import ingredients
+from trending import category_key as trending_key
+import pagination
+import projections
+import etags
 from datetime import datetime, timedelta
 import secrets
 import json
+import logging
 import os
 from werkzeug.utils import secure_filename
-from dotenv import load_dotenv
-import openai
 
 # ===================== FLASK APP =====================
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# ===================== DATABASE / EXTENSIONS =====================
-mysql.init_app(app)
-bcrypt.init_app(app)
+# Routes, CLI commands and error handlers live on this blueprint;
+# create_app() (bottom of the file) builds an app around it
+bp = Blueprint("main", __name__, cli_group=None)
+logger = logging.getLogger("recipe_app")
 
 # ===================== OPENAI / GEMINI =====================
-load_dotenv()
-openai.api_key = os.environ.get("OPENAI_API_KEY")
-
-@app.route("/api/gemini/recipe", methods=["POST"])
+@bp.route("/api/gemini/recipe", methods=["POST"])
 def gemini_recipe():
     """
     Receives a search query from frontend,
@@ -36,73 +43,32 @@ def gemini_recipe():
         return jsonify({"success": False, "error": "No query provided"}), 400
 
     try:
-        prompt = f"""
-        Generate a complete recipe based on this query: "{query}".
-        Provide output as valid JSON with keys:
-        title (string), description (string), image_url (string), 
-        ingredients (array of strings), instructions (array of strings), 
-        category (string: breakfast/lunch/dinner/dessert/snack), 
-        difficulty (string: easy/medium/hard), servings (integer),
-        prep_time (integer in minutes), cook_time (integer in minutes).
-        
-        Example response format:
-        {{
-            "title": "Recipe Title",
-            "description": "Recipe description",
-            "image_url": "https://example.com/image.jpg",
-            "ingredients": ["ingredient 1", "ingredient 2"],
-            "instructions": ["step 1", "step 2"],
-            "category": "dinner",
-            "difficulty": "medium",
-            "servings": 4,
-            "prep_time": 15,
-            "cook_time": 30
-        }}
-        """
-
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional chef. Always respond with valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-
-        text = response.choices[0].message.content
-
-        # Extract JSON from response
-        import re
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            recipe = json.loads(json_match.group())
-        else:
-            # Try direct parsing
-            try:
-                recipe = json.loads(text)
-            except:
-                # Fallback recipe
-                recipe = {
-                    "title": f"Delicious {query}",
-                    "description": f"A tasty {query} recipe created by AI",
-                    "image_url": f"https://source.unsplash.com/600x400/?{query.replace(' ', ',')},food",
-                    "ingredients": ["Main ingredient", "Seasoning", "Spices", "Oil"],
-                    "instructions": ["Prepare ingredients", "Cook as directed", "Season to taste", "Serve hot"],
-                    "category": "dinner",
-                    "difficulty": "medium",
-                    "servings": 4,
-                    "prep_time": 15,
-                    "cook_time": 30
-                }
+        # Cached on the normalized query; identical in-flight queries share one call
+        recipe = recipe_generator.generate(query)
+        if recipe is None:
+            # Fallback recipe
+            recipe = {
+                "title": f"Delicious {query}",
+                "description": f"A tasty {query} recipe created by AI",
+                "image_url": f"https://source.unsplash.com/600x400/?{query.replace(' ', ',')},food",
+                "ingredients": ["Main ingredient", "Seasoning", "Spices", "Oil"],
+                "instructions": ["Prepare ingredients", "Cook as directed", "Season to taste", "Serve hot"],
+                "category": "dinner",
+                "difficulty": "medium",
+                "servings": 4,
+                "prep_time": 15,
+                "cook_time": 30
+            }
 
         # Add tags
         recipe["tags"] = [query.lower(), "ai-generated", "quick"]
         
         return jsonify({"success": True, **recipe})
 
-    except Exception as e:
-        print("OpenAI error:", str(e))
+    except GeneratorBusy as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception:
+        logger.exception("OpenAI error")
         # Return fallback recipe
         return jsonify({
             "success": True,
@@ -119,36 +85,92 @@ def gemini_recipe():
             "tags": [query.lower(), "simple", "easy"]
         })
 
+@bp.route("/api/gemini/recipe/stream", methods=["POST"])
+def gemini_recipe_stream():
+    """
+    Server-Sent Events variant of gemini_recipe: one "field" event per
+    recipe field as soon as it is complete in the token stream, then a
+    "done" event carrying the whole recipe (or an "error" event).
+    """
+    if not check_auth():
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
+
+    data = request.get_json()
+    query = data.get("prompt") or data.get("query")
+    if not query:
+        return jsonify({"success": False, "error": "No query provided"}), 400
+
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def events():
+        recipe = {}
+        try:
+            for field, value in recipe_generator.stream(query):
+                recipe[field] = value
+                yield sse("field", {"field": field, "value": value})
+            recipe["tags"] = [query.lower(), "ai-generated", "quick"]
+            yield sse("done", {"success": True, **recipe})
+        except GeneratorBusy as e:
+            yield sse("error", {"success": False, "error": str(e)})
+        except IncompleteRecipe as e:
+            # The fields already sent stay partial; nothing was cached
+            logger.warning("OpenAI stream incomplete: %s", e)
+            yield sse("error", {"success": False, "partial": True, "error": "Recipe generation was cut off"})
+        except Exception:
+            logger.exception("OpenAI stream error")
+            yield sse("error", {"success": False, "error": "Recipe generation failed"})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ===================== UPLOAD CONFIG =====================
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "mp4", "mov", "avi"}
-UPLOAD_FOLDER = os.path.join(app.root_path, "static", "uploads")
-IMAGE_FOLDER = os.path.join(UPLOAD_FOLDER, "images")
-VIDEO_FOLDER = os.path.join(UPLOAD_FOLDER, "videos")
-PROFILE_FOLDER = os.path.join(UPLOAD_FOLDER, "profiles")
-os.makedirs(IMAGE_FOLDER, exist_ok=True)
-os.makedirs(VIDEO_FOLDER, exist_ok=True)
-os.makedirs(PROFILE_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Upload kind -> folder under static/uploads
+UPLOAD_SUBFOLDERS = {"image": "images", "video": "videos", "profile": "profiles"}
+
+# Room for the multipart boundary and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # ===================== DATABASE HELPERS =====================
 def get_db_connection():
-    conn = mysql.connect()
+    # One pooled connection per request, shared by every helper that asks
+    conn = db_pool.connection()
     cursor = conn.cursor()
     return conn, cursor
 
 def close_db_connection(conn, cursor):
     cursor.close()
-    conn.close()
+    # Request-bound connections go back to the pool at teardown
+    if not db_pool.is_request_bound(conn):
+        db_pool.release(conn)
 
 def check_auth():
     return 'user_id' in session
 
+def profile_from_row(user):
+    return {
+        'id': user[0], 
+        'username': user[1], 
+        'email': user[2],
+        'profile_image': user[3],
+        'bio': user[4],
+        'location': user[5],
+        'website': user[6]
+    }
+
 def get_user_info():
     if not check_auth():
         return None
+    cached = profile_cache.get(session['user_id'])
+    if cached is not None:
+        return cached
     conn, cursor = get_db_connection()
     try:
         cursor.execute("""
@@ -158,36 +180,151 @@ def get_user_info():
         user = cursor.fetchone()
         
         if user:
-            return {
-                'id': user[0], 
-                'username': user[1], 
-                'email': user[2],
-                'profile_image': user[3],
-                'bio': user[4],
-                'location': user[5],
-                'website': user[6]
-            }
+            profile = profile_from_row(user)
+            profile_cache.put(user[0], profile)
+            return profile
     except Exception as e:
         print(f"Error getting user info: {e}")
     finally:
         close_db_connection(conn, cursor)
     return None
 
+RECIPE_REQUIRED_FIELDS = ['title', 'description', 'category', 'difficulty', 
+                          'prep_time', 'cook_time', 'servings']
+
+RECIPE_INSERT_SQL = """
+    INSERT INTO recipes (
+        user_id, title, description, category, difficulty,
+        prep_time, cook_time, servings, ingredients, instructions,
+        image_url, video_url, tags
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def missing_recipe_field(data):
+    for field in RECIPE_REQUIRED_FIELDS:
+        if not data.get(field):
+            return field
+    return None
+
+def recipe_insert_params(user_id, data):
+    # Ingredients and instructions are stored one per line, tags comma-joined
+    return (
+        user_id,
+        data['title'],
+        data['description'],
+        data['category'],
+        data['difficulty'],
+        data['prep_time'],
+        data['cook_time'],
+        data['servings'],
+        '\n'.join(data.get('ingredients', [])),
+        '\n'.join(data.get('instructions', [])),
+        data.get('image_url', ''),
+        data.get('video_url', ''),
+        ','.join(data.get('tags', []))
+    )
+
+# ===================== CLI =====================
+@bp.cli.command("init-db")
+def init_db_command():
+    """Create the SQLite schema (DB_BACKEND=sqlite); safe to re-run."""
+    db.bootstrap()
+    print(f"Schema ready in {db.sqlite.path}")
+
+@bp.cli.command("reconcile-counters")
+def reconcile_counters_command():
+    """Rebuild likes/favorites/comments counters from the source tables."""
+    conn = db_pool.acquire()
+    cursor = conn.cursor()
+    try:
+        counters.reconcile(cursor)
+        conn.commit()
+        print("Counters reconciled")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        db_pool.release(conn)
+
+@bp.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint and precompress static assets into static/dist."""
+    for name, hashed in assets.build().items():
+        print(f"{name} -> {hashed}")
+
+@bp.cli.command("build-similar-index")
+def build_similar_index_command():
+    """Write a fresh similar-recipes snapshot; running workers map it on their next sync."""
+    if not similar_index.available:
+        print("numpy is not installed; /api/recipes/<id>/similar uses the term tables")
+        return
+    similar_index.rebuild(wait=True)
+    similar_index.load()
+    print(f"Similar index: {len(similar_index)} recipes in {similar_index.directory}")
+
+@bp.cli.command("backfill-recipe-terms")
+def backfill_recipe_terms_command():
+    """Populate recipe_ingredients / recipe_tags from the existing text blobs."""
+    conn = db_pool.acquire()
+    cursor = conn.cursor()
+    try:
+        total = ingredients.backfill(cursor, conn.commit)
+        print(f"Backfilled ingredients and tags for {total} recipes")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        db_pool.release(conn)
+
+# ===================== CONDITIONAL GET =====================
+def recipe_etag_stamp(recipe_id):
+    """Row and counter versions behind recipe_detail, from a primary key lookup."""
+    if not check_auth():
+        return None
+    conn, cursor = get_db_connection()
+    try:
+        cursor.execute("""
+            SELECT r.updated_at, r.likes_count, r.favorites_count, r.comments_count, u.username
+            FROM recipes r
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE r.id = %s
+        """, (recipe_id,))
+        row = cursor.fetchone()
+    except Exception as e:
+        print(f"Recipe ETag error: {e}")
+        return None
+    finally:
+        close_db_connection(conn, cursor)
+    if row is None:
+        return None
+    # Views are left out on purpose: every GET counts as a view, so including
+    # them would change the ETag on every poll. A revalidated body's view
+    # count lags until something else about the recipe changes.
+    versions = response_cache.backend.tag_versions([f"recipe:{recipe_id}", f"viewer:{session['user_id']}"])
+    return tuple(row) + tuple(versions)
+
+def count_view(recipe_id):
+    # Buffered view count, flushed in batches by view_counter; also feeds trending
+    view_counter.record(recipe_id)
+    trending.record_view(recipe_id)
+
 # ===================== ROUTES =====================
-@app.route("/")
+@bp.route("/")
 def index():
     if "user_id" in session:
         return redirect("/dashboard")
     return render_template("index.html")
 
-@app.route("/dashboard")
+@bp.route("/dashboard")
 def dashboard():
     if "user_id" not in session:
         return redirect("/")
     return render_template("dashboard.html", username=session.get("username", "User"))
 
 # ===================== AUTH =====================
-@app.route("/api/register", methods=["POST"])
+@bp.route("/api/register", methods=["POST"])
 def register():
     data = request.get_json()
     username = data.get("username")
@@ -197,14 +334,15 @@ def register():
     if not username or not email or not password:
         return jsonify({"success": False, "message": "All fields are required"})
     
-    hashed_pw = bcrypt.generate_password_hash(password).decode("utf-8")
-
     conn, cursor = get_db_connection()
     try:
         cursor.execute("SELECT id FROM users WHERE email=%s", (email,))
         if cursor.fetchone():
             return jsonify({"success": False, "message": "Email already exists"})
 
+        # Hashed on the bounded hashing pool, not on this request thread
+        hashed_pw = passwords.hash(password)
+
         cursor.execute(
             "INSERT INTO users (username, email, password) VALUES (%s, %s, %s)",
             (username, email, hashed_pw)
@@ -214,8 +352,13 @@ def register():
         
         session["user_id"] = user_id
         session["username"] = username
+        profile_cache.put(user_id, profile_from_row(
+            (user_id, username, email, None, None, None, None)
+        ))
         return jsonify({"success": True})
         
+    except HasherBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 503
     except Exception as e:
         conn.rollback()
         print(f"Registration error: {e}")
@@ -223,7 +366,7 @@ def register():
     finally:
         close_db_connection(conn, cursor)
 
-@app.route("/api/login", methods=["POST"])
+@bp.route("/api/login", methods=["POST"])
 def login():
     data = request.get_json()
     email = data.get("email") or data.get("username")
@@ -234,52 +377,49 @@ def login():
 
     conn, cursor = get_db_connection()
     try:
-        cursor.execute("SELECT id, username, password FROM users WHERE email=%s", (email,))
+        cursor.execute("""
+            SELECT id, username, email, profile_image, bio, location, website, password
+            FROM users WHERE email=%s
+        """, (email,))
         user = cursor.fetchone()
         
-        if user and bcrypt.check_password_hash(user[2], password):
+        matches, new_hash = passwords.verify(user[7], password) if user else (False, None)
+        if matches:
+            if new_hash is not None:
+                # Stale bcrypt cost or legacy werkzeug hash; skip if the password changed meanwhile
+                cursor.execute(
+                    "UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                    (new_hash, user[0], user[7])
+                )
+                conn.commit()
             session["user_id"] = user[0]
             session["username"] = user[1]
+            profile_cache.put(user[0], profile_from_row(user))
             
             return jsonify({"success": True, "username": user[1]})
         return jsonify({"success": False, "message": "Invalid credentials"})
         
+    except HasherBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 503
     except Exception as e:
+        conn.rollback()
         print(f"Login error: {e}")
         return jsonify({"success": False, "message": "Login failed"})
     finally:
         close_db_connection(conn, cursor)
 
-@app.route("/api/me", methods=["GET"])
+@bp.route("/api/me", methods=["GET"])
+@etags.from_body
 def get_current_user():
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
     
     user = get_user_info()
     if user:
-        # Get user stats
+        # Get user stats (recipe count, likes received, views) in one memoized query
         conn, cursor = get_db_connection()
         try:
-            # Recipe count
-            cursor.execute("SELECT COUNT(*) FROM recipes WHERE user_id = %s", (session['user_id'],))
-            recipe_count = cursor.fetchone()[0] or 0
-            
-            # Like count (likes received on user's recipes)
-            cursor.execute("""
-                SELECT COUNT(*) FROM likes 
-                WHERE recipe_id IN (SELECT id FROM recipes WHERE user_id = %s)
-            """, (session['user_id'],))
-            like_count = cursor.fetchone()[0] or 0
-            
-            # View count
-            cursor.execute("SELECT IFNULL(SUM(views), 0) FROM recipes WHERE user_id = %s", (session['user_id'],))
-            view_count = cursor.fetchone()[0] or 0
-            
-            user.update({
-                'recipe_count': recipe_count,
-                'like_count': like_count,
-                'view_count': view_count
-            })
+            user.update(user_stats.get(cursor, session['user_id']))
         except Exception as e:
             print(f"Error getting user stats: {e}")
             user.update({
@@ -293,21 +433,23 @@ def get_current_user():
         return jsonify({"success": True, "user": user})
     return jsonify({"success": False, "message": "User not found"})
 
-@app.route("/api/check-auth")
+@bp.route("/api/check-auth")
 def check_auth_api():
     if check_auth():
-        user = get_user_info()
+        # Session marker plus the cached profile first, then MySQL
+        user = profile_cache.from_session() or get_user_info()
         if user:
             return jsonify({"is_logged_in": True, "user": user})
     return jsonify({"is_logged_in": False})
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     session.clear()
     return redirect('/')
 
 # ===================== DASHBOARD STATS =====================
-@app.route("/api/dashboard/stats", methods=["GET"])
+@bp.route("/api/dashboard/stats", methods=["GET"])
+@response_cache.cached(tags=("user:{user_id}",), per_user=True)
 def dashboard_stats():
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -315,47 +457,26 @@ def dashboard_stats():
     user_id = session["user_id"]
     conn, cursor = get_db_connection()
     try:
-        # Get total recipes
-        cursor.execute("SELECT COUNT(*) FROM recipes WHERE user_id=%s", (user_id,))
-        total_recipes = cursor.fetchone()[0] or 0
-
-        # Get total likes (likes received on user's recipes)
-        cursor.execute("""
-            SELECT COUNT(*) FROM likes 
-            WHERE recipe_id IN (SELECT id FROM recipes WHERE user_id=%s)
-        """, (user_id,))
-        total_likes = cursor.fetchone()[0] or 0
-
-        # Get total views
-        cursor.execute("SELECT IFNULL(SUM(views),0) FROM recipes WHERE user_id=%s", (user_id,))
-        total_views = cursor.fetchone()[0] or 0
+        # Totals come from the same memoized query as /api/me
+        stats = user_stats.get(cursor, user_id)
 
         # Get recent recipes
-        cursor.execute("""
-            SELECT id, title, description, image_url, 
-                   (SELECT COUNT(*) FROM likes WHERE recipe_id=recipes.id) as likes_count
-            FROM recipes 
-            WHERE user_id=%s
-            ORDER BY created_at DESC 
+        summary = projections.RECIPE_SUMMARY
+        cursor.execute(f"""
+            SELECT {summary.columns}
+            FROM recipes r
+            WHERE r.user_id=%s
+            ORDER BY r.created_at DESC 
             LIMIT 5
         """, (user_id,))
-        
-        recent_recipes = []
-        for row in cursor.fetchall():
-            recent_recipes.append({
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "image_url": row[3],
-                "likes": row[4] or 0
-            })
+        recent_recipes = [summary.serialize(row) for row in cursor.fetchall()]
 
         return jsonify({
             "success": True,
             "stats": {
-                "total_recipes": total_recipes,
-                "total_likes": total_likes,
-                "total_views": total_views
+                "total_recipes": stats["recipe_count"],
+                "total_likes": stats["like_count"],
+                "total_views": stats["view_count"]
             },
             "recent_recipes": recent_recipes
         })
@@ -374,7 +495,9 @@ def dashboard_stats():
         close_db_connection(conn, cursor)
 
 # ===================== RECIPES API =====================
-@app.route("/api/recipes", methods=["GET", "POST"])
+@bp.route("/api/recipes", methods=["GET", "POST"])
+@etags.from_body
+@response_cache.cached(tags=("recipes:all", "viewer:{user_id}"), per_user=True)
 def recipes():
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -384,14 +507,21 @@ def recipes():
         category = request.args.get('category')
         difficulty = request.args.get('difficulty')
         mine = request.args.get('mine')
+        # Repeatable, e.g. ?tag=vegan&tag=quick&ingredient=chickpeas (all must match)
+        tag_filters = [t for t in request.args.getlist('tag') if t.strip()]
+        ingredient_filters = [i for i in request.args.getlist('ingredient') if i.strip()]
+        try:
+            limit, position = pagination.page_args(request.args)
+            card = projections.RECIPE_CARD.only(request.args.get('fields'))
+        except (pagination.InvalidCursor, projections.InvalidFields) as e:
+            return jsonify({"success": False, "message": str(e)}), 400
         
         user_id = session['user_id']
         conn, cursor = get_db_connection()
         
         try:
-            query = """
-                SELECT r.*, u.username,
-                       (SELECT COUNT(*) FROM likes WHERE recipe_id=r.id) as likes_count
+            query = f"""
+                SELECT {card.columns}
                 FROM recipes r
                 LEFT JOIN users u ON r.user_id = u.id
             """
@@ -407,42 +537,22 @@ def recipes():
             if difficulty:
                 conditions.append("r.difficulty = %s")
                 params.append(difficulty)
+            ingredients.filter_conditions(conditions, params, tag_filters, ingredient_filters, "r")
+            order = pagination.apply(conditions, params, position, "r")
             
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += " ORDER BY r.created_at DESC LIMIT 50"
+            query += order
+            params.append(limit + 1)
             cursor.execute(query, tuple(params))
+            rows, next_cursor = pagination.split_page(
+                cursor.fetchall(), limit, card.index("created_at"), card.index("id")
+            )
+            recipes = [card.serialize(row) for row in rows]
+            viewer_state.attach(cursor, user_id, recipes)
             
-            recipes = []
-            for row in cursor.fetchall():
-                # Parse tags from string to list
-                tags = []
-                if row[11]:  # tags column
-                    tags = row[11].split(',')
-                
-                recipes.append({
-                    "id": row[0],
-                    "user_id": row[1],
-                    "title": row[2],
-                    "description": row[3],
-                    "category": row[4],
-                    "difficulty": row[5],
-                    "prep_time": row[6],
-                    "cook_time": row[7],
-                    "servings": row[8],
-                    "ingredients": row[9].split('\n') if row[9] else [],
-                    "instructions": row[10].split('\n') if row[10] else [],
-                    "tags": tags,
-                    "image_url": row[12],
-                    "video_url": row[13],
-                    "views": row[14] or 0,
-                    "created_at": row[15].strftime('%Y-%m-%d') if row[15] else None,
-                    "author": row[18],  # username from join
-                    "likes_count": row[19] or 0
-                })
-            
-            return jsonify({"success": True, "recipes": recipes})
+            return jsonify({"success": True, "recipes": recipes, "next_cursor": next_cursor})
             
         except Exception as e:
             print(f"Get recipes error: {e}")
@@ -454,44 +564,24 @@ def recipes():
         # Create new recipe
         data = request.get_json()
         
-        required_fields = ['title', 'description', 'category', 'difficulty', 
-                          'prep_time', 'cook_time', 'servings']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"success": False, "message": f"{field} is required"})
+        missing = missing_recipe_field(data)
+        if missing:
+            return jsonify({"success": False, "message": f"{missing} is required"})
         
         try:
             conn, cursor = get_db_connection()
             
-            # Convert ingredients and instructions to text
-            ingredients_text = '\n'.join(data.get('ingredients', []))
-            instructions_text = '\n'.join(data.get('instructions', []))
-            tags_text = ','.join(data.get('tags', []))
-            
-            cursor.execute("""
-                INSERT INTO recipes (
-                    user_id, title, description, category, difficulty,
-                    prep_time, cook_time, servings, ingredients, instructions,
-                    image_url, video_url, tags
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                session['user_id'],
-                data['title'],
-                data['description'],
-                data['category'],
-                data['difficulty'],
-                data['prep_time'],
-                data['cook_time'],
-                data['servings'],
-                ingredients_text,
-                instructions_text,
-                data.get('image_url', ''),
-                data.get('video_url', ''),
-                tags_text
-            ))
+            params = recipe_insert_params(session['user_id'], data)
+            ingredients_text, tags_text = params[8], params[12]
+            cursor.execute(RECIPE_INSERT_SQL, params)
+            recipe_id = cursor.lastrowid
+            ingredients.sync_many(cursor, [(recipe_id, ingredients_text, tags_text)], replace=False)
             
             conn.commit()
-            recipe_id = cursor.lastrowid
+            search_index.add(recipe_id, data['title'], data['description'],
+                             ingredients_text, tags_text)
+            similar_index.add(recipe_id, ingredients_text, tags_text)
+            response_cache.purge("recipes:all", f"user:{session['user_id']}")
             
             return jsonify({"success": True, "recipe_id": recipe_id})
             
@@ -502,7 +592,8 @@ def recipes():
         finally:
             close_db_connection(conn, cursor)
 
-@app.route("/api/recipes/<int:recipe_id>", methods=["GET", "PUT", "DELETE"])
+@bp.route("/api/recipes/<int:recipe_id>", methods=["GET", "PUT", "DELETE"])
+@etags.conditional(recipe_etag_stamp, on_match=count_view)
 def recipe_detail(recipe_id):
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -511,9 +602,9 @@ def recipe_detail(recipe_id):
     
     if request.method == "GET":
         try:
-            cursor.execute("""
-                SELECT r.*, u.username,
-                       (SELECT COUNT(*) FROM likes WHERE recipe_id=r.id) as likes_count
+            detail = projections.RECIPE_DETAIL.only(request.args.get('fields'))
+            cursor.execute(f"""
+                SELECT {detail.columns}
                 FROM recipes r
                 LEFT JOIN users u ON r.user_id = u.id
                 WHERE r.id = %s
@@ -523,40 +614,16 @@ def recipe_detail(recipe_id):
             if not row:
                 return jsonify({"success": False, "message": "Recipe not found"})
             
-            # Parse tags
-            tags = []
-            if row[11]:  # tags column
-                tags = row[11].split(',')
-            
-            # Increment view count
-            cursor.execute("UPDATE recipes SET views = views + 1 WHERE id = %s", (recipe_id,))
-            conn.commit()
+            count_view(recipe_id)
             
-            return jsonify({
-                "success": True,
-                "recipe": {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "title": row[2],
-                    "description": row[3],
-                    "category": row[4],
-                    "difficulty": row[5],
-                    "prep_time": row[6],
-                    "cook_time": row[7],
-                    "servings": row[8],
-                    "ingredients": row[9].split('\n') if row[9] else [],
-                    "instructions": row[10].split('\n') if row[10] else [],
-                    "tags": tags,
-                    "image_url": row[12],
-                    "video_url": row[13],
-                    "views": row[14] or 0,
-                    "created_at": row[15].strftime('%Y-%m-%d %H:%M:%S') if row[15] else None,
-                    "updated_at": row[16].strftime('%Y-%m-%d %H:%M:%S') if row[16] else None,
-                    "author": row[18],  # username
-                    "likes_count": row[19] or 0
-                }
-            })
+            recipe = detail.serialize(row)
+            viewer_state.attach(cursor, session['user_id'], [recipe])
+            if "views" in recipe:
+                recipe["views"] += view_counter.pending(recipe_id)
+            return jsonify({"success": True, "recipe": recipe})
             
+        except projections.InvalidFields as e:
+            return jsonify({"success": False, "message": str(e)}), 400
         except Exception as e:
             print(f"Get recipe detail error: {e}")
             return jsonify({"success": False, "message": "Failed to fetch recipe"})
@@ -569,7 +636,7 @@ def recipe_detail(recipe_id):
         
         try:
             # Check ownership
-            cursor.execute("SELECT user_id FROM recipes WHERE id = %s", (recipe_id,))
+            cursor.execute("SELECT user_id, category FROM recipes WHERE id = %s", (recipe_id,))
             recipe = cursor.fetchone()
             
             if not recipe or recipe[0] != session['user_id']:
@@ -611,8 +678,18 @@ def recipe_detail(recipe_id):
                 tags_text,
                 recipe_id
             ))
+            ingredients.sync_recipe(cursor, recipe_id, ingredients_text, tags_text)
+            moved = None
+            if trending_key(recipe[1]) != trending_key(data.get('category')):
+                moved = trending.recategorized(cursor, recipe_id, data.get('category'))
             
             conn.commit()
+            search_index.add(recipe_id, data.get('title'), data.get('description'),
+                             ingredients_text, tags_text)
+            similar_index.add(recipe_id, ingredients_text, tags_text)
+            if moved:
+                trending.apply(moved)
+            response_cache.purge("recipes:all", f"recipe:{recipe_id}", f"user:{session['user_id']}")
             return jsonify({"success": True, "message": "Recipe updated"})
             
         except Exception as e:
@@ -631,8 +708,15 @@ def recipe_detail(recipe_id):
             if not recipe or recipe[0] != session['user_id']:
                 return jsonify({"success": False, "message": "Not authorized"})
             
+            counters.recipe_deleted(cursor, recipe_id)
+            # recipe_ingredients / recipe_tags rows go with it (ON DELETE CASCADE)
             cursor.execute("DELETE FROM recipes WHERE id = %s", (recipe_id,))
+            event = trending.deleted(cursor, recipe_id)
             conn.commit()
+            search_index.remove(recipe_id)
+            similar_index.remove(recipe_id)
+            trending.apply(event)
+            response_cache.purge("recipes:all", f"recipe:{recipe_id}", f"user:{session['user_id']}")
             
             return jsonify({"success": True, "message": "Recipe deleted"})
             
@@ -643,51 +727,401 @@ def recipe_detail(recipe_id):
         finally:
             close_db_connection(conn, cursor)
 
+# ===================== BULK IMPORT / EXPORT =====================
+BULK_CHUNK_SIZE = 500
+
+# Per-row failures by DB-API exception class (same names in pymysql and
+# sqlite3); driver messages are logged, never sent back
+BULK_INVALID_VALUE = "Invalid field value"
+BULK_ERROR_MESSAGES = {
+    "IntegrityError": "Duplicate or conflicting recipe",
+    "DataError": BULK_INVALID_VALUE,
+}
+BULK_DB_ERROR = "Database error"
+
+def bulk_error_message(error):
+    for cls in type(error).__mro__:
+        if cls.__name__ in BULK_ERROR_MESSAGES:
+            return BULK_ERROR_MESSAGES[cls.__name__]
+    return BULK_DB_ERROR
+
+def iter_bulk_records():
+    """(line number, record or parse error) from an NDJSON or JSON array body."""
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        # Read line by line so the body is never held in memory as a whole
+        for number, line in enumerate(request.stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            yield 0, ValueError("Body must be a JSON array or NDJSON")
+            return
+        for number, record in enumerate(records, start=1):
+            yield number, record
+
+@bp.route("/api/recipes/bulk", methods=["POST"])
+def bulk_import_recipes():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    user_id = session['user_id']
+    errors = []
+    inserted = 0
+    conn, cursor = get_db_connection()
+    
+    def terms(recipe_id, params):
+        return (recipe_id, params[8], params[12])
+    
+    def flush(chunk):
+        try:
+            # One INSERT per row, so every recipe gets its own lastrowid:
+            # executemany() may split a large batch into several statements,
+            # and then ids can no longer be derived from the first one.
+            # The whole chunk still commits as one transaction.
+            recipe_terms = []
+            for _, params in chunk:
+                cursor.execute(RECIPE_INSERT_SQL, params)
+                recipe_terms.append(terms(cursor.lastrowid, params))
+            ingredients.sync_many(cursor, recipe_terms, replace=False)
+            conn.commit()
+            return len(chunk)
+        except Exception:
+            conn.rollback()
+        # Retry the failed chunk row by row to find the offending records
+        count = 0
+        for number, params in chunk:
+            try:
+                cursor.execute(RECIPE_INSERT_SQL, params)
+                ingredients.sync_many(cursor, [terms(cursor.lastrowid, params)], replace=False)
+                conn.commit()
+                count += 1
+            except Exception as e:
+                conn.rollback()
+                logger.warning("Bulk import line %d failed", number, exc_info=True)
+                errors.append({"line": number, "message": bulk_error_message(e)})
+        return count
+    
+    try:
+        chunk = []
+        for number, record in iter_bulk_records():
+            if isinstance(record, Exception):
+                errors.append({"line": number, "message": f"Invalid JSON: {record}"})
+                continue
+            if not isinstance(record, dict):
+                errors.append({"line": number, "message": "Record must be an object"})
+                continue
+            missing = missing_recipe_field(record)
+            if missing:
+                errors.append({"line": number, "message": f"{missing} is required"})
+                continue
+            try:
+                params = recipe_insert_params(user_id, record)
+                # Lists and objects only belong in the joined text fields
+                if any(isinstance(value, (dict, list)) for value in params):
+                    raise ValueError("nested value")
+            except (TypeError, ValueError):
+                errors.append({"line": number, "message": BULK_INVALID_VALUE})
+                continue
+            chunk.append((number, params))
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                inserted += flush(chunk)
+                chunk = []
+        if chunk:
+            inserted += flush(chunk)
+    finally:
+        close_db_connection(conn, cursor)
+    
+    errors.sort(key=lambda error: error["line"])
+    if inserted:
+        # New rows reach the search and similar indexes through their periodic delta sync
+        response_cache.purge("recipes:all", f"user:{user_id}")
+    return jsonify({
+        "success": not errors,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors
+    })
+
+@bp.route("/api/recipes/export", methods=["GET"])
+def export_recipes():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    mine = request.args.get('mine') == '1'
+    user_id = session['user_id']
+    
+    def generate():
+        # Dedicated connection with an unbuffered cursor: rows are streamed
+        # from the database as they are written out, so memory stays flat
+        conn = db_pool.acquire()
+        cursor = db.streaming_cursor(conn)
+        finished = False
+        try:
+            export = projections.RECIPE_EXPORT
+            query = f"SELECT {export.columns} FROM recipes r LEFT JOIN users u ON r.user_id = u.id"
+            if mine:
+                cursor.execute(query + " WHERE r.user_id = %s ORDER BY r.id", (user_id,))
+            else:
+                cursor.execute(query + " ORDER BY r.id")
+            for row in cursor:
+                yield json.dumps(export.serialize(row)) + "\n"
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            # An abandoned unbuffered result cannot be drained cheaply, so drop the connection
+            db_pool.release(conn, discard=not finished)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=recipes.ndjson"}
+    )
+
+# ===================== MEDIA UPLOADS =====================
+@bp.route("/api/uploads/<kind>", methods=["POST"])
+def upload_media(kind):
+    """
+    Raw body with ?filename= (or an X-Filename header) is streamed straight
+    to disk; a multipart "file" field is accepted too, for plain forms.
+    """
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    try:
+        if request.mimetype == "multipart/form-data":
+            # Reject oversized bodies before the form parser reads them
+            if request.content_length is not None:
+                media_store.check_size(kind, request.content_length - MULTIPART_OVERHEAD)
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({"success": False, "message": "No file uploaded"}), 400
+            filename, stream, length = upload.filename, upload.stream, None
+        else:
+            filename = request.args.get('filename') or request.headers.get('X-Filename', '')
+            stream, length = request.stream, request.content_length
+        
+        filename = secure_filename(filename or '')
+        if not filename or not allowed_file(filename):
+            return jsonify({"success": False, "message": "File type not allowed"}), 400
+        
+        result = media_store.save(kind, filename, stream, length)
+        return jsonify({"success": True, **result})
+    except UploadError as e:
+        return jsonify({"success": False, "message": str(e)}), e.status
+    except Exception as e:
+        print(f"Upload error: {e}")
+        return jsonify({"success": False, "message": "Upload failed"}), 500
+
+# ===================== SEARCH =====================
+@bp.route("/api/search", methods=["GET"])
+def search_recipes():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    search_index.ensure_started()
+    if not search_index.ready:
+        return jsonify({"success": False, "message": "Search index is warming up"}), 503
+    
+    query = request.args.get('q', '')
+    try:
+        limit, _ = pagination.page_args({"limit": request.args.get('limit')}, default=20)
+        hits, next_cursor = search_index.search(query, limit, request.args.get('cursor'))
+    except pagination.InvalidCursor as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if not hits:
+        return jsonify({"success": True, "results": [], "next_cursor": None})
+    
+    conn, cursor = get_db_connection()
+    try:
+        ids = [recipe_id for recipe_id, _ in hits]
+        result = projections.SEARCH_RESULT
+        cursor.execute(f"""
+            SELECT {result.columns}
+            FROM recipes r
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE r.id IN ({", ".join(["%s"] * len(ids))})
+        """, tuple(ids))
+        rows = {row[result.index("id")]: row for row in cursor.fetchall()}
+        
+        results = []
+        for recipe_id, score in hits:
+            row = rows.get(recipe_id)
+            if row is None:
+                # Deleted by another worker since our last sync
+                search_index.remove(recipe_id)
+                continue
+            item = result.serialize(row)
+            item["score"] = round(score, 4)
+            results.append(item)
+        viewer_state.attach(cursor, session['user_id'], results)
+        
+        return jsonify({"success": True, "results": results, "next_cursor": next_cursor})
+    except Exception as e:
+        print(f"Search error: {e}")
+        return jsonify({"success": False, "message": "Search failed"})
+    finally:
+        close_db_connection(conn, cursor)
+
+# ===================== SIMILAR RECIPES =====================
+@bp.route("/api/recipes/<int:recipe_id>/similar", methods=["GET"])
+def similar_recipes(recipe_id):
+    """Recipes sharing the most ingredients and tags, from the MinHash index."""
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    limit, _ = pagination.page_args({"limit": request.args.get('limit')}, default=10, maximum=50)
+    conn, cursor = get_db_connection()
+    try:
+        cursor.execute("SELECT ingredients, tags FROM recipes WHERE id = %s", (recipe_id,))
+        recipe = cursor.fetchone()
+        if not recipe:
+            return jsonify({"success": False, "message": "Recipe not found"})
+        
+        similar_index.ensure_started()
+        if similar_index.ready:
+            # Signature from the row just read, so edits not yet synced still count
+            hits = similar_index.similar(recipe_id, recipe[0], recipe[1], limit)
+            source = "minhash"
+        else:
+            # No numpy, or the first snapshot is still being built
+            hits = ingredients.similar_by_terms(cursor, recipe_id, limit)
+            source = "terms"
+        if not hits:
+            return jsonify({"success": True, "recipes": [], "source": source})
+        
+        ids = [hit_id for hit_id, _ in hits]
+        result = projections.SEARCH_RESULT
+        cursor.execute(f"""
+            SELECT {result.columns}
+            FROM recipes r
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE r.id IN ({", ".join(["%s"] * len(ids))})
+        """, tuple(ids))
+        rows = {row[result.index("id")]: row for row in cursor.fetchall()}
+        
+        recipes = []
+        for hit_id, similarity in hits:
+            row = rows.get(hit_id)
+            if row is None:
+                # Deleted by another worker since our last sync
+                similar_index.remove(hit_id)
+                continue
+            item = result.serialize(row)
+            item["similarity"] = round(similarity, 4)
+            recipes.append(item)
+        viewer_state.attach(cursor, session['user_id'], recipes)
+        
+        return jsonify({"success": True, "recipes": recipes, "source": source})
+    except Exception as e:
+        print(f"Similar recipes error: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch similar recipes"})
+    finally:
+        close_db_connection(conn, cursor)
+
+# ===================== TRENDING =====================
+@bp.route("/api/trending", methods=["GET"])
+def trending_recipes():
+    """Most engaged-with recipes lately, overall or in ?category=, from the in-memory board."""
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    limit, _ = pagination.page_args({"limit": request.args.get('limit')}, default=10, maximum=50)
+    category = request.args.get('category') or None
+    conn, cursor = get_db_connection()
+    try:
+        trending.ensure_started()
+        if trending.ready:
+            hits = trending.top(category, limit)
+            source = "trending"
+        else:
+            # The first snapshot is still loading: newest recipes, off the created_at indexes
+            conditions = []
+            params = []
+            if category:
+                conditions.append("r.category = %s")
+                params.append(category)
+            params.append(limit)
+            cursor.execute(f"""
+                SELECT r.id FROM recipes r
+                {"WHERE " + " AND ".join(conditions) if conditions else ""}
+                ORDER BY r.created_at DESC, r.id DESC LIMIT %s
+            """, tuple(params))
+            hits = [(row[0], None) for row in cursor.fetchall()]
+            source = "latest"
+        if not hits:
+            return jsonify({"success": True, "recipes": [], "source": source})
+        
+        ids = [hit_id for hit_id, _ in hits]
+        result = projections.SEARCH_RESULT
+        cursor.execute(f"""
+            SELECT {result.columns}
+            FROM recipes r
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE r.id IN ({", ".join(["%s"] * len(ids))})
+        """, tuple(ids))
+        rows = {row[result.index("id")]: row for row in cursor.fetchall()}
+        
+        recipes = []
+        for hit_id, score in hits:
+            row = rows.get(hit_id)
+            if row is None:
+                # Deleted by another worker since our last sync
+                trending.discard(hit_id)
+                continue
+            item = result.serialize(row)
+            item["trending_score"] = None if score is None else round(score, 3)
+            recipes.append(item)
+        viewer_state.attach(cursor, session['user_id'], recipes)
+        
+        return jsonify({"success": True, "recipes": recipes, "source": source})
+    except Exception as e:
+        print(f"Trending recipes error: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch trending recipes"})
+    finally:
+        close_db_connection(conn, cursor)
+
 # ===================== CATEGORIES =====================
-@app.route("/api/categories", methods=["GET"])
+@bp.route("/api/categories", methods=["GET"])
+@etags.from_body
+@response_cache.cached(tags=("recipes:all",))
 def get_categories():
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
     
     conn, cursor = get_db_connection()
     try:
-        cursor.execute("""
-            SELECT DISTINCT category, COUNT(*) as count 
-            FROM recipes 
-            GROUP BY category 
-            ORDER BY count DESC
+        counts = projections.CATEGORY_COUNT
+        cursor.execute(f"""
+            SELECT {counts.columns}
+            FROM recipes r
+            GROUP BY r.category 
+            ORDER BY COUNT(*) DESC
         """)
+        categories = [counts.serialize(row) for row in cursor.fetchall()]
         
-        categories = []
-        for row in cursor.fetchall():
-            categories.append({
-                "category": row[0],
-                "count": row[1]
-            })
-        
-        # Get some recipes from each category
-        cursor.execute("""
-            SELECT r.id, r.title, r.description, r.image_url, r.category,
-                   (SELECT COUNT(*) FROM likes WHERE recipe_id=r.id) as likes_count
+        # Get some recipes from each category, plus the top of the trending board
+        showcase = [hit_id for hit_id, _ in trending.top(limit=5)]
+        showcase_filter = ""
+        if showcase:
+            showcase_filter = f"OR r.id IN ({', '.join(['%s'] * len(showcase))})"
+        sample = projections.CATEGORY_SAMPLE
+        cursor.execute(f"""
+            SELECT {sample.columns}
             FROM recipes r
             WHERE r.id IN (
                 SELECT MIN(id) FROM recipes GROUP BY category
-            ) OR r.id IN (
-                SELECT id FROM recipes ORDER BY RAND() LIMIT 5
-            )
+            ) {showcase_filter}
             LIMIT 10
-        """)
+        """, tuple(showcase) or None)
         
-        recipes = []
-        for row in cursor.fetchall():
-            recipes.append({
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "image_url": row[3],
-                "category": row[4],
-                "likes_count": row[5] or 0
-            })
+        recipes = [sample.serialize(row) for row in cursor.fetchall()]
         
         return jsonify({"success": True, "categories": categories, "recipes": recipes})
     except Exception as e:
@@ -705,7 +1139,7 @@ def get_categories():
         close_db_connection(conn, cursor)
 
 # ===================== PROFILE =====================
-@app.route("/api/profile", methods=["PUT"])
+@bp.route("/api/profile", methods=["PUT"])
 def update_profile():
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -736,6 +1170,18 @@ def update_profile():
         
         conn.commit()
         session['username'] = data.get('username')
+        # Author names appear in every recipe list
+        response_cache.purge(f"user:{session['user_id']}", "recipes:all")
+        profile_cache.invalidate(session['user_id'])
+        profile_cache.put(session['user_id'], profile_from_row((
+            session['user_id'],
+            data.get('username'),
+            data.get('email'),
+            data.get('profile_image', ''),
+            data.get('bio', ''),
+            data.get('location', ''),
+            data.get('website', '')
+        )))
         
         return jsonify({"success": True, "message": "Profile updated"})
     except Exception as e:
@@ -746,7 +1192,7 @@ def update_profile():
         close_db_connection(conn, cursor)
 
 # ===================== LIKES =====================
-@app.route("/api/recipes/<int:recipe_id>/like", methods=["POST", "DELETE"])
+@bp.route("/api/recipes/<int:recipe_id>/like", methods=["POST", "DELETE"])
 def like_recipe(recipe_id):
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -756,20 +1202,38 @@ def like_recipe(recipe_id):
     
     try:
         if request.method == "POST":
-            # Add like
+            # Add like (counters move only when a row was really inserted)
             cursor.execute("""
-                INSERT INTO likes (recipe_id, user_id) 
+                INSERT IGNORE INTO likes (recipe_id, user_id) 
                 VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE id=id
             """, (recipe_id, user_id))
+            changed = cursor.rowcount == 1
+            if changed:
+                owner_id = counters.adjust(cursor, "likes", recipe_id, 1)
+                event = trending.record(cursor, recipe_id, "like")
             conn.commit()
+            if changed:
+                trending.apply(event)
+                viewer_state.record(user_id, "likes", recipe_id, True)
+                response_cache.purge("recipes:all", f"recipe:{recipe_id}", f"user:{owner_id}")
             return jsonify({"success": True, "message": "Recipe liked"})
         
         elif request.method == "DELETE":
-            # Remove like
+            # Remove like; trending takes it back as of when it was given
+            cursor.execute("SELECT created_at FROM likes WHERE recipe_id = %s AND user_id = %s",
+                          (recipe_id, user_id))
+            liked = cursor.fetchone()
             cursor.execute("DELETE FROM likes WHERE recipe_id = %s AND user_id = %s", 
                           (recipe_id, user_id))
+            changed = cursor.rowcount == 1 and liked is not None
+            if changed:
+                owner_id = counters.adjust(cursor, "likes", recipe_id, -1)
+                event = trending.record(cursor, recipe_id, "like", undo_of=liked[0])
             conn.commit()
+            if changed:
+                trending.apply(event)
+                viewer_state.record(user_id, "likes", recipe_id, False)
+                response_cache.purge("recipes:all", f"recipe:{recipe_id}", f"user:{owner_id}")
             return jsonify({"success": True, "message": "Like removed"})
             
     except Exception as e:
@@ -780,7 +1244,7 @@ def like_recipe(recipe_id):
         close_db_connection(conn, cursor)
 
 # ===================== FAVORITES =====================
-@app.route("/api/recipes/<int:recipe_id>/favorite", methods=["POST", "DELETE"])
+@bp.route("/api/recipes/<int:recipe_id>/favorite", methods=["POST", "DELETE"])
 def favorite_recipe(recipe_id):
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -790,20 +1254,38 @@ def favorite_recipe(recipe_id):
     
     try:
         if request.method == "POST":
-            # Add to favorites
+            # Add to favorites (counters move only when a row was really inserted)
             cursor.execute("""
-                INSERT INTO favorites (recipe_id, user_id) 
+                INSERT IGNORE INTO favorites (recipe_id, user_id) 
                 VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE id=id
             """, (recipe_id, user_id))
+            changed = cursor.rowcount == 1
+            if changed:
+                counters.adjust(cursor, "favorites", recipe_id, 1)
+                event = trending.record(cursor, recipe_id, "favorite")
             conn.commit()
+            if changed:
+                trending.apply(event)
+                viewer_state.record(user_id, "favorites", recipe_id, True)
+                response_cache.purge("recipes:all", f"recipe:{recipe_id}")
             return jsonify({"success": True, "message": "Added to favorites"})
         
         elif request.method == "DELETE":
-            # Remove from favorites
+            # Remove from favorites; trending takes it back as of when it was added
+            cursor.execute("SELECT created_at FROM favorites WHERE recipe_id = %s AND user_id = %s",
+                          (recipe_id, user_id))
+            favorited = cursor.fetchone()
             cursor.execute("DELETE FROM favorites WHERE recipe_id = %s AND user_id = %s", 
                           (recipe_id, user_id))
+            changed = cursor.rowcount == 1 and favorited is not None
+            if changed:
+                counters.adjust(cursor, "favorites", recipe_id, -1)
+                event = trending.record(cursor, recipe_id, "favorite", undo_of=favorited[0])
             conn.commit()
+            if changed:
+                trending.apply(event)
+                viewer_state.record(user_id, "favorites", recipe_id, False)
+                response_cache.purge("recipes:all", f"recipe:{recipe_id}")
             return jsonify({"success": True, "message": "Removed from favorites"})
             
     except Exception as e:
@@ -813,8 +1295,48 @@ def favorite_recipe(recipe_id):
     finally:
         close_db_connection(conn, cursor)
 
+@bp.route("/api/favorites", methods=["GET"])
+def list_favorites():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    
+    try:
+        limit, position = pagination.page_args(request.args)
+        card = projections.RECIPE_CARD.only(request.args.get('fields'))
+    except (pagination.InvalidCursor, projections.InvalidFields) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    user_id = session['user_id']
+    conn, cursor = get_db_connection()
+    try:
+        # Favorites, recipe cards and authors in one query
+        conditions = ["f.user_id = %s"]
+        params = [user_id]
+        order = pagination.apply(conditions, params, position, "r")
+        params.append(limit + 1)
+        cursor.execute(f"""
+            SELECT {card.columns}
+            FROM favorites f
+            JOIN recipes r ON r.id = f.recipe_id
+            LEFT JOIN users u ON r.user_id = u.id
+            WHERE {" AND ".join(conditions)}
+            {order}
+        """, tuple(params))
+        rows, next_cursor = pagination.split_page(
+            cursor.fetchall(), limit, card.index("created_at"), card.index("id")
+        )
+        recipes = [card.serialize(row) for row in rows]
+        viewer_state.attach(cursor, user_id, recipes)
+        
+        return jsonify({"success": True, "recipes": recipes, "next_cursor": next_cursor})
+    except Exception as e:
+        print(f"Get favorites error: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch favorites"})
+    finally:
+        close_db_connection(conn, cursor)
+
 # ===================== COMMENTS =====================
-@app.route("/api/recipes/<int:recipe_id>/comments", methods=["GET", "POST"])
+@bp.route("/api/recipes/<int:recipe_id>/comments", methods=["GET", "POST"])
 def recipe_comments(recipe_id):
     if not check_auth():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
@@ -823,17 +1345,26 @@ def recipe_comments(recipe_id):
     
     try:
         if request.method == "GET":
-            # Get comments for recipe
-            cursor.execute("""
+            # Get comments for recipe, one page at a time
+            try:
+                limit, position = pagination.page_args(request.args)
+            except pagination.InvalidCursor as e:
+                return jsonify({"success": False, "message": str(e)}), 400
+            
+            conditions = ["c.recipe_id = %s"]
+            params = [recipe_id]
+            order = pagination.apply(conditions, params, position, "c")
+            params.append(limit + 1)
+            cursor.execute(f"""
                 SELECT c.*, u.username, u.profile_image 
                 FROM comments c
                 JOIN users u ON c.user_id = u.id
-                WHERE c.recipe_id = %s
-                ORDER BY c.created_at DESC
-            """, (recipe_id,))
+                WHERE {" AND ".join(conditions)}{order}
+            """, tuple(params))
+            rows, next_cursor = pagination.split_page(cursor.fetchall(), limit, 4, 0)
             
             comments = []
-            for row in cursor.fetchall():
+            for row in rows:
                 comments.append({
                     "id": row[0],
                     "recipe_id": row[1],
@@ -844,7 +1375,7 @@ def recipe_comments(recipe_id):
                     "profile_image": row[6]
                 })
             
-            return jsonify({"success": True, "comments": comments})
+            return jsonify({"success": True, "comments": comments, "next_cursor": next_cursor})
         
         elif request.method == "POST":
             # Add comment
@@ -858,8 +1389,12 @@ def recipe_comments(recipe_id):
                 INSERT INTO comments (recipe_id, user_id, content)
                 VALUES (%s, %s, %s)
             """, (recipe_id, session['user_id'], content))
+            counters.adjust(cursor, "comments", recipe_id, 1)
+            event = trending.record(cursor, recipe_id, "comment")
             
             conn.commit()
+            trending.apply(event)
+            response_cache.purge("recipes:all", f"recipe:{recipe_id}")
             return jsonify({"success": True, "message": "Comment added"})
             
     except Exception as e:
@@ -869,16 +1404,141 @@ def recipe_comments(recipe_id):
     finally:
         close_db_connection(conn, cursor)
 
+# ===================== OPERATIONS =====================
+@bp.route("/api/pool/stats", methods=["GET"])
+def pool_stats():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    return jsonify({"success": True, "pool": db_pool.stats()})
+
+@bp.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    if not check_auth():
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+    return jsonify({
+        "success": True,
+        "cache": response_cache.stats(),
+        "llm": recipe_generator.stats()
+    })
+
 # ===================== ERROR HANDLERS =====================
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found(error):
     return jsonify({"success": False, "message": "Resource not found"}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(PoolTimeout)
+def pool_exhausted(error):
+    print(f"Connection pool exhausted: {error}")
+    return jsonify({"success": False, "message": "Server busy, please retry"}), 503
+
+@bp.app_errorhandler(500)
 def internal_error(error):
     print(f"Internal error: {error}")
     return jsonify({"success": False, "message": "Internal server error"}), 500
 
+# ===================== APP FACTORY =====================
+def create_app(config=None):
+    """
+    Build the app: configuration, extensions and routes. Starts no threads
+    and writes no files, so it is cheap to run in every worker and the
+    result can be forked; see prepare(), preload() and init_worker().
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.setdefault("OPENAI_API_KEY", os.environ.get("OPENAI_API_KEY"))
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    passwords.init_app(app)
+    metrics.init_app(app)
+    metrics.instrument(db)
+    db_pool.init_app(app, db.connect)
+    metrics.add_gauges("db_pool", db_pool.stats)
+    metrics.add_gauges("password_hasher", passwords.stats)
+    metrics.add_gauges("view_counter", view_counter.stats)
+    view_counter.init_app(app, db_pool)
+    search_index.init_app(app, db_pool)
+    similar_index.init_app(app, db_pool)
+    trending.init_app(app, db_pool)
+    response_cache.init_app(app)
+    user_stats.init_app(app, response_cache)
+    profile_cache.init_app(app, response_cache)
+    viewer_state.init_app(app, response_cache)
+    assets.init_app(app)
+    recipe_generator.init_app(app, db_pool)
+
+    upload_folder = os.path.join(app.root_path, "static", "uploads")
+    folders = {kind: os.path.join(upload_folder, name) for kind, name in UPLOAD_SUBFOLDERS.items()}
+    app.config["UPLOAD_FOLDER"] = upload_folder
+    media_store.init_app(app, folders)
+
+    app.register_blueprint(bp)
+    return app
+
+def prepare(app):
+    """
+    Start-up work that writes to disk: upload folders, the SQLite schema
+    (SQLITE_BOOTSTRAP), the asset bundle (ASSETS_BUILD_ON_STARTUP) and the
+    first similar-recipes and trending snapshots. Runs once per deploy or
+    launcher start, not in every worker.
+    """
+    media_store.create_folders()
+    if db.engine == "sqlite" and app.config["SQLITE_BOOTSTRAP"]:
+        db.bootstrap()
+    if app.config["ASSETS_BUILD_ON_STARTUP"]:
+        assets.build()
+    try:
+        # The first similar-recipes snapshot; later ones are rebuilt by the workers
+        if similar_index.available and not similar_index.load():
+            similar_index.rebuild(wait=True)
+    except Exception as e:
+        print(f"Similar index build error: {e}")
+    try:
+        # Seed the trending board from recent likes, favorites and comments
+        if not trending.load():
+            trending.rebuild()
+            trending.snapshot(force=True)
+    except Exception as e:
+        print(f"Trending snapshot error: {e}")
+
+def preload(app):
+    """Shared read-only state, built once by the launcher before it forks workers."""
+    try:
+        search_index.rebuild()
+    except Exception as e:
+        # Workers build their own copy in the background instead
+        print(f"Search index preload error: {e}")
+    try:
+        # Mapped before fork, so workers share the pages from the start
+        similar_index.load()
+    except Exception as e:
+        print(f"Similar index preload error: {e}")
+    try:
+        trending.load()
+    except Exception as e:
+        print(f"Trending preload error: {e}")
+    # Forked workers must not share the master's database sockets
+    db_pool.close_idle()
+
+def init_worker(app):
+    """Per-process start-up: run once in each worker (after fork) or single process."""
+    search_index.ensure_started()
+    similar_index.ensure_started()
+    trending.ensure_started()
+
+def shutdown_worker(app):
+    """Write back buffered state before a worker exits."""
+    view_counter.shutdown()
+    trending.shutdown()
+    media_store.shutdown()
+
 # ===================== RUN APP =====================
+# Development server; production runs `python serve.py` (see serve.py)
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app = create_app()
+    prepare(app)
+    init_worker(app)
+    app.run(debug=True, host='0.0.0.0', port=5000)
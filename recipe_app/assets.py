@@ -0,0 +1,114 @@
+"""
+Fingerprinted, precompressed static assets.
+
+build() copies each source under static/ to static/dist/<name>.<hash>.<ext>,
+where the hash is taken from the content, writes .gz (and .br when the
+brotli package is installed) next to it, and records the mapping in
+static/dist/manifest.json. Templates link assets through
+{{ asset_url('js/dashboard.js') }}, so a changed file gets a new URL and
+the old one can be cached forever.
+
+/assets/<file> serves the best precompressed variant the client accepts,
+with Cache-Control: immutable and Vary: Accept-Encoding. Unknown names
+fall back to the plain /static URL.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import abort, request, send_from_directory, url_for
+
+SOURCES = (
+    "css/style.css",
+    "css/dashboard.css",
+    "js/dashboard.js",
+    "js/index.js",
+)
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _write(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(data)
+    os.replace(tmp, path)
+
+
+class Assets(object):
+    def __init__(self):
+        self.static_folder = None
+        self.dist_folder = None
+        self.manifest = {}
+        self.sources = SOURCES
+
+    def init_app(self, app, sources=SOURCES):
+        app.config.setdefault("ASSETS_BUILD_ON_STARTUP", True)
+        self.static_folder = app.static_folder
+        self.dist_folder = os.path.join(app.static_folder, "dist")
+        self.sources = tuple(sources)
+        # build() runs in the app's prepare() step; workers only read the manifest
+        self.load()
+        app.add_url_rule("/assets/<path:filename>", "assets", self.serve)
+        app.jinja_env.globals["asset_url"] = self.url
+
+    def load(self):
+        try:
+            with open(os.path.join(self.dist_folder, "manifest.json")) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        return self.manifest
+
+    def build(self):
+        """Fingerprint and compress every source; unchanged files are skipped."""
+        try:
+            import brotli  # optional dependency
+        except ImportError:
+            brotli = None
+        os.makedirs(self.dist_folder, exist_ok=True)
+        manifest = {}
+        for name in self.sources:
+            with open(os.path.join(self.static_folder, name), "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            stem, ext = os.path.splitext(name)
+            hashed = f"{stem.replace('/', '.')}.{digest}{ext}"
+            target = os.path.join(self.dist_folder, hashed)
+            if not os.path.exists(target):
+                # mtime=0 keeps the gzip output byte-identical across builds
+                _write(target + ".gz", gzip.compress(data, 9, mtime=0))
+                if brotli is not None:
+                    _write(target + ".br", brotli.compress(data, quality=11))
+                _write(target, data)
+            manifest[name] = hashed
+        _write(os.path.join(self.dist_folder, "manifest.json"),
+               json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        self.manifest = manifest
+        return manifest
+
+    def url(self, name):
+        hashed = self.manifest.get(name)
+        if hashed is None:
+            return url_for("static", filename=name)
+        return url_for("assets", filename=hashed)
+
+    def serve(self, filename):
+        path = os.path.join(self.dist_folder, filename)
+        if "/" in filename or filename == "manifest.json" or not os.path.isfile(path):
+            abort(404)
+        accepted = request.accept_encodings
+        served, encoding = filename, None
+        for suffix, name in ((".br", "br"), (".gz", "gzip")):
+            if accepted[name] and os.path.isfile(path + suffix):
+                served, encoding = filename + suffix, name
+                break
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = send_from_directory(self.dist_folder, served, mimetype=mimetype,
+                                       max_age=31536000, conditional=True)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,208 @@
+"""
+Shared plumbing for the benchmark scripts: loading the app against a
+bench database, counting SQL statements per request, percentiles, and
+saving / comparing result files.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DEFAULT_DATABASE = "recipe_app_bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def bench_email(index):
+    return f"bench{index}@example.com"
+
+
+def add_database_args(parser):
+    parser.add_argument("--backend", choices=("mysql", "sqlite"), default=os.environ.get("DB_BACKEND", "mysql"))
+    parser.add_argument("--database", default=DEFAULT_DATABASE,
+                        help="MySQL database, or SQLite file (<name>.db) under the app folder")
+
+
+def load_app(database=DEFAULT_DATABASE, llm_latency=0.0, backend="mysql"):
+    """Build the app with the fake LLM client, pointed at `database`."""
+    os.environ.setdefault("LLM_CLIENT", "fake")
+    from app import create_app, prepare
+    from extensions import recipe_generator
+    from recipe_generator import FakeLLMClient
+
+    config = {"MYSQL_DATABASE_DB": database}
+    if backend == "sqlite":
+        config["DB_BACKEND"] = "sqlite"
+        config["SQLITE_PATH"] = database if database.endswith(".db") else database + ".db"
+    app = create_app(config)
+    prepare(app)
+    if app.config["LLM_CLIENT"] == "fake":
+        recipe_generator.client = FakeLLMClient(latency=llm_latency)
+    return app
+
+
+class QueryCounter(object):
+    """
+    Counts statements executed by pymysql or SQLite cursors on the current thread.
+    Background threads (view flushes, search sync) keep their own counts,
+    so a request is only charged for the queries it ran itself.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._installed = False
+
+    def install(self):
+        if self._installed:
+            return
+        import pymysql.cursors
+        import sqlite_backend
+
+        for cursor_class in (pymysql.cursors.Cursor, sqlite_backend.Cursor):
+            self._patch(cursor_class)
+        self._installed = True
+
+    def _patch(self, cursor_class):
+        counter = self
+        original_execute = cursor_class.execute
+        original_executemany = cursor_class.executemany
+
+        def execute(cursor, query, args=None):
+            counter._bump()
+            return original_execute(cursor, query, args)
+
+        def executemany(cursor, query, args):
+            counter._bump()
+            # pymysql's executemany falls back to execute() per row for non-INSERTs
+            counter._local.nested = True
+            try:
+                return original_executemany(cursor, query, args)
+            finally:
+                counter._local.nested = False
+
+        cursor_class.execute = execute
+        cursor_class.executemany = executemany
+
+    def _bump(self):
+        if not getattr(self._local, "nested", False):
+            self._local.count = getattr(self._local, "count", 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def summarize(samples, elapsed):
+    """samples: label -> list of (seconds, queries, status). Returns label -> metrics."""
+    result = {}
+    for label, rows in sorted(samples.items()):
+        latencies = sorted(seconds for seconds, _, _ in rows)
+        result[label] = {
+            "count": len(rows),
+            "rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "queries_per_request": round(sum(q for _, q, _ in rows) / len(rows), 2),
+            "errors": sum(1 for _, _, status in rows if status >= 400),
+        }
+    return result
+
+
+def metadata(**extra):
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    meta = {
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    meta.update(extra)
+    return meta
+
+
+def print_table(results, columns, first="endpoint"):
+    header = [first] + [name for name, _ in columns]
+    rows = [[label] + [fmt.format(metrics[key]) for key, fmt in columns]
+            for label, metrics in results.items()]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+
+def save(path, meta, results):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+    print(f"\nSaved results to {path}")
+
+
+# metric -> True when larger is better
+COMPARED_METRICS = {
+    "rps": True,
+    "ops_per_sec": True,
+    "logins_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "us_per_op": False,
+    "queries_per_request": False,
+    "import_ms": False,
+    "create_app_ms": False,
+    "total_ms": False,
+}
+
+
+def compare(path, results, threshold):
+    """Print per-metric deltas against a saved run; returns the list of regressions."""
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {path} (revision {baseline['meta'].get('revision')}):")
+    regressions = []
+    for label, metrics in results.items():
+        before = baseline["results"].get(label)
+        if before is None:
+            print(f"  {label}: new")
+            continue
+        parts = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in metrics or metric not in before:
+                continue
+            old, new = before[metric], metrics[metric]
+            if not old:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = " !"
+                regressions.append((label, metric, old, new))
+            parts.append(f"{metric} {old:g} -> {new:g} ({change:+.1f}%){flag}")
+        print(f"  {label}: " + ", ".join(parts))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:g}%")
+    return regressions
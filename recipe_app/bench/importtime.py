@@ -0,0 +1,129 @@
+"""
+Cold-start budget: how long a fresh worker takes to import and build the
+app, and which heavy modules it pulls in on the way.
+
+Every run is a new interpreter under `python -X importtime`, so nothing
+is warm in-process. The best of --runs is reported:
+
+  import_ms      `import app`
+  create_app_ms  create_app() after that
+  total_ms       both, what each new worker pays before serving
+
+together with the packages that cost the most import time. Exits 1 when
+a module in LAZY_MODULES was loaded at start-up, when total_ms is over
+--budget-ms, or when a metric regressed by more than --threshold percent
+against --baseline.
+
+    python bench/importtime.py
+    python bench/importtime.py --save startup.json
+    python bench/importtime.py --baseline startup.json --budget-ms 300
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+from common import ROOT, compare, metadata, print_table, save
+
+# Loaded on first use only; none of these may appear after create_app().
+# pymysql / flaskext only load for DB_BACKEND=mysql, so runs use SQLite.
+LAZY_MODULES = ("openai", "bcrypt", "PIL", "brotli", "pymysql", "flaskext.mysql",
+                "multiprocessing", "numpy")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+built = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (built - imported) * 1000,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def package_times(stderr):
+    """Self import time per top-level package, in ms, from -X importtime output."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        totals[parts[2].strip().split(".")[0]] += int(parts[0]) / 1000.0
+    return totals
+
+
+def run_once(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"App failed to start:\n{proc.stderr[-2000:]}")
+    sample = json.loads(proc.stdout.strip().splitlines()[-1])
+    sample["packages"] = package_times(proc.stderr)
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400, help="fail above this total_ms")
+    parser.add_argument("--top", type=int, default=10, help="packages to list")
+    parser.add_argument("--save")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=10)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="importtime-")
+    env = dict(os.environ)
+    env.update({
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(tmp, "importtime.db"),
+        # The real client, to show it still is not imported
+        "LLM_CLIENT": "openai",
+    })
+    samples = [run_once(env) for _ in range(args.runs)]
+    best = min(samples, key=lambda sample: sample["import_ms"] + sample["create_app_ms"])
+
+    results = {"cold start": {
+        "import_ms": round(best["import_ms"], 2),
+        "create_app_ms": round(best["create_app_ms"], 2),
+        "total_ms": round(best["import_ms"] + best["create_app_ms"], 2),
+    }}
+    print_table(results, [("import_ms", "{:.1f}"), ("create_app_ms", "{:.1f}"), ("total_ms", "{:.1f}")],
+                first="")
+    print(f"\nSlowest packages (self import time, best of {args.runs} runs):")
+    for name, ms in sorted(best["packages"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {ms:7.1f} ms")
+
+    failed = False
+    loaded = [lazy for lazy in LAZY_MODULES
+              if any(name == lazy or name.startswith(lazy + ".") for name in best["modules"])]
+    if loaded:
+        print(f"\nImported at start-up but should load lazily: {', '.join(loaded)}")
+        failed = True
+    if results["cold start"]["total_ms"] > args.budget_ms:
+        print(f"\nCold start {results['cold start']['total_ms']:.1f} ms is over the "
+              f"{args.budget_ms:g} ms budget")
+        failed = True
+
+    meta = metadata(runs=args.runs, budget_ms=args.budget_ms)
+    if args.save:
+        save(args.save, meta, results)
+    if args.baseline and compare(args.baseline, results, args.threshold):
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
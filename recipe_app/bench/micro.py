@@ -0,0 +1,109 @@
+"""
+Micro-benchmarks for the hot pure-Python paths (no database needed):
+row serializers, ingredient canonicalization, keyset cursors, the search
+index, LLM reply parsing and the in-memory response cache.
+
+    python bench/micro.py --save micro.json
+    python bench/micro.py --baseline micro.json
+"""
+import argparse
+import random
+import sys
+import timeit
+from datetime import datetime
+
+from common import ROOT, compare, metadata, print_table, save  # noqa: F401 (sets sys.path)
+
+import ingredients
+import pagination
+import projections
+from recipe_generator import FakeLLMClient, IncrementalRecipeParser, parse_recipe
+from response_cache import MemoryBackend
+from search_index import SearchIndex
+
+from seed import CUISINES, DISHES, INGREDIENTS, TAGS, WORDS
+
+
+def build_index(docs, seed):
+    rng = random.Random(seed)
+    index = SearchIndex()
+    for doc_id in range(1, docs + 1):
+        title = f"{rng.choice(CUISINES)} {rng.choice(DISHES)}"
+        index.add(doc_id, title, f"A {rng.choice(WORDS)} {title.lower()}",
+                  "\n".join(rng.sample(INGREDIENTS, 5)), ",".join(rng.sample(TAGS, 2)))
+    return index
+
+
+def cases(args):
+    now = datetime.now()
+    card_row = (1, 2, "Thai curry", "A spicy thai curry", "dinner", "easy", 10, 20, 4,
+                "spicy,quick", "", "", 120, now, "bench_user_1", 12, 3, 4)
+    card = projections.RECIPE_CARD
+    narrow = card.only("title,image_url")
+    cursor = pagination.encode_cursor(now, 12345)
+    reply = FakeLLMClient()._reply('query: "chicken curry"')
+    chunks = [reply[i:i + 8] for i in range(0, len(reply), 8)]
+    backend = MemoryBackend()
+    backend.set("resp:/api/categories?", "x" * 2000, 60)
+    index = build_index(args.docs, args.seed)
+
+    def stream_parse():
+        parser = IncrementalRecipeParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+
+    return [
+        ("serialize recipe_card", lambda: card.serialize(card_row)),
+        ("serialize card ?fields", lambda: narrow.serialize(card_row[:3] + (now,))),
+        ("canonical_ingredient", lambda: ingredients.canonical_ingredient("2 cups Chickpeas (drained), rinsed")),
+        ("cursor encode+decode", lambda: pagination.decode_cursor(pagination.encode_cursor(now, 12345))),
+        ("cursor decode", lambda: pagination.decode_cursor(cursor)),
+        ("search common term", lambda: index.search("curry", 20)),
+        ("search two terms", lambda: index.search("thai cur", 20)),
+        ("rank two terms (uncached)", lambda: index._rank(["thai", "cur"], True)),
+        ("search prefix", lambda: index.search("chick", 20)),
+        ("parse_recipe", lambda: parse_recipe(reply)),
+        ("incremental parse", stream_parse),
+        ("cache get hit", lambda: backend.get("resp:/api/categories?")),
+        ("cache tag_versions", lambda: backend.tag_versions(["recipes:all", "user:1"])),
+    ]
+
+
+def measure(fn, min_time):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    while True:
+        best = min(timer.repeat(repeat=5, number=number))
+        if best >= min_time / 5 or number > 10 ** 7:
+            return best / number
+        number *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000, help="documents in the search index")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    parser.add_argument("--filter", help="only run cases containing this text")
+    parser.add_argument("--save")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn in cases(args):
+        if args.filter and args.filter not in name:
+            continue
+        seconds = measure(fn, args.min_time)
+        results[name] = {"us_per_op": round(seconds * 1e6, 3), "ops_per_sec": round(1 / seconds, 1)}
+    print_table(results, [("us_per_op", "{:.3f}"), ("ops_per_sec", "{:,.0f}")], first="case")
+
+    meta = metadata(docs=args.docs, seed=args.seed)
+    if args.save:
+        save(args.save, meta, results)
+    if args.baseline and compare(args.baseline, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
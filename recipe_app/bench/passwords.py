@@ -0,0 +1,112 @@
+"""
+Logins per second through the password hashing pool (no database needed).
+
+For each pool size, --clients threads call PasswordHasher.verify() on a
+bcrypt hash of the configured cost as fast as they can, for --duration
+seconds. Reports logins/sec, logins/sec per worker thread (≈ per core
+while workers <= cores), p50/p99 latency, and how many calls were turned
+away with HasherBusy once the queue was full.
+
+    python bench/passwords.py --rounds 12 --workers 1,2,4 --clients 32
+    python bench/passwords.py --rounds 10 --save passwords.json
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from common import compare, metadata, percentile, print_table, save  # noqa: F401 (sets sys.path)
+
+from passwords import HasherBusy, PasswordHasher, hash_password
+
+PASSWORD = "correct horse battery staple"
+
+
+def run(workers, args, stored):
+    hasher = PasswordHasher()
+    hasher.rounds = args.rounds
+    hasher.workers = workers
+    hasher.max_queue = args.queue if args.queue is not None else 4 * workers
+    hasher.timeout = 60.0
+
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                matches, _ = hasher.verify(stored, PASSWORD)
+            except HasherBusy:
+                with lock:
+                    rejected[0] += 1
+                # A real client backs off before retrying
+                time.sleep(0.01)
+                continue
+            if not matches:
+                raise SystemExit("verify() rejected the right password")
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    logins_per_sec = len(latencies) / elapsed
+    return {
+        "logins": len(latencies),
+        "logins_per_sec": round(logins_per_sec, 2),
+        "logins_per_sec_per_worker": round(logins_per_sec / workers, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "rejected": rejected[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", default=None, help="comma-separated pool sizes (default 1..cores, doubling)")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent login threads")
+    parser.add_argument("--queue", type=int, default=None, help="PASSWORD_HASH_QUEUE (default 4 x workers)")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--save")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=10)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        sizes = [int(size) for size in args.workers.split(",")]
+    else:
+        sizes = sorted({min(cores, 2 ** i) for i in range(cores.bit_length() + 1)})
+    stored = hash_password(PASSWORD, args.rounds)
+
+    results = {}
+    for workers in sizes:
+        results[f"{workers} workers"] = run(workers, args, stored)
+    print(f"bcrypt cost {args.rounds}, {args.clients} clients, {cores} cores\n")
+    print_table(results, [
+        ("logins_per_sec", "{:.1f}"), ("logins_per_sec_per_worker", "{:.1f}"),
+        ("p50_ms", "{:.1f}"), ("p99_ms", "{:.1f}"), ("rejected", "{}"),
+    ], first="pool")
+
+    meta = metadata(rounds=args.rounds, clients=args.clients, queue=args.queue, duration=args.duration)
+    if args.save:
+        save(args.save, meta, results)
+    if args.baseline and compare(args.baseline, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
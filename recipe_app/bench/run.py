@@ -0,0 +1,239 @@
+"""
+Drive realistic request mixes against a seeded bench database and report
+throughput, p50/p95/p99 latency and SQL queries per request per endpoint.
+
+Requests go through the Flask test client in this process (one client and
+logged-in bench user per virtual user thread), so the numbers cover the
+application and the database, not the WSGI server or the network. AI
+generation uses the fake LLM client.
+
+Mixes (weights via --mix, e.g. dashboard=4,detail=4,like=1,search=1):
+
+  dashboard  /api/me + /api/dashboard/stats + /api/recipes?mine=1 + /api/categories
+  browse     /api/recipes (first page, then the next one)
+  detail     /api/recipes/<id> for a heavy-tailed random recipe
+  like       like / unlike storm on the ten most liked recipes
+  search     /api/search with one or two words
+  similar    /api/recipes/<id>/similar for a heavy-tailed random recipe (not in the default mix)
+  trending   /api/trending, overall or for one category (not in the default mix)
+  generate   /api/gemini/recipe (fake LLM, repeated queries hit the cache)
+  login_storm  /api/login repeatedly (bcrypt on the hashing pool; not in the default mix)
+
+    python bench/seed.py --reset
+    python bench/run.py --duration 30 --save baseline.json
+    python bench/run.py --duration 30 --baseline baseline.json
+    python bench/run.py --backend sqlite --duration 30
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from common import (
+    BENCH_PASSWORD, QueryCounter, add_database_args, bench_email, compare, load_app,
+    metadata, print_table, save, summarize
+)
+
+from extensions import db_pool, search_index, similar_index, trending
+
+DEFAULT_MIX = "dashboard=4,browse=2,detail=6,like=1,search=2,generate=0.2"
+SEARCH_WORDS = ["curry", "pasta", "thai", "soup", "chick", "spicy", "vegan", "rice",
+                "italian", "cake", "lentil", "garlic", "quick"]
+TRENDING_CATEGORIES = ["", "breakfast", "dinner", "dessert", "soup"]
+GENERATE_QUERIES = ["chicken curry", "vegan pasta", "lentil soup", "chocolate cake",
+                    "fish tacos", "egg fried rice"]
+
+
+class Context(object):
+    def __init__(self, recipe_ids, hot_ids):
+        self.recipe_ids = recipe_ids
+        self.hot_ids = hot_ids
+
+
+class VirtualUser(object):
+    def __init__(self, app, index, ctx, counter, samples, lock, seed):
+        self.client = app.test_client()
+        self.index = index
+        self.ctx = ctx
+        self.counter = counter
+        self.samples = samples
+        self.lock = lock
+        self.rng = random.Random(seed)
+        self.recording = False
+
+    def call(self, label, method, url, **kwargs):
+        self.counter.reset()
+        start = time.perf_counter()
+        response = self.client.open(url, method=method, **kwargs)
+        response.get_data()  # drain streamed bodies inside the timing
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            with self.lock:
+                self.samples[label].append((elapsed, self.counter.count, response.status_code))
+        return response
+
+    def login(self):
+        response = self.client.post("/api/login", json={
+            "email": bench_email(self.index), "password": BENCH_PASSWORD
+        })
+        if not (response.get_json() or {}).get("success"):
+            raise RuntimeError(f"Login failed for {bench_email(self.index)}; run bench/seed.py first")
+
+    def pick_recipe(self):
+        ids = self.ctx.recipe_ids
+        return ids[min(len(ids) - 1, int(self.rng.paretovariate(1.2)) - 1)]
+
+    # ---------------- mixes ----------------
+    def dashboard(self):
+        self.call("GET /api/me", "GET", "/api/me")
+        self.call("GET /api/dashboard/stats", "GET", "/api/dashboard/stats")
+        self.call("GET /api/recipes?mine=1", "GET", "/api/recipes?mine=1")
+        self.call("GET /api/categories", "GET", "/api/categories")
+
+    def browse(self):
+        page = self.call("GET /api/recipes", "GET", "/api/recipes").get_json() or {}
+        if page.get("next_cursor"):
+            self.call("GET /api/recipes?cursor", "GET", f"/api/recipes?cursor={page['next_cursor']}")
+
+    def detail(self):
+        self.call("GET /api/recipes/<id>", "GET", f"/api/recipes/{self.pick_recipe()}")
+
+    def similar(self):
+        self.call("GET /api/recipes/<id>/similar", "GET", f"/api/recipes/{self.pick_recipe()}/similar")
+
+    def trending(self):
+        category = self.rng.choice(TRENDING_CATEGORIES)
+        self.call("GET /api/trending", "GET", f"/api/trending?category={category}")
+
+    def like(self):
+        recipe_id = self.rng.choice(self.ctx.hot_ids)
+        self.call("POST /api/recipes/<id>/like", "POST", f"/api/recipes/{recipe_id}/like")
+        self.call("DELETE /api/recipes/<id>/like", "DELETE", f"/api/recipes/{recipe_id}/like")
+
+    def search(self):
+        words = self.rng.sample(SEARCH_WORDS, self.rng.choice((1, 1, 2)))
+        self.call("GET /api/search", "GET", "/api/search?q=" + "+".join(words))
+
+    def login_storm(self):
+        self.call("POST /api/login", "POST", "/api/login", json={
+            "email": bench_email(self.index), "password": BENCH_PASSWORD
+        })
+
+    def generate(self):
+        self.call("POST /api/gemini/recipe", "POST", "/api/gemini/recipe",
+                  json={"query": self.rng.choice(GENERATE_QUERIES)})
+
+
+def parse_mix(spec):
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(VirtualUser, name) or name in ("call", "login", "pick_recipe"):
+            raise SystemExit(f"Unknown mix: {name}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def load_context():
+    conn = db_pool.acquire()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM recipes ORDER BY likes_count DESC, id")
+        ranked = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        db_pool.release(conn)
+    if not ranked:
+        raise SystemExit("No recipes in the bench database; run bench/seed.py first")
+    return Context(ranked, ranked[:10])
+
+
+def wait_for_search(timeout=120):
+    search_index.ensure_started()
+    deadline = time.monotonic() + timeout
+    while not search_index.ready:
+        if time.monotonic() > deadline:
+            raise SystemExit("Search index did not finish building")
+        time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_database_args(parser)
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM seconds per call")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=10, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    app = load_app(args.database, llm_latency=args.llm_latency, backend=args.backend)
+    counter = QueryCounter()
+    counter.install()
+    ctx = load_context()
+    wait_for_search()
+    if similar_index.available:
+        # Index the seeded catalog, not whatever an earlier seed left behind
+        similar_index.rebuild(wait=True)
+        similar_index.load()
+    # Likes, favorites and comments of the seeded catalog
+    trending.rebuild()
+    trending.snapshot(force=True)
+
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    users = [VirtualUser(app, i, ctx, counter, samples, lock, args.seed * 1000 + i)
+             for i in range(args.users)]
+    for user in users:
+        user.login()
+
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    stop = threading.Event()
+
+    def worker(user):
+        while not stop.is_set():
+            getattr(user, user.rng.choices(names, weights)[0])()
+
+    threads = [threading.Thread(target=worker, args=(user,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)
+    for user in users:
+        user.recording = True
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    for user in users:
+        user.recording = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    results = summarize(samples, elapsed)
+    total = sum(metrics["count"] for metrics in results.values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) "
+          f"with {args.users} users, mix {args.mix}\n")
+    print_table(results, [
+        ("count", "{}"), ("rps", "{:.1f}"), ("p50_ms", "{:.2f}"), ("p95_ms", "{:.2f}"),
+        ("p99_ms", "{:.2f}"), ("queries_per_request", "{:.2f}"), ("errors", "{}"),
+    ])
+
+    meta = metadata(backend=args.backend, database=args.database, users=args.users, duration=args.duration,
+                    mix=args.mix, seed=args.seed, llm_latency=args.llm_latency)
+    if args.save:
+        save(args.save, meta, results)
+    if args.baseline and compare(args.baseline, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
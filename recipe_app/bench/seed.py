@@ -0,0 +1,140 @@
+"""
+Seed a benchmark database with deterministic users, recipes, likes,
+favorites and comments.
+
+The schema (schema.sql plus migrations/) must already be applied to the
+target MySQL database; with --backend sqlite the file is created and
+bootstrapped on the fly. Every run with the same --seed produces the same data.
+Like/favorite popularity is heavy-tailed, so a few recipes are "hot",
+which is what the like-storm mix hammers.
+
+    python bench/seed.py --database recipe_app_bench --reset
+    python bench/seed.py --backend sqlite --reset
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from common import BENCH_PASSWORD, add_database_args, bench_email, load_app
+
+import counters
+import ingredients
+from extensions import db_pool, passwords
+
+CATEGORIES = ["breakfast", "lunch", "dinner", "dessert", "vegetarian", "snack", "soup"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+CUISINES = ["Bangladeshi", "Italian", "Thai", "Mexican", "Greek", "Japanese", "Indian", "French"]
+DISHES = ["curry", "pasta", "salad", "soup", "stew", "biryani", "pancakes", "tacos",
+          "noodles", "pie", "risotto", "dumplings", "kebab", "pilaf", "cake"]
+INGREDIENTS = ["2 cups rice", "1 onion, diced", "3 cloves garlic, minced", "1 tbsp olive oil",
+               "2 tomatoes", "1 cup chickpeas", "200 g chicken", "1 tsp turmeric",
+               "2 eggs", "1 cup milk", "2 cups flour", "1 lemon", "fresh coriander",
+               "1 tbsp butter", "salt", "1 cup lentils", "2 potatoes", "1 tsp cumin"]
+TAGS = ["vegan", "quick", "spicy", "healthy", "comfort", "gluten-free", "family", "budget"]
+WORDS = ["great", "loved", "easy", "delicious", "tasty", "again", "perfect", "spicy", "kids"]
+
+TABLES = ["comments", "likes", "favorites", "recipe_tags", "recipe_ingredients",
+          "ingredients", "recipes", "users", "trending_events"]
+
+
+def popular(rng, count):
+    """Heavy-tailed pick in [0, count): low indexes are much more likely."""
+    return min(count - 1, int(rng.paretovariate(1.2)) - 1)
+
+
+def chunks(rows, size=1000):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    conn = db_pool.acquire()
+    cursor = conn.cursor()
+    try:
+        if args.reset:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for table in TABLES:
+                cursor.execute(f"TRUNCATE TABLE {table}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            conn.commit()
+
+        # One bcrypt hash shared by every bench user keeps seeding fast
+        password = passwords.hash(BENCH_PASSWORD)
+        users = [(f"bench_user_{i}", bench_email(i), password) for i in range(args.users)]
+        for batch in chunks(users):
+            cursor.executemany("INSERT INTO users (username, email, password) VALUES (%s, %s, %s)", batch)
+        cursor.execute("SELECT id FROM users WHERE email LIKE 'bench%%@example.com' ORDER BY id")
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+        now = datetime.now()
+        recipes = []
+        for i in range(args.recipes):
+            title = f"{rng.choice(CUISINES)} {rng.choice(DISHES)} #{i}"
+            created = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+            recipes.append((
+                rng.choice(user_ids), title, f"A {rng.choice(WORDS)} {title.lower()}",
+                rng.choice(CATEGORIES), rng.choice(DIFFICULTIES),
+                rng.randint(5, 60), rng.randint(5, 120), rng.randint(1, 8),
+                "\n".join(rng.sample(INGREDIENTS, rng.randint(3, 8))),
+                "\n".join(f"Step {n + 1}" for n in range(rng.randint(3, 8))),
+                "", "", ",".join(rng.sample(TAGS, rng.randint(0, 3))),
+                rng.randint(0, 5000), created, created,
+            ))
+        for batch in chunks(recipes):
+            cursor.executemany("""
+                INSERT INTO recipes (
+                    user_id, title, description, category, difficulty,
+                    prep_time, cook_time, servings, ingredients, instructions,
+                    image_url, video_url, tags, views, created_at, updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, batch)
+        conn.commit()
+        cursor.execute("SELECT id FROM recipes ORDER BY id")
+        recipe_ids = [row[0] for row in cursor.fetchall()]
+
+        for table, count in (("likes", args.likes), ("favorites", args.favorites)):
+            pairs = {(recipe_ids[popular(rng, len(recipe_ids))], rng.choice(user_ids))
+                     for _ in range(count)}
+            for batch in chunks(sorted(pairs)):
+                cursor.executemany(f"INSERT IGNORE INTO {table} (recipe_id, user_id) VALUES (%s, %s)", batch)
+        comments = [
+            (recipe_ids[popular(rng, len(recipe_ids))], rng.choice(user_ids),
+             " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))))
+            for _ in range(args.comments)
+        ]
+        for batch in chunks(comments):
+            cursor.executemany("INSERT INTO comments (recipe_id, user_id, content) VALUES (%s, %s, %s)", batch)
+        conn.commit()
+
+        counters.reconcile(cursor)
+        conn.commit()
+        ingredients.backfill(cursor, conn.commit)
+        print(f"Seeded {len(user_ids)} users, {len(recipe_ids)} recipes, "
+              f"{args.likes} likes, {args.favorites} favorites, {args.comments} comments "
+              f"into {args.database}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        db_pool.release(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_database_args(parser)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--likes", type=int, default=20000)
+    parser.add_argument("--favorites", type=int, default=5000)
+    parser.add_argument("--comments", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="truncate the bench tables first")
+    args = parser.parse_args()
+    load_app(args.database, backend=args.backend)
+    seed(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,102 @@ class Config:
     MYSQL_DATABASE_PASSWORD = ""
     MYSQL_DATABASE_HOST = "localhost"
     MYSQL_DATABASE_DB = "recipe_app_db"
+
+    # Storage engine: "mysql" or "sqlite" (single node / CI, see sqlite_backend.py).
+    # A relative SQLITE_PATH is resolved against the app folder.
+    DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+    SQLITE_PATH = os.environ.get("SQLITE_PATH", "recipe_app.db")
+    SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", 5))
+    SQLITE_CACHE_MB = int(os.environ.get("SQLITE_CACHE_MB", 64))
+    SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", 256))
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BOOTSTRAP = os.environ.get("SQLITE_BOOTSTRAP", "1") == "1"
+
+    # Production launcher (serve.py): preforked worker processes x threads.
+    # SERVER_WORKERS=0 means one per core; SERVER_PRELOAD builds the app and
+    # shared read-only state once in the master before forking
+    SERVER_BIND = os.environ.get("SERVER_BIND", "0.0.0.0:5000")
+    SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", 0))
+    SERVER_THREADS = int(os.environ.get("SERVER_THREADS", 8))
+    SERVER_PRELOAD = os.environ.get("SERVER_PRELOAD", "1") == "1"
+    SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", 1024))
+    SERVER_GRACEFUL_TIMEOUT = float(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+
+    # Password hashing: bcrypt cost for new hashes (older costs are upgraded
+    # on login) and the per-worker hashing pool; 0 sizes it from the cores
+    PASSWORD_BCRYPT_ROUNDS = int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 0))
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 0))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+    # Connection pool (per worker process)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 5))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 3600))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+
+    # Write-behind view counting (see view_counter.py for the loss bound);
+    # VIEW_MAX_PENDING caps the per-worker buffer while the database is down
+    VIEW_FLUSH_INTERVAL = float(os.environ.get("VIEW_FLUSH_INTERVAL", 5))
+    VIEW_FLUSH_THRESHOLD = int(os.environ.get("VIEW_FLUSH_THRESHOLD", 500))
+    VIEW_MAX_PENDING = int(os.environ.get("VIEW_MAX_PENDING", 100000))
+
+    # Seconds between search index delta syncs (picks up other workers' writes)
+    SEARCH_SYNC_INTERVAL = float(os.environ.get("SEARCH_SYNC_INTERVAL", 30))
+
+    # "Similar recipes" MinHash/LSH index (needs numpy): snapshot folder
+    # (default instance/similar), signature size and bands, delta sync, and
+    # when a worker writes a fresh snapshot (delta size / snapshot age)
+    SIMILAR_INDEX_DIR = os.environ.get("SIMILAR_INDEX_DIR", "instance/similar")
+    SIMILAR_NUM_PERM = int(os.environ.get("SIMILAR_NUM_PERM", 96))
+    SIMILAR_BANDS = int(os.environ.get("SIMILAR_BANDS", 32))
+    SIMILAR_SYNC_INTERVAL = float(os.environ.get("SIMILAR_SYNC_INTERVAL", 30))
+    SIMILAR_REBUILD_THRESHOLD = int(os.environ.get("SIMILAR_REBUILD_THRESHOLD", 5000))
+    SIMILAR_REBUILD_INTERVAL = float(os.environ.get("SIMILAR_REBUILD_INTERVAL", 6 * 3600))
+
+    # Trending feed (/api/trending): engagement half-life in seconds, how often
+    # workers read each other's events and how often one of them snapshots
+    # the scores to TRENDING_DIR (default instance/trending)
+    TRENDING_DIR = os.environ.get("TRENDING_DIR", "instance/trending")
+    TRENDING_HALF_LIFE = float(os.environ.get("TRENDING_HALF_LIFE", 24 * 3600))
+    TRENDING_SYNC_INTERVAL = float(os.environ.get("TRENDING_SYNC_INTERVAL", 10))
+    TRENDING_SNAPSHOT_INTERVAL = float(os.environ.get("TRENDING_SNAPSHOT_INTERVAL", 300))
+
+    # Response cache: "memory" (per worker) or "redis" (shared across workers)
+    RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_REDIS_URL = os.environ.get("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 30))
+    STATS_TTL = int(os.environ.get("STATS_TTL", 30))
+
+    # User profile cache and the version marker kept in the session cookie
+    # (only with RESPONSE_CACHE_BACKEND=redis; see profile_cache.py)
+    PROFILE_CACHE_TTL = int(os.environ.get("PROFILE_CACHE_TTL", 60))
+    PROFILE_SESSION_SNAPSHOT = os.environ.get("PROFILE_SESSION_SNAPSHOT", "1") == "1"
+
+    # AI recipe generation: "openai" or "fake" (deterministic local client)
+    LLM_CLIENT = os.environ.get("LLM_CLIENT", "openai")
+    LLM_CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", 512))
+    LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 86400))
+    LLM_CACHE_PERSIST = os.environ.get("LLM_CACHE_PERSIST", "0") == "1"
+    # Hard deadline and concurrency bounds for upstream LLM calls
+    LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 20))
+    LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))
+    LLM_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", 16))
+
+    # Media uploads: per-kind size limits, streaming chunk size, variant workers
+    MEDIA_MAX_IMAGE_BYTES = int(os.environ.get("MEDIA_MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+    MEDIA_MAX_VIDEO_BYTES = int(os.environ.get("MEDIA_MAX_VIDEO_BYTES", 200 * 1024 * 1024))
+    MEDIA_CHUNK_SIZE = int(os.environ.get("MEDIA_CHUNK_SIZE", 64 * 1024))
+    MEDIA_WORKERS = int(os.environ.get("MEDIA_WORKERS", 2))
+
+    # Fingerprint and compress static assets at startup; set to 0 when
+    # "flask build-assets" already ran as part of the deploy
+    ASSETS_BUILD_ON_STARTUP = os.environ.get("ASSETS_BUILD_ON_STARTUP", "1") == "1"
+
+    # Instrumentation (/metrics, slow-query log, per-request query budget).
+    # Without METRICS_TOKEN, /metrics only answers direct localhost requests
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+    QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", 20))
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5))
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
@@ -0,0 +1,57 @@
+"""
+Denormalized engagement counters.
+
+recipes.likes_count / favorites_count / comments_count and
+users.likes_received are adjusted inside the same transaction as the row
+that changed them. Callers only adjust when the write really affected a
+row (cursor.rowcount == 1), so repeated likes or unlikes never drift the
+totals. reconcile() rebuilds everything from the source tables.
+"""
+
+# Recipe counter column per engagement table
+RECIPE_COUNTERS = {
+    "likes": "likes_count",
+    "favorites": "favorites_count",
+    "comments": "comments_count",
+}
+
+
+def adjust(cursor, table, recipe_id, delta):
+    """Apply `delta` to the recipe's counter; for likes, return the recipe's author id."""
+    column = RECIPE_COUNTERS[table]
+    cursor.execute(
+        f"UPDATE recipes SET {column} = {column} + %s WHERE id = %s",
+        (delta, recipe_id)
+    )
+    if table != "likes":
+        return None
+    cursor.execute("SELECT user_id FROM recipes WHERE id = %s", (recipe_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    cursor.execute(
+        "UPDATE users SET likes_received = likes_received + %s WHERE id = %s",
+        (delta, row[0])
+    )
+    return row[0]
+
+
+def recipe_deleted(cursor, recipe_id):
+    """Take a recipe's likes off its author before the row (and its likes) go away."""
+    cursor.execute("""
+        UPDATE users SET likes_received = likes_received -
+            (SELECT likes_count FROM recipes WHERE id = %s)
+        WHERE id = (SELECT user_id FROM recipes WHERE id = %s)
+    """, (recipe_id, recipe_id))
+
+
+def reconcile(cursor):
+    for table, column in RECIPE_COUNTERS.items():
+        cursor.execute(f"""
+            UPDATE recipes SET {column} =
+                (SELECT COUNT(*) FROM {table} WHERE {table}.recipe_id = recipes.id)
+        """)
+    cursor.execute("""
+        UPDATE users SET likes_received =
+            (SELECT IFNULL(SUM(likes_count), 0) FROM recipes WHERE recipes.user_id = users.id)
+    """)
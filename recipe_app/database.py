@@ -0,0 +1,78 @@
+"""
+Storage engine selection.
+
+DB_BACKEND picks what sits behind db_pool: "mysql" (flaskext.mysql /
+pymysql, the default) or "sqlite" (one database file, see
+sqlite_backend.py). Both hand out DB-API connections whose cursors
+accept the MySQL dialect the app is written in.
+
+cursorclass / sscursorclass are the engine's buffered and unbuffered
+cursor types. Metrics swaps in timed subclasses. Code that streams a
+large result asks streaming_cursor(conn) rather than naming a pymysql
+class.
+
+Only the selected engine's driver is imported: a SQLite install never
+loads pymysql. Creating the SQLite schema is not part of init_app(); the
+app's prepare() step calls bootstrap().
+"""
+import os
+
+
+class Database(object):
+    def __init__(self):
+        self.engine = "mysql"
+        self.cursorclass = None
+        self.sscursorclass = None
+        self.mysql = None
+        self.sqlite = None
+        self._connect = None
+
+    def init_app(self, app):
+        app.config.setdefault("DB_BACKEND", "mysql")
+        app.config.setdefault("SQLITE_PATH", "recipe_app.db")
+        app.config.setdefault("SQLITE_BUSY_TIMEOUT", 5.0)
+        app.config.setdefault("SQLITE_CACHE_MB", 64)
+        app.config.setdefault("SQLITE_MMAP_MB", 256)
+        app.config.setdefault("SQLITE_SYNCHRONOUS", "NORMAL")
+        app.config.setdefault("SQLITE_BOOTSTRAP", True)
+        self.engine = app.config["DB_BACKEND"].lower()
+
+        if self.engine == "mysql":
+            import pymysql.cursors
+            from flaskext.mysql import MySQL
+            self.mysql = MySQL(app)
+            self._connect = self.mysql.connect
+            self.cursorclass = pymysql.cursors.Cursor
+            self.sscursorclass = pymysql.cursors.SSCursor
+        elif self.engine == "sqlite":
+            import sqlite_backend
+            path = app.config["SQLITE_PATH"]
+            if not path.startswith("file:") and not os.path.isabs(path):
+                path = os.path.join(app.root_path, path)
+            self.sqlite = sqlite_backend.SQLiteEngine(
+                path,
+                busy_timeout=float(app.config["SQLITE_BUSY_TIMEOUT"]),
+                cache_mb=int(app.config["SQLITE_CACHE_MB"]),
+                mmap_mb=int(app.config["SQLITE_MMAP_MB"]),
+                synchronous=app.config["SQLITE_SYNCHRONOUS"],
+            )
+            self._connect = self.sqlite.connect
+            self.cursorclass = self.sscursorclass = sqlite_backend.Cursor
+        else:
+            raise ValueError(f"Unknown DB_BACKEND {self.engine!r} (expected mysql or sqlite)")
+
+    def connect(self):
+        conn = self._connect()
+        conn.cursorclass = self.cursorclass
+        return conn
+
+    def streaming_cursor(self, conn):
+        """Unbuffered cursor: rows arrive as they are iterated."""
+        return conn.cursor(self.sscursorclass)
+
+    def bootstrap(self):
+        """Create the schema in an empty database; MySQL uses schema.sql + migrations/."""
+        if self.sqlite is None:
+            raise RuntimeError("init-db only applies to DB_BACKEND=sqlite; "
+                               "apply schema.sql and migrations/ with the mysql client")
+        self.sqlite.bootstrap()
@@ -0,0 +1,193 @@
+"""
+Bounded, thread-safe pool of database connections.
+
+Each Flask app context borrows at most one connection (on first use) and
+hands it back at teardown, so a request that calls get_db_connection()
+several times still costs a single checkout.
+
+Connections are per process. A forked child starts with an empty pool:
+the sockets it inherited belong to the parent and are dropped without
+being closed, since closing them would end the parent's sessions.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from flask import g, has_app_context
+
+
+class PoolTimeout(Exception):
+    """No connection became free within DB_POOL_TIMEOUT seconds."""
+
+
+def _ping(conn):
+    conn.ping(reconnect=False)
+
+
+class ConnectionPool(object):
+    def __init__(self):
+        self._connect = None
+        self._health_check = _ping
+        self._reset()
+        self.size = 10
+        self.timeout = 5.0
+        self.recycle = 3600
+        self.pre_ping = True
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._cond = threading.Condition()
+        self._idle = deque()        # (conn, created_at), most recently used on the right
+        self._borrowed = {}         # id(conn) -> created_at
+        self._open = 0              # idle + borrowed + being opened
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def init_app(self, app, connect, health_check=None):
+        app.config.setdefault("DB_POOL_SIZE", 10)
+        app.config.setdefault("DB_POOL_TIMEOUT", 5.0)
+        app.config.setdefault("DB_POOL_RECYCLE", 3600)
+        app.config.setdefault("DB_POOL_PRE_PING", True)
+        self.size = int(app.config["DB_POOL_SIZE"])
+        self.timeout = float(app.config["DB_POOL_TIMEOUT"])
+        self.recycle = int(app.config["DB_POOL_RECYCLE"])
+        self.pre_ping = bool(app.config["DB_POOL_PRE_PING"])
+        self._connect = connect
+        if health_check is not None:
+            self._health_check = health_check
+        app.teardown_appcontext(self._teardown)
+
+    # ---------------- checkout / checkin ----------------
+    def acquire(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection free after {self.timeout}s "
+                            f"(pool size {self.size})"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._open += 1
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        if entry is not None and not self._usable(*entry):
+            self._close(entry[0])
+            with self._cond:
+                self._recycled += 1
+            entry = None
+
+        if entry is None:
+            try:
+                entry = (self._connect(), time.monotonic())
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+
+        conn, created_at = entry
+        with self._cond:
+            self._borrowed[id(conn)] = created_at
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            created_at = self._borrowed.pop(id(conn), None)
+        if created_at is None:
+            return
+
+        if not discard:
+            # Never hand the next borrower an open transaction or its snapshot
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close(conn)
+        with self._cond:
+            if discard:
+                self._open -= 1
+            else:
+                self._idle.append((conn, created_at))
+            self._cond.notify()
+
+    def close_idle(self):
+        """Close every idle connection, e.g. in a launcher before it forks."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _usable(self, conn, created_at):
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            return False
+        if self.pre_ping:
+            try:
+                self._health_check(conn)
+            except Exception:
+                return False
+        return True
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ---------------- request scope ----------------
+    def connection(self):
+        """Connection bound to the current app context, borrowed on first use."""
+        if not has_app_context():
+            return self.acquire()
+        conn = g.get("_pooled_db")
+        if conn is None:
+            conn = g._pooled_db = self.acquire()
+        return conn
+
+    def is_request_bound(self, conn):
+        return has_app_context() and g.get("_pooled_db") is conn
+
+    def _teardown(self, exception):
+        conn = g.pop("_pooled_db", None)
+        if conn is not None:
+            self.release(conn, discard=exception is not None)
+
+    # ---------------- introspection ----------------
+    def stats(self):
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "open": self._open,
+                "in_use": len(self._borrowed),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "wait_time_total": round(self._wait_total, 6),
+                "wait_time_avg": round(self._wait_total / checkouts, 6) if checkouts else 0.0,
+                "wait_time_max": round(self._wait_max, 6),
+            }
@@ -0,0 +1,76 @@
+"""
+Conditional GET (ETag / If-None-Match) for polled JSON endpoints.
+
+Two ways to get a validator:
+
+* conditional(stamp): stamp() returns the row versions a response is
+  built from (updated_at, counters, cache tag versions...), usually
+  from one narrow indexed query. The ETag is a hash of them. A matching
+  If-None-Match gets a 304 before the view runs, so the body is never
+  built.
+* from_body: hash of the body the view returned. This is for views that
+  are already served from the response cache or in-process memos, where
+  producing the body costs no queries.
+
+Both answer with Cache-Control: private, no-cache, so browsers keep the
+body and revalidate on every use.
+"""
+import hashlib
+from functools import wraps
+
+from flask import current_app, request
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def matches(etag):
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def conditional(stamp, on_match=None):
+    """
+    stamp(*args, **kwargs) -> tuple of version parts, or None to skip
+    conditional handling for this request (wrong method, not logged in,
+    resource missing...). on_match runs before a 304 is returned.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = stamp(*args, **kwargs) if request.method == "GET" else None
+            if parts is None:
+                return view(*args, **kwargs)
+            etag = make(view.__name__, request.query_string.decode("latin-1"), *parts)
+            if matches(etag):
+                if on_match is not None:
+                    on_match(*args, **kwargs)
+                return not_modified(etag)
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+def from_body(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = current_app.make_response(view(*args, **kwargs))
+        if request.method != "GET" or response.status_code != 200:
+            return response
+        response.add_etag()
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return response.make_conditional(request)
+    return wrapper
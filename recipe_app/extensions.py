@@ -1,5 +1,31 @@
-from flaskext.mysql import MySQL
-from flask_bcrypt import Bcrypt
+from database import Database
+from db_pool import ConnectionPool
+from view_counter import ViewCounter
+from search_index import SearchIndex
+from similar_index import SimilarIndex
+from trending import Trending
+from response_cache import ResponseCache
+from user_stats import UserStats
+from profile_cache import ProfileCache
+from recipe_generator import RecipeGenerator
+from media import MediaStore
+from assets import Assets
+from viewer_state import ViewerState
+from metrics import Metrics
+from passwords import PasswordHasher
 
-mysql = MySQL()
-bcrypt = Bcrypt()
+db = Database()
+db_pool = ConnectionPool()
+view_counter = ViewCounter()
+search_index = SearchIndex()
+similar_index = SimilarIndex()
+trending = Trending()
+response_cache = ResponseCache()
+user_stats = UserStats()
+profile_cache = ProfileCache()
+recipe_generator = RecipeGenerator()
+media_store = MediaStore()
+assets = Assets()
+viewer_state = ViewerState()
+metrics = Metrics()
+passwords = PasswordHasher()
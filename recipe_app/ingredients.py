@@ -0,0 +1,186 @@
+"""
+Normalized recipe_ingredients / recipe_tags rows behind the text blobs.
+
+recipes.ingredients (one per line) and recipes.tags (comma separated)
+stay the display source. Alongside them every recipe keeps one row per
+ingredient, pointing into a canonical ingredient dictionary, and one row
+per tag, so "tagged vegan" or "uses chickpeas" are index lookups instead
+of LIKE scans. The rows are rewritten in the same transaction as the
+recipe write.
+
+Names are case- and accent-folded before they are stored: MySQL's default
+*_ci collations treat "Jalapeño" and "jalapeno" as the same key, so the
+dictionary must not depend on which spelling arrived first.
+"""
+import re
+import unicodedata
+
+UNITS = {
+    "cup", "cups", "tbsp", "tablespoon", "tablespoons", "tsp", "teaspoon",
+    "teaspoons", "g", "gram", "grams", "kg", "ml", "l", "litre", "liter",
+    "oz", "ounce", "ounces", "lb", "lbs", "pound", "pounds", "pinch", "dash",
+    "clove", "cloves", "can", "cans", "slice", "slices", "piece", "pieces",
+    "handful", "bunch", "large", "medium", "small", "whole", "fresh",
+    "chopped", "diced", "minced", "sliced", "of",
+}
+QUANTITY_RE = re.compile(r"^[\d/.\-½¼¾⅓⅔]+$")
+WORD_RE = re.compile(r"[a-zÀ-ɏ0-9/.½¼¾⅓⅔\-]+")
+MAX_NAME_LENGTH = 191
+
+
+def fold(text):
+    """Casefold and strip accents: 'Jalapeño' -> 'jalapeno'."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def singular(word):
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+def canonical_ingredient(text):
+    """'2 cups Chickpeas (drained), rinsed' -> 'chickpea'."""
+    text = re.sub(r"\(.*?\)", " ", text.lower()).split(",")[0]
+    words = [
+        w for w in WORD_RE.findall(text)
+        if not QUANTITY_RE.match(w) and w not in UNITS
+    ]
+    # Folded after the quantity filter, since NFKD turns '½' into '1⁄2'
+    return fold(" ".join(singular(w) for w in words))[:MAX_NAME_LENGTH]
+
+
+def canonical_tag(tag):
+    return " ".join(fold(tag).split())[:64]
+
+
+def split_ingredients(ingredients_text):
+    return [line.strip() for line in (ingredients_text or "").split("\n") if line.strip()]
+
+
+def split_tags(tags_text):
+    tags = [canonical_tag(t) for t in (tags_text or "").split(",")]
+    return list(dict.fromkeys(t for t in tags if t))
+
+
+def sync_many(cursor, recipes, replace=True):
+    """Rewrite the rows for [(recipe_id, ingredients_text, tags_text), ...]."""
+    if not recipes:
+        return
+    ids = [recipe_id for recipe_id, _, _ in recipes]
+    if replace:
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"DELETE FROM recipe_ingredients WHERE recipe_id IN ({placeholders})", tuple(ids))
+        cursor.execute(f"DELETE FROM recipe_tags WHERE recipe_id IN ({placeholders})", tuple(ids))
+
+    ingredient_rows = []
+    tag_rows = []
+    for recipe_id, ingredients_text, tags_text in recipes:
+        seen = set()
+        for position, line in enumerate(split_ingredients(ingredients_text)):
+            name = canonical_ingredient(line)
+            if name and name not in seen:
+                seen.add(name)
+                ingredient_rows.append((recipe_id, name, position, line[:500]))
+        tag_rows.extend((recipe_id, tag) for tag in split_tags(tags_text))
+
+    if ingredient_rows:
+        names = sorted({name for _, name, _, _ in ingredient_rows})
+        cursor.executemany("INSERT IGNORE INTO ingredients (name) VALUES (%s)", [(n,) for n in names])
+        cursor.execute(
+            f"SELECT name, id FROM ingredients WHERE name IN ({', '.join(['%s'] * len(names))})",
+            tuple(names)
+        )
+        # Keyed on the folded spelling the database returns, so a row stored
+        # before names were folded (or matched by the collation) still resolves
+        name_ids = {fold(name): ingredient_id for name, ingredient_id in cursor.fetchall()}
+        cursor.executemany("""
+            INSERT INTO recipe_ingredients (recipe_id, ingredient_id, position, raw_text)
+            VALUES (%s, %s, %s, %s)
+        """, [(recipe_id, name_ids[fold(name)], position, raw)
+              for recipe_id, name, position, raw in ingredient_rows])
+    if tag_rows:
+        cursor.executemany("INSERT INTO recipe_tags (recipe_id, tag) VALUES (%s, %s)", tag_rows)
+
+
+def sync_recipe(cursor, recipe_id, ingredients_text, tags_text):
+    sync_many(cursor, [(recipe_id, ingredients_text, tags_text)])
+
+
+def filter_conditions(conditions, params, tags=None, ingredients=None, alias="r"):
+    """Append indexed EXISTS filters; every tag and every ingredient must match."""
+    for tag in tags or []:
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM recipe_tags rt WHERE rt.recipe_id = {alias}.id AND rt.tag = %s)"
+        )
+        params.append(canonical_tag(tag))
+    for ingredient in ingredients or []:
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM recipe_ingredients ri JOIN ingredients i ON i.id = ri.ingredient_id"
+            f" WHERE ri.recipe_id = {alias}.id AND i.name = %s)"
+        )
+        params.append(canonical_ingredient(ingredient))
+
+
+def similar_by_terms(cursor, recipe_id, limit):
+    """
+    [(recipe_id, Jaccard similarity)] over ingredient + tag sets, exact but
+    without the MinHash index: only recipes sharing a term with recipe_id
+    are read. The 4 x limit sharing the most terms are ranked by similarity.
+    """
+    cursor.execute("""
+        SELECT shared.recipe_id, COUNT(*) FROM (
+            SELECT other.recipe_id FROM recipe_ingredients mine
+            JOIN recipe_ingredients other ON other.ingredient_id = mine.ingredient_id
+            WHERE mine.recipe_id = %s AND other.recipe_id <> %s
+            UNION ALL
+            SELECT other.recipe_id FROM recipe_tags mine
+            JOIN recipe_tags other ON other.tag = mine.tag
+            WHERE mine.recipe_id = %s AND other.recipe_id <> %s
+        ) shared
+        GROUP BY shared.recipe_id
+        ORDER BY COUNT(*) DESC, shared.recipe_id
+        LIMIT %s
+    """, (recipe_id, recipe_id, recipe_id, recipe_id, 4 * limit))
+    shared = dict(cursor.fetchall())
+    if not shared:
+        return []
+    ids = [recipe_id] + list(shared)
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"""
+        SELECT terms.recipe_id, COUNT(*) FROM (
+            SELECT recipe_id FROM recipe_ingredients WHERE recipe_id IN ({placeholders})
+            UNION ALL
+            SELECT recipe_id FROM recipe_tags WHERE recipe_id IN ({placeholders})
+        ) terms
+        GROUP BY terms.recipe_id
+    """, tuple(ids) * 2)
+    sizes = dict(cursor.fetchall())
+    mine = sizes.get(recipe_id, 0)
+    scored = [(other, count / (mine + sizes.get(other, 0) - count))
+              for other, count in shared.items()]
+    scored.sort(key=lambda hit: (-hit[1], hit[0]))
+    return scored[:limit]
+
+
+def backfill(cursor, commit, batch_size=1000):
+    """Rebuild the rows for every recipe from its blobs, in id-ordered batches."""
+    last_id = 0
+    total = 0
+    while True:
+        cursor.execute("""
+            SELECT id, ingredients, tags FROM recipes
+            WHERE id > %s ORDER BY id LIMIT %s
+        """, (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return total
+        sync_many(cursor, list(rows))
+        commit()
+        total += len(rows)
+        last_id = rows[-1][0]
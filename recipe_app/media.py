@@ -0,0 +1,250 @@
+"""
+Content-addressed media uploads with background variants.
+
+Uploads are streamed from the request body to a temp file in fixed-size
+chunks, hashed on the way, and then renamed to <sha256>.<ext> in the
+kind's folder, so the same file uploaded twice is stored once. Size
+limits are checked against Content-Length before anything is read and
+again while streaming (for chunked bodies).
+
+Resized variants (list card, detail, avatar) and video poster frames are
+produced in a process pool, off the request thread; the upload response
+already carries their URLs, and until a variant exists clients fall back
+to the original. Image variants need Pillow and poster frames need an
+ffmpeg binary; without them uploads still work, only the variants are
+skipped.
+
+The process pool (a forkserver context, so no worker thread's locks are
+copied into it), Pillow and subprocess are only loaded by the first
+upload, keeping them out of worker start-up. create_folders() is part of
+the app's prepare() step, not of init_app().
+"""
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+KIND_EXTENSIONS = {
+    "image": {"png", "jpg", "jpeg", "gif"},
+    "profile": {"png", "jpg", "jpeg", "gif"},
+    "video": {"mp4", "mov", "avi"},
+}
+
+# name -> (width, height, crop); crop fills the box, otherwise fit inside it
+VARIANTS = {
+    "card": (600, 400, True),
+    "detail": (1200, 1200, False),
+    "avatar": (256, 256, True),
+}
+KIND_VARIANTS = {
+    "image": ("card", "detail"),
+    "profile": ("avatar",),
+    "video": ("card",),          # made from the poster frame
+}
+
+
+class UploadError(Exception):
+    status = 400
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+def variant_name(digest, variant):
+    return f"{digest}_{variant}.jpg"
+
+
+def make_variants(source, folder, digest, variants):
+    """Process-pool task: write the JPEG variants of one image."""
+    try:
+        from PIL import Image, ImageOps  # optional dependency
+    except ImportError:
+        return []
+    done = []
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original).convert("RGB")
+        for variant in variants:
+            width, height, crop = VARIANTS[variant]
+            if crop:
+                image = ImageOps.fit(original, (width, height), Image.LANCZOS)
+            else:
+                image = original.copy()
+                image.thumbnail((width, height), Image.LANCZOS)
+            target = os.path.join(folder, variant_name(digest, variant))
+            tmp = target + ".tmp"
+            image.save(tmp, "JPEG", quality=82, optimize=True, progressive=True)
+            os.replace(tmp, target)
+            done.append(variant)
+    return done
+
+
+def make_poster(source, folder, digest, variants):
+    """Process-pool task: grab a frame one second in, then size it like an image."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return []
+    import subprocess
+
+    poster = os.path.join(folder, variant_name(digest, "poster"))
+    tmp = poster + ".tmp.jpg"
+    result = subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-ss", "1", "-i", source,
+         "-frames:v", "1", "-q:v", "3", tmp],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=60
+    )
+    if result.returncode != 0 or not os.path.exists(tmp):
+        # Clips shorter than a second: take the first frame instead
+        subprocess.run(
+            [ffmpeg, "-loglevel", "error", "-y", "-i", source, "-frames:v", "1", "-q:v", "3", tmp],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60
+        )
+    if not os.path.exists(tmp):
+        return []
+    os.replace(tmp, poster)
+    return ["poster"] + make_variants(poster, folder, digest, variants)
+
+
+class MediaStore(object):
+    def __init__(self):
+        self.folders = {}
+        self.url_prefixes = {}
+        self.chunk_size = 64 * 1024
+        self.max_bytes = {}
+        self.workers = 2
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, folders):
+        """`folders` maps kind -> directory below app.static_folder."""
+        app.config.setdefault("MEDIA_CHUNK_SIZE", 64 * 1024)
+        app.config.setdefault("MEDIA_MAX_IMAGE_BYTES", 10 * 1024 * 1024)
+        app.config.setdefault("MEDIA_MAX_VIDEO_BYTES", 200 * 1024 * 1024)
+        app.config.setdefault("MEDIA_WORKERS", 2)
+        self.chunk_size = int(app.config["MEDIA_CHUNK_SIZE"])
+        self.workers = int(app.config["MEDIA_WORKERS"])
+        image_limit = int(app.config["MEDIA_MAX_IMAGE_BYTES"])
+        self.max_bytes = {
+            "image": image_limit,
+            "profile": image_limit,
+            "video": int(app.config["MEDIA_MAX_VIDEO_BYTES"]),
+        }
+        static_url = app.static_url_path.rstrip("/")
+        for kind, folder in folders.items():
+            self.folders[kind] = folder
+            relative = os.path.relpath(folder, app.static_folder).replace(os.sep, "/")
+            self.url_prefixes[kind] = f"{static_url}/{relative}"
+        atexit.register(self.shutdown)
+
+    def create_folders(self):
+        for folder in self.folders.values():
+            os.makedirs(folder, exist_ok=True)
+
+    def _pool(self):
+        # Created lazily and per process, so forked workers get their own
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # forkserver, not fork: this runs on a request thread of a
+                # multi-threaded worker, and a forked child would inherit
+                # locks held by other threads (logging, the connection
+                # pool, pymysql). Pool processes fork from a clean server
+                # process that only preloads this module; the app module is
+                # import-safe (create_app() is not called at import time).
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pid = os.getpid()
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def check_size(self, kind, nbytes):
+        limit = self.max_bytes.get(kind)
+        if limit is not None and nbytes > limit:
+            raise UploadTooLarge(f"File exceeds the {limit // (1024 * 1024)} MB limit")
+
+    def save(self, kind, filename, stream, content_length=None):
+        """
+        Store one upload; returns its URL, hash, size and variant URLs.
+        Raises UploadError / UploadTooLarge before touching disk where it can.
+        """
+        if kind not in self.folders:
+            raise UploadError(f"Unknown upload type: {kind}")
+        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if ext not in KIND_EXTENSIONS[kind]:
+            allowed = ", ".join(sorted(KIND_EXTENSIONS[kind]))
+            raise UploadError(f"File type not allowed for {kind} uploads (use {allowed})")
+        if content_length is not None:
+            self.check_size(kind, content_length)
+
+        folder = self.folders[kind]
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    self.check_size(kind, size)
+                    digest.update(chunk)
+                    out.write(chunk)
+            if size == 0:
+                raise UploadError("Empty upload")
+            name = f"{digest.hexdigest()}.{ext}"
+            path = os.path.join(folder, name)
+            duplicate = os.path.exists(path)
+            if duplicate:
+                os.remove(tmp)
+            else:
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        hexdigest = digest.hexdigest()
+        variants = KIND_VARIANTS[kind]
+        self._schedule(kind, path, hexdigest, variants)
+        prefix = self.url_prefixes[kind]
+        urls = {variant: f"{prefix}/{variant_name(hexdigest, variant)}" for variant in variants}
+        if kind == "video":
+            urls["poster"] = f"{prefix}/{variant_name(hexdigest, 'poster')}"
+        return {
+            "url": f"{prefix}/{name}",
+            "hash": hexdigest,
+            "size": size,
+            "duplicate": duplicate,
+            "variants": urls,
+        }
+
+    def _schedule(self, kind, path, digest, variants):
+        folder = self.folders[kind]
+        wanted = list(variants) + (["poster"] if kind == "video" else [])
+        if all(os.path.exists(os.path.join(folder, variant_name(digest, v))) for v in wanted):
+            return
+        task = make_poster if kind == "video" else make_variants
+        try:
+            future = self._pool().submit(task, path, folder, digest, variants)
+        except RuntimeError as e:  # pool shut down during interpreter exit
+            print(f"Media variant scheduling error: {e}")
+            return
+        future.add_done_callback(self._report)
+
+    @staticmethod
+    def _report(future):
+        error = future.exception()
+        if error is not None:
+            print(f"Media variant error: {error}")
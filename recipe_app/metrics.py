@@ -0,0 +1,306 @@
+"""
+Request and SQL instrumentation, exposed in Prometheus text format.
+
+Every pooled connection hands out a timed subclass of the engine's
+cursor class (see timed()), which reports each statement to
+Metrics.record_query(). Statements are
+normalized (whitespace collapsed, "IN (%s, %s, ...)" folded to "IN (...)")
+so the parameterized templates group into a small, stable set of labels.
+
+Per request we keep the statement count and SQL time. At the end of a
+request they go into per-route histograms, and a warning is logged when
+the count goes over QUERY_BUDGET or one statement repeats
+N_PLUS_ONE_THRESHOLD times (the N+1 pattern). Statements slower than
+SLOW_QUERY_MS go to the "recipe_app.sql" logger. With SERVER_TIMING on,
+responses carry a Server-Timing header with the db and total time.
+
+Numbers are per worker process; scrape each worker, or sum them in the
+query. A forked worker starts from zero.
+
+/metrics fails closed: with METRICS_TOKEN set it needs
+"Authorization: Bearer <token>", without one it only answers direct
+loopback requests (no X-Forwarded-For, so nothing relayed by a proxy on
+the same host) and is a 404 for everyone else.
+"""
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+
+logger = logging.getLogger("recipe_app.sql")
+
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+MAX_STATEMENTS = 500
+MAX_STATEMENT_LENGTH = 200
+
+IN_LIST_RE = re.compile(r"IN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)", re.IGNORECASE)
+VALUES_LIST_RE = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(statement):
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    statement = SPACE_RE.sub(" ", statement).strip()
+    statement = IN_LIST_RE.sub("IN (...)", statement)
+    statement = VALUES_LIST_RE.sub(r"\1, ...", statement)
+    return statement[:MAX_STATEMENT_LENGTH]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class Histogram(object):
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}          # labels -> [bucket counts..., count, sum]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _labels(self.label_names, labels)
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-2]}')
+            lines.append(f"{self.name}_count{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+        return lines
+
+
+class Counter(object):
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = defaultdict(float)
+
+    def inc(self, labels, amount=1):
+        self._values[labels] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_labels(self.label_names, labels)}}} {value:g}")
+        return lines
+
+
+class RequestStats(object):
+    __slots__ = ("started", "queries", "sql_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = defaultdict(int)
+
+
+class Metrics(object):
+    def __init__(self):
+        self.slow_query_seconds = 0.2
+        self.query_budget = 20
+        self.n_plus_one = 5
+        self.server_timing = False
+        self.token = None
+        self.gauges = {}            # prefix -> callable returning {name: number}
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "Request latency by route.",
+            ("method", "route", "status"), LATENCY_BUCKETS)
+        self.request_queries = Histogram(
+            "http_request_sql_queries", "SQL statements executed per request.",
+            ("method", "route"), QUERY_COUNT_BUCKETS)
+        self.request_sql_time = Histogram(
+            "http_request_sql_seconds", "Time spent in SQL per request.",
+            ("method", "route"), LATENCY_BUCKETS)
+        self.query_latency = Histogram(
+            "sql_query_duration_seconds", "SQL statement latency.", (), LATENCY_BUCKETS)
+        self.statement_calls = Counter(
+            "sql_statement_calls_total", "Executions per normalized statement.", ("statement",))
+        self.statement_seconds = Counter(
+            "sql_statement_seconds_total", "Time per normalized statement.", ("statement",))
+        self.slow_queries = Counter(
+            "sql_slow_queries_total", "Statements slower than SLOW_QUERY_MS.", ("route",))
+        self.budget_exceeded = Counter(
+            "http_request_query_budget_exceeded_total", "Requests over QUERY_BUDGET statements.",
+            ("method", "route"))
+        self.repeated_statements = Counter(
+            "http_request_repeated_statement_total",
+            "Requests running one statement N_PLUS_ONE_THRESHOLD+ times.", ("method", "route"))
+
+    def init_app(self, app):
+        app.config.setdefault("SLOW_QUERY_MS", 200)
+        app.config.setdefault("QUERY_BUDGET", 20)
+        app.config.setdefault("N_PLUS_ONE_THRESHOLD", 5)
+        app.config.setdefault("SERVER_TIMING", False)
+        app.config.setdefault("METRICS_TOKEN", None)
+        self.slow_query_seconds = float(app.config["SLOW_QUERY_MS"]) / 1000.0
+        self.query_budget = int(app.config["QUERY_BUDGET"])
+        self.n_plus_one = int(app.config["N_PLUS_ONE_THRESHOLD"])
+        self.server_timing = bool(app.config["SERVER_TIMING"])
+        self.token = app.config["METRICS_TOKEN"] or None
+        _TimedMixin.metrics = self
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.add_url_rule("/metrics", "metrics", self.serve)
+
+    def instrument(self, database):
+        """Make the database's connections hand out timed cursors."""
+        database.cursorclass = timed(database.cursorclass)
+        database.sscursorclass = timed(database.sscursorclass)
+
+    def add_gauges(self, prefix, source):
+        self.gauges[prefix] = source
+
+    # ---------------- recording ----------------
+    def record_query(self, statement, seconds):
+        text = normalize(statement)
+        stats = g.get("_request_stats") if has_request_context() else None
+        route = "background"
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += seconds
+            stats.statements[text] += 1
+            route = self._route()
+        with self._lock:
+            self.query_latency.observe((), seconds)
+            key = (text,)
+            if key in self.statement_calls._values or len(self.statement_calls._values) < MAX_STATEMENTS:
+                self.statement_calls.inc(key)
+                self.statement_seconds.inc(key, seconds)
+            if seconds >= self.slow_query_seconds:
+                self.slow_queries.inc((route,))
+        if seconds >= self.slow_query_seconds:
+            logger.warning("Slow query (%.1f ms) in %s: %s", seconds * 1000, route, text)
+
+    @staticmethod
+    def _route():
+        rule = request.url_rule
+        return rule.rule if rule is not None else "<unmatched>"
+
+    def _before(self):
+        g._request_stats = RequestStats()
+
+    def _after(self, response):
+        stats = g.pop("_request_stats", None)
+        if stats is None or request.endpoint == "metrics":
+            return response
+        elapsed = time.perf_counter() - stats.started
+        method, route = request.method, self._route()
+        with self._lock:
+            self.request_latency.observe((method, route, str(response.status_code)), elapsed)
+            self.request_queries.observe((method, route), stats.queries)
+            self.request_sql_time.observe((method, route), stats.sql_seconds)
+            if stats.queries > self.query_budget:
+                self.budget_exceeded.inc((method, route))
+        if stats.queries > self.query_budget:
+            logger.warning("%s %s ran %d SQL statements (budget %d)",
+                           method, route, stats.queries, self.query_budget)
+        if stats.statements:
+            statement, repeats = max(stats.statements.items(), key=lambda item: item[1])
+            if repeats >= self.n_plus_one:
+                with self._lock:
+                    self.repeated_statements.inc((method, route))
+                logger.warning("%s %s ran the same statement %d times (possible N+1): %s",
+                               method, route, repeats, statement)
+        if self.server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={stats.sql_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                f"app;dur={elapsed * 1000:.2f}"
+            )
+        return response
+
+    # ---------------- exposition ----------------
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.request_latency, self.request_queries, self.request_sql_time,
+                           self.query_latency, self.statement_calls, self.statement_seconds,
+                           self.slow_queries, self.budget_exceeded, self.repeated_statements):
+                lines.extend(metric.render())
+        for prefix, source in sorted(self.gauges.items()):
+            for name, value in sorted(source().items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {prefix}_{name} gauge")
+                    lines.append(f"{prefix}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self):
+        if self.token:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+                return current_app.response_class("Unauthorized\n", status=401, mimetype="text/plain")
+        elif request.remote_addr not in LOOPBACK_ADDRESSES or "X-Forwarded-For" in request.headers:
+            return current_app.response_class("Not Found\n", status=404, mimetype="text/plain")
+        return current_app.response_class(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+class _TimedMixin(object):
+    metrics = None              # set by Metrics.init_app
+    _in_many = False
+
+    def execute(self, query, args=None):
+        if self.metrics is None or self._in_many:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            self.metrics.record_query(query, time.perf_counter() - started)
+
+    def executemany(self, query, args):
+        # Timed as one statement; the driver may run it as a single multi-row
+        # INSERT or fall back to execute() per row, which must not double count
+        if self.metrics is None:
+            return super().executemany(query, args)
+        started = time.perf_counter()
+        self._in_many = True
+        try:
+            return super().executemany(query, args)
+        finally:
+            self._in_many = False
+            self.metrics.record_query(query, time.perf_counter() - started)
+
+
+_timed_classes = {}
+
+
+def timed(cursorclass):
+    """Subclass of a pymysql or sqlite_backend cursor class that records its statements."""
+    if issubclass(cursorclass, _TimedMixin):
+        return cursorclass
+    timed_class = _timed_classes.get(cursorclass)
+    if timed_class is None:
+        timed_class = _timed_classes[cursorclass] = type(
+            "Timed" + cursorclass.__name__, (_TimedMixin, cursorclass), {})
+    return timed_class
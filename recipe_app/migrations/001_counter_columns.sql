@@ -0,0 +1,9 @@
+-- Denormalized engagement counters, maintained by the like/favorite/comment
+-- handlers. Run `flask --app app reconcile-counters` once after applying.
+ALTER TABLE recipes
+    ADD COLUMN likes_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN favorites_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN comments_count INT NOT NULL DEFAULT 0;
+
+ALTER TABLE users
+    ADD COLUMN likes_received INT NOT NULL DEFAULT 0;
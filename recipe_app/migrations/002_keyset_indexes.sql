@@ -0,0 +1,6 @@
+-- Composite indexes backing keyset pagination on (created_at, id).
+CREATE INDEX idx_recipes_created ON recipes (created_at, id);
+CREATE INDEX idx_recipes_user_created ON recipes (user_id, created_at, id);
+CREATE INDEX idx_recipes_category_created ON recipes (category, created_at, id);
+CREATE INDEX idx_recipes_difficulty_created ON recipes (difficulty, created_at, id);
+CREATE INDEX idx_comments_recipe_created ON comments (recipe_id, created_at, id);
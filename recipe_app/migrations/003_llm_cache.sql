@@ -0,0 +1,6 @@
+-- Persistent store for generated recipes (used when LLM_CACHE_PERSIST=1).
+CREATE TABLE IF NOT EXISTS llm_cache (
+    query_key VARCHAR(255) NOT NULL PRIMARY KEY,
+    recipe_json TEXT NOT NULL,
+    created_at DATETIME NOT NULL
+);
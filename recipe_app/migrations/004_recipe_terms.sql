@@ -0,0 +1,27 @@
+-- Normalized ingredient and tag rows kept alongside the recipes.ingredients
+-- and recipes.tags text blobs. Populate existing recipes once with:
+--   flask --app app backfill-recipe-terms
+CREATE TABLE IF NOT EXISTS ingredients (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(191) NOT NULL,
+    UNIQUE KEY uq_ingredients_name (name)
+);
+
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    recipe_id INT NOT NULL,
+    ingredient_id INT NOT NULL,
+    position SMALLINT NOT NULL,
+    raw_text VARCHAR(500) NOT NULL,
+    PRIMARY KEY (recipe_id, ingredient_id),
+    KEY idx_recipe_ingredients_ingredient (ingredient_id, recipe_id),
+    FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE,
+    FOREIGN KEY (ingredient_id) REFERENCES ingredients (id)
+);
+
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    recipe_id INT NOT NULL,
+    tag VARCHAR(64) NOT NULL,
+    PRIMARY KEY (recipe_id, tag),
+    KEY idx_recipe_tags_tag (tag, recipe_id),
+    FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+);
@@ -0,0 +1,3 @@
+-- Per-user lookups for liked_by_me / favorited_by_me and GET /api/favorites.
+CREATE INDEX idx_likes_user_recipe ON likes (user_id, recipe_id);
+CREATE INDEX idx_favorites_user_recipe ON favorites (user_id, recipe_id);
@@ -0,0 +1,10 @@
+-- Engagement log behind GET /api/trending (see trending.py). Workers tail it
+-- by id; the worker writing a trending snapshot deletes the rows the
+-- previous snapshot covered. No foreign key: the event logged for a
+-- deleted recipe has to outlive it.
+CREATE TABLE IF NOT EXISTS trending_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    recipe_id INT NOT NULL,
+    weight DOUBLE NOT NULL,
+    created_at DATETIME NOT NULL
+);
@@ -0,0 +1,4 @@
+-- Delta syncs of the search and similar-recipes indexes read rows by
+-- created_at (idx_recipes_created) and by updated_at, every few seconds
+-- in every worker; without this index the second half is a table scan.
+CREATE INDEX idx_recipes_updated ON recipes (updated_at);
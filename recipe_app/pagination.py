@@ -0,0 +1,62 @@
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+The cursor is an opaque urlsafe token naming the last row of the previous
+page, so every page is an index range scan of `limit + 1` rows no matter
+how deep the client has paged.
+"""
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def page_args(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """(limit, position) from ?limit=&cursor=; position is None on the first page."""
+    try:
+        limit = int(args.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    limit = max(1, min(limit, maximum))
+    token = args.get("cursor")
+    return limit, decode_cursor(token) if token else None
+
+
+def apply(conditions, params, position, alias):
+    """Add the seek predicate and return the ORDER BY suffix for `alias`."""
+    if position is not None:
+        created_at, row_id = position
+        conditions.append(
+            f"({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.id < %s))"
+        )
+        params.extend([created_at, created_at, row_id])
+    return f" ORDER BY {alias}.created_at DESC, {alias}.id DESC LIMIT %s"
+
+
+def split_page(rows, limit, created_index, id_index):
+    """Trim the look-ahead row and build next_cursor from the last row kept."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[created_index], last[id_index])
@@ -0,0 +1,172 @@
+"""
+Password hashing off the request thread, with backpressure.
+
+bcrypt is deliberately slow CPU work. Done inline, a login spike puts
+every request thread of a worker into hashpw() at once and starves
+everything else that worker serves. Here hashing and checking run on a
+small executor: PASSWORD_HASH_WORKERS threads, one per core by default.
+The bcrypt and hashlib primitives release the GIL, so those threads
+really run in parallel. At most PASSWORD_HASH_QUEUE more calls may wait
+for a thread. Beyond that HasherBusy is raised at once and the route
+answers 503, so logins cannot pile up behind each other.
+
+New hashes use PASSWORD_BCRYPT_ROUNDS. verify() also reports when the
+stored hash should be replaced: a bcrypt hash with another cost, or a
+legacy werkzeug "pbkdf2:..." / "scrypt:..." hash written by the old auth
+blueprint. The check and the rehash run as one task on the executor, and
+the caller stores the new hash, so old hashes are upgraded the next time
+their owner logs in.
+
+bcrypt is imported on first use, so workers that never see a login or
+registration do not load it.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+WERKZEUG_PREFIXES = ("pbkdf2:", "scrypt:")
+BCRYPT_MAX_BYTES = 72
+
+
+class HasherBusy(Exception):
+    """Every hashing thread and queue position is taken, or the wait timed out."""
+
+
+def _secret(password):
+    # bcrypt only ever looked at the first 72 bytes; bcrypt>=5 raises
+    # instead of truncating, so truncate here and keep old hashes valid
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def bcrypt_cost(stored):
+    """Cost factor of a bcrypt hash, or None for any other format."""
+    if stored and stored.startswith(BCRYPT_PREFIXES):
+        try:
+            return int(stored[4:6])
+        except ValueError:
+            return None
+    return None
+
+
+def hash_password(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def verify_password(stored, password, rounds):
+    """(matches, replacement hash or None) for a stored bcrypt or werkzeug hash."""
+    if not stored or not password:
+        return False, None
+    if stored.startswith(BCRYPT_PREFIXES):
+        import bcrypt
+        try:
+            matches = bcrypt.checkpw(_secret(password), stored.encode("ascii"))
+        except ValueError:
+            return False, None
+        if matches and bcrypt_cost(stored) != rounds:
+            return True, hash_password(password, rounds)
+        return matches, None
+    if stored.startswith(WERKZEUG_PREFIXES):
+        if check_password_hash(stored, password):
+            return True, hash_password(password, rounds)
+        return False, None
+    return False, None
+
+
+class PasswordHasher(object):
+    def __init__(self):
+        self.rounds = 12
+        self.workers = os.cpu_count() or 1
+        self.max_queue = 4 * self.workers
+        self.timeout = 10.0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._in_flight = 0
+        self._stats = {"hashed": 0, "verified": 0, "failed": 0, "rehashed": 0,
+                       "rejected": 0, "timeouts": 0}
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_BCRYPT_ROUNDS", 12)
+        app.config.setdefault("PASSWORD_HASH_WORKERS", 0)
+        app.config.setdefault("PASSWORD_HASH_QUEUE", 0)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 10.0)
+        self.rounds = int(app.config["PASSWORD_BCRYPT_ROUNDS"])
+        # 0 means "size from the core count"
+        self.workers = int(app.config["PASSWORD_HASH_WORKERS"]) or os.cpu_count() or 1
+        self.max_queue = int(app.config["PASSWORD_HASH_QUEUE"]) or 4 * self.workers
+        self.timeout = float(app.config["PASSWORD_HASH_TIMEOUT"])
+
+    # ---------------- bounded executor ----------------
+    def _get_executor(self):
+        # Executor threads do not survive fork(), so each worker builds its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+                    self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+                    self._in_flight = 0
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _done(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise HasherBusy("Too many logins in progress, please retry")
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight += 1
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count("timeouts")
+            raise HasherBusy(f"Password check did not finish within {self.timeout}s")
+
+    # ---------------- API ----------------
+    def hash(self, password):
+        hashed = self._run(hash_password, password, self.rounds)
+        self._count("hashed")
+        return hashed
+
+    def verify(self, stored, password):
+        """
+        (matches, new_hash). new_hash is set when the password matched but
+        the stored hash is outdated; the caller should store it.
+        """
+        matches, new_hash = self._run(verify_password, stored, password, self.rounds)
+        self._count("verified" if matches else "failed")
+        if new_hash is not None:
+            self._count("rehashed")
+        return matches, new_hash
+
+    # ---------------- introspection ----------------
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+        stats["workers"] = self.workers
+        stats["max_queue"] = self.max_queue
+        stats["rounds"] = self.rounds
+        return stats
@@ -0,0 +1,69 @@
+"""
+Cached user profiles for get_user_info() and /api/check-auth.
+
+Profiles live in the response cache backend under a versioned key,
+profile:<id>:<version>, where the version is the "profile:<id>" tag.
+update_profile bumps the tag and writes the new profile under the new
+version, so readers never see the old one. With a shared backend that
+holds across workers; with the in-memory backend each worker keeps its
+own copy and PROFILE_CACHE_TTL bounds how long another worker can serve
+a stale profile.
+
+The session cookie only records which version was cached and when
+({"v", "at"}; the user id is already there), never the profile itself:
+the cookie is readable by the client and profiles carry PII. check-auth
+trusts the marker while its version is current and it is younger than
+the TTL, and then reads the body straight from the cache backend.
+Versions only mean the same thing in every worker with a shared backend
+(Redis); on the in-memory backend they are per-process, so a marker
+written by one worker could never be checked by another and no marker
+is written or trusted at all.
+"""
+import json
+import time
+
+from flask import session
+
+
+class ProfileCache(object):
+    def __init__(self):
+        self._cache = None
+        self.ttl = 60
+        self.snapshot = True
+
+    def init_app(self, app, cache):
+        app.config.setdefault("PROFILE_CACHE_TTL", 60)
+        app.config.setdefault("PROFILE_SESSION_SNAPSHOT", True)
+        self.ttl = int(app.config["PROFILE_CACHE_TTL"])
+        self._cache = cache
+        self.snapshot = bool(app.config["PROFILE_SESSION_SNAPSHOT"]) and getattr(cache.backend, "shared", False)
+
+    def _version(self, user_id):
+        return self._cache.backend.tag_versions([f"profile:{user_id}"])[0]
+
+    def get(self, user_id):
+        raw = self._cache.backend.get(f"profile:{user_id}:{self._version(user_id)}")
+        return json.loads(raw) if raw is not None else None
+
+    def put(self, user_id, profile):
+        version = self._version(user_id)
+        self._cache.backend.set(f"profile:{user_id}:{version}", json.dumps(profile), self.ttl)
+        if self.snapshot and session.get("user_id") == user_id:
+            session["profile"] = {"v": version, "at": time.time()}
+
+    def invalidate(self, user_id):
+        self._cache.purge(f"profile:{user_id}")
+        session.pop("profile", None)
+
+    def from_session(self):
+        snapshot = session.get("profile")
+        user_id = session.get("user_id")
+        if not self.snapshot or snapshot is None or user_id is None:
+            return None
+        if time.time() - snapshot.get("at", 0) > self.ttl:
+            return None
+        version = self._version(user_id)
+        if snapshot.get("v") != version:
+            return None
+        raw = self._cache.backend.get(f"profile:{user_id}:{version}")
+        return json.loads(raw) if raw is not None else None
@@ -0,0 +1,181 @@
+"""
+Column-explicit projections and row serializers for the recipe endpoints.
+
+A Projection names the columns a view selects and how each one is turned
+into JSON, so the SELECT list and the row-to-dict mapping can never drift
+apart. The SQL fragment and the (key, index, converter) plan are built
+once at import time; serializing a row is a single pass over that plan.
+
+Lists select card fields only; the ingredients / instructions blobs are
+left to the detail view. Clients can shrink a payload further with
+?fields=title,image_url — see Projection.only().
+"""
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def _lines(value):
+    return value.split('\n') if value else []
+
+
+def _csv(value):
+    return value.split(',') if value else []
+
+
+def _count(value):
+    return value or 0
+
+
+def _timestamp(fmt):
+    def convert(value):
+        return value.strftime(fmt) if value else None
+    return convert
+
+
+_date = _timestamp('%Y-%m-%d')
+_datetime = _timestamp('%Y-%m-%d %H:%M:%S')
+
+
+class Field(object):
+    def __init__(self, name, sql, convert=None):
+        self.name = name
+        self.sql = sql
+        self.convert = convert
+
+
+class Projection(object):
+    def __init__(self, name, fields, required=(), hidden=()):
+        self.name = name
+        self.fields = tuple(fields)
+        self.required = tuple(required)
+        self.columns = ", ".join(field.sql for field in self.fields)
+        self._positions = {field.name: i for i, field in enumerate(self.fields)}
+        self._subsets = {}
+        self.serialize = self._compile(hidden)
+
+    def _compile(self, hidden):
+        plan = tuple(
+            (field.name, i, field.convert)
+            for i, field in enumerate(self.fields)
+            if field.name not in hidden
+        )
+
+        def serialize(row):
+            return {
+                name: row[i] if convert is None else convert(row[i])
+                for name, i, convert in plan
+            }
+        serialize.__name__ = f"serialize_{self.name}"
+        return serialize
+
+    def index(self, name):
+        return self._positions[name]
+
+    def only(self, names):
+        """
+        Narrowed projection for a ?fields= value (comma separated names, or
+        None for everything). `required` columns are still selected, for
+        keyset cursors and the like, but only the requested ones and "id"
+        are serialized.
+        """
+        if not names:
+            return self
+        wanted = frozenset(name.strip() for name in names.split(',') if name.strip())
+        subset = self._subsets.get(wanted)
+        if subset is not None:
+            return subset
+        unknown = wanted - set(self._positions)
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+        keep = wanted | {"id"}
+        selected = [f for f in self.fields if f.name in keep or f.name in self.required]
+        subset = Projection(self.name, selected, self.required,
+                            hidden={f.name for f in selected if f.name not in keep})
+        if len(self._subsets) < 256:
+            self._subsets[wanted] = subset
+        return subset
+
+
+# Recipe cards for lists: everything except the ingredients / instructions blobs
+RECIPE_CARD = Projection("recipe_card", [
+    Field("id", "r.id"),
+    Field("user_id", "r.user_id"),
+    Field("title", "r.title"),
+    Field("description", "r.description"),
+    Field("category", "r.category"),
+    Field("difficulty", "r.difficulty"),
+    Field("prep_time", "r.prep_time"),
+    Field("cook_time", "r.cook_time"),
+    Field("servings", "r.servings"),
+    Field("tags", "r.tags", _csv),
+    Field("image_url", "r.image_url"),
+    Field("video_url", "r.video_url"),
+    Field("views", "r.views", _count),
+    Field("created_at", "r.created_at", _date),
+    Field("author", "u.username"),
+    Field("likes_count", "r.likes_count", _count),
+    Field("favorites_count", "r.favorites_count", _count),
+    Field("comments_count", "r.comments_count", _count),
+], required=("id", "created_at"))
+
+RECIPE_DETAIL = Projection("recipe_detail", [
+    Field("id", "r.id"),
+    Field("user_id", "r.user_id"),
+    Field("title", "r.title"),
+    Field("description", "r.description"),
+    Field("category", "r.category"),
+    Field("difficulty", "r.difficulty"),
+    Field("prep_time", "r.prep_time"),
+    Field("cook_time", "r.cook_time"),
+    Field("servings", "r.servings"),
+    Field("ingredients", "r.ingredients", _lines),
+    Field("instructions", "r.instructions", _lines),
+    Field("tags", "r.tags", _csv),
+    Field("image_url", "r.image_url"),
+    Field("video_url", "r.video_url"),
+    Field("views", "r.views", _count),
+    Field("created_at", "r.created_at", _datetime),
+    Field("updated_at", "r.updated_at", _datetime),
+    Field("author", "u.username"),
+    Field("likes_count", "r.likes_count", _count),
+    Field("favorites_count", "r.favorites_count", _count),
+    Field("comments_count", "r.comments_count", _count),
+], required=("id",))
+
+RECIPE_EXPORT = Projection("recipe_export", [
+    f for f in RECIPE_DETAIL.fields
+    if f.name not in ("updated_at", "likes_count", "favorites_count", "comments_count")
+])
+
+SEARCH_RESULT = Projection("search_result", [
+    f for f in RECIPE_CARD.fields
+    if f.name in ("id", "title", "description", "category", "difficulty", "prep_time",
+                  "cook_time", "servings", "tags", "image_url", "video_url", "author",
+                  "likes_count")
+])
+
+# Dashboard "recent recipes"
+RECIPE_SUMMARY = Projection("recipe_summary", [
+    Field("id", "r.id"),
+    Field("title", "r.title"),
+    Field("description", "r.description"),
+    Field("image_url", "r.image_url"),
+    Field("likes", "r.likes_count", _count),
+])
+
+# Category browser samples
+CATEGORY_SAMPLE = Projection("category_sample", [
+    Field("id", "r.id"),
+    Field("title", "r.title"),
+    Field("description", "r.description"),
+    Field("image_url", "r.image_url"),
+    Field("category", "r.category"),
+    Field("likes_count", "r.likes_count", _count),
+])
+
+CATEGORY_COUNT = Projection("category_count", [
+    Field("category", "r.category"),
+    Field("count", "COUNT(*)"),
+])
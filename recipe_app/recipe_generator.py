@@ -0,0 +1,545 @@
+"""
+Cached, coalesced AI recipe generation for /api/gemini/recipe.
+
+Queries are normalized (case, accents, stopwords, word order) over
+Unicode words, so "Chicken curry" and "a curry with chicken" share one
+cache entry while prompts in other scripts keep keys of their own; a
+prompt with no words at all is never cached or coalesced. The
+cache is an LRU bounded by LLM_CACHE_SIZE with a TTL, optionally backed
+by the llm_cache table so results survive restarts. Concurrent misses
+for the same normalized query wait on a single upstream call instead of
+each paying for their own.
+
+Upstream calls run on a small bounded executor with a hard deadline
+(LLM_TIMEOUT), so a slow provider costs at most that long per request and
+never more than LLM_MAX_CONCURRENCY + LLM_MAX_QUEUE requests at a time;
+the rest are turned away immediately instead of piling up on workers.
+stream() yields recipe fields as soon as each one is complete in the
+token stream, for the Server-Sent Events endpoint.
+
+The upstream is any object with complete(prompt, timeout) -> text and
+stream(prompt, timeout) -> iterable of text chunks; FakeLLMClient gives
+deterministic output for tests and benchmarks.
+
+Only complete recipes (every REQUIRED_FIELDS key present) are cached: a
+reply cut off at max_tokens would otherwise be served as a hit for the
+whole TTL.
+"""
+import copy
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "with", "for", "of", "in", "on", "to",
+    "some", "my", "me", "i", "want", "please", "how", "make", "making",
+    "recipe", "recipes",
+}
+JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Keys the prompt asks for; image_url is cosmetic and may be missing
+REQUIRED_FIELDS = ("title", "description", "ingredients", "instructions", "category",
+                   "difficulty", "servings", "prep_time", "cook_time")
+
+# Seconds to open the upstream connection, within LLM_TIMEOUT
+CONNECT_TIMEOUT = 5.0
+
+SYSTEM_PROMPT = "You are a professional chef. Always respond with valid JSON."
+PROMPT_TEMPLATE = """
+        Generate a complete recipe based on this query: "{query}".
+        Provide output as valid JSON with keys:
+        title (string), description (string), image_url (string),
+        ingredients (array of strings), instructions (array of strings),
+        category (string: breakfast/lunch/dinner/dessert/snack),
+        difficulty (string: easy/medium/hard), servings (integer),
+        prep_time (integer in minutes), cook_time (integer in minutes).
+
+        Example response format:
+        {{
+            "title": "Recipe Title",
+            "description": "Recipe description",
+            "image_url": "https://example.com/image.jpg",
+            "ingredients": ["ingredient 1", "ingredient 2"],
+            "instructions": ["step 1", "step 2"],
+            "category": "dinner",
+            "difficulty": "medium",
+            "servings": 4,
+            "prep_time": 15,
+            "cook_time": 30
+        }}
+        """
+
+
+class GeneratorBusy(Exception):
+    """Every upstream slot and queue position is taken."""
+
+
+class GenerationTimeout(Exception):
+    """The upstream did not answer within LLM_TIMEOUT."""
+
+
+class IncompleteRecipe(Exception):
+    """The streamed reply ended before every required field arrived."""
+
+
+def is_complete(recipe):
+    return isinstance(recipe, dict) and all(field in recipe for field in REQUIRED_FIELDS)
+
+
+def fold_text(text):
+    """Casefold and strip Latin accents ('Crème' -> 'creme'); other scripts keep their marks."""
+    folded = []
+    for c in unicodedata.normalize("NFKD", text.casefold()):
+        # Indic vowel signs are combining marks too, and change the word
+        if unicodedata.combining(c) and folded and folded[-1] < "\u0250":
+            continue
+        folded.append(c)
+    return unicodedata.normalize("NFC", "".join(folded))
+
+
+def tokenize(text):
+    """Unicode words: letters, digits and the marks attached to them."""
+    tokens = []
+    word = []
+    for c in fold_text(text):
+        if c.isalnum() or unicodedata.category(c).startswith("M"):
+            word.append(c)
+        elif word:
+            tokens.append("".join(word))
+            word = []
+    if word:
+        tokens.append("".join(word))
+    return tokens
+
+
+def normalize_query(query):
+    """
+    Cache key for `query`; "" when it has no words at all, in which case
+    the caller must neither cache nor coalesce (all such prompts would
+    share one key).
+    """
+    words = tokenize(query)
+    tokens = [t for t in words if t not in STOPWORDS]
+    if not tokens:
+        tokens = words
+    return " ".join(sorted(set(tokens)))
+
+
+class IncrementalRecipeParser(object):
+    """
+    Pulls top-level "key": value pairs out of a JSON object as it streams in.
+    A pair is emitted once its value is complete; numbers wait for the next
+    character so "4" is not reported before "45" arrives.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None             # None until the opening brace is seen
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        if self.pos is None:
+            start = self.buffer.find("{")
+            if start < 0:
+                return []
+            self.pos = start + 1
+
+        emitted = []
+        while True:
+            pos = self._skip(self.pos, " \t\r\n,")
+            if pos >= len(self.buffer) or self.buffer[pos] != '"':
+                return emitted
+            try:
+                key, pos = self._decoder.raw_decode(self.buffer, pos)
+                pos = self._skip(pos, " \t\r\n")
+                if pos >= len(self.buffer) or self.buffer[pos] != ":":
+                    return emitted
+                pos = self._skip(pos + 1, " \t\r\n")
+                value, end = self._decoder.raw_decode(self.buffer, pos)
+            except ValueError:
+                return emitted
+            if isinstance(value, (int, float)) and end >= len(self.buffer):
+                return emitted
+            self.fields[key] = value
+            emitted.append((key, value))
+            self.pos = end
+
+    def _skip(self, pos, chars):
+        while pos < len(self.buffer) and self.buffer[pos] in chars:
+            pos += 1
+        return pos
+
+
+def parse_recipe(text):
+    """Recipe dict from the model's reply, or None if it holds no usable JSON."""
+    match = JSON_RE.search(text)
+    for candidate in (match.group() if match else None, text):
+        if candidate is None:
+            continue
+        try:
+            recipe = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(recipe, dict):
+            return recipe
+    return None
+
+
+class OpenAIChatClient(object):
+    def __init__(self, api_key, model="gpt-3.5-turbo"):
+        import openai  # only workers that generate recipes pay for this import
+        openai.api_key = api_key
+        self._openai = openai
+        self.model = model
+
+    def _create(self, prompt, timeout, stream=False):
+        # (connect, read): the read timeout bounds every socket read, so a
+        # stream that stalls between chunks fails instead of hanging
+        request_timeout = (min(CONNECT_TIMEOUT, timeout), timeout) if timeout else None
+        return self._openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=500,
+            stream=stream,
+            request_timeout=request_timeout
+        )
+
+    def complete(self, prompt, timeout=None):
+        return self._create(prompt, timeout).choices[0].message.content
+
+    def stream(self, prompt, timeout=None):
+        import requests
+        import urllib3
+        try:
+            for chunk in self._create(prompt, timeout, stream=True):
+                content = chunk.choices[0].delta.get("content")
+                if content:
+                    yield content
+        except self._openai.error.Timeout:
+            raise GenerationTimeout(f"No answer within {timeout}s")
+        except requests.exceptions.ConnectionError as e:
+            # A read timeout in the middle of the body surfaces as a ConnectionError
+            if e.args and isinstance(e.args[0], urllib3.exceptions.ReadTimeoutError):
+                raise GenerationTimeout(f"Upstream stalled for {timeout}s")
+            raise
+
+
+class FakeLLMClient(object):
+    """Local stand-in for the OpenAI client; counts calls, optional latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(prompt)
+
+    def stream(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+        text = self._reply(prompt)
+        step = 8
+        delay = self.latency * step / len(text)
+        for i in range(0, len(text), step):
+            if timeout and delay > timeout:
+                # What the real client's read timeout does to a stalled stream
+                time.sleep(timeout)
+                raise GenerationTimeout(f"Upstream stalled for {timeout}s")
+            if delay:
+                time.sleep(delay)
+            yield text[i:i + step]
+
+    def _reply(self, prompt):
+        query = re.search(r'query: "(.*?)"', prompt)
+        name = query.group(1) if query else "dish"
+        return json.dumps({
+            "title": f"{name.title()}",
+            "description": f"A simple {name} recipe",
+            "image_url": "https://source.unsplash.com/600x400/?food",
+            "ingredients": ["Main ingredient", "Salt", "Oil"],
+            "instructions": ["Prepare ingredients", "Cook", "Serve"],
+            "category": "dinner",
+            "difficulty": "easy",
+            "servings": 2,
+            "prep_time": 10,
+            "cook_time": 20
+        })
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RecipeGenerator(object):
+    def __init__(self):
+        self.client = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # normalized query -> (expires_at, recipe)
+        self._inflight = {}
+        self._stats = {
+            "hits": 0, "misses": 0, "coalesced": 0, "persisted_hits": 0,
+            "timeouts": 0, "rejected": 0,
+        }
+        self.max_entries = 512
+        self.ttl = 86400
+        self.persist = False
+        self.timeout = 20.0
+        self.max_concurrency = 4
+        self.max_queue = 16
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+
+    def init_app(self, app, pool, client=None):
+        app.config.setdefault("LLM_CLIENT", "openai")
+        app.config.setdefault("LLM_CACHE_SIZE", 512)
+        app.config.setdefault("LLM_CACHE_TTL", 86400)
+        app.config.setdefault("LLM_CACHE_PERSIST", False)
+        app.config.setdefault("LLM_TIMEOUT", 20.0)
+        app.config.setdefault("LLM_MAX_CONCURRENCY", 4)
+        app.config.setdefault("LLM_MAX_QUEUE", 16)
+        self.max_entries = int(app.config["LLM_CACHE_SIZE"])
+        self.ttl = int(app.config["LLM_CACHE_TTL"])
+        self.persist = bool(app.config["LLM_CACHE_PERSIST"])
+        self.timeout = float(app.config["LLM_TIMEOUT"])
+        self.max_concurrency = int(app.config["LLM_MAX_CONCURRENCY"])
+        self.max_queue = int(app.config["LLM_MAX_QUEUE"])
+        self._pool = pool
+        self._client_name = app.config["LLM_CLIENT"]
+        self._api_key = app.config.get("OPENAI_API_KEY")
+        if client is not None:
+            self.client = client
+
+    def _get_client(self):
+        if self.client is None:
+            if self._client_name == "fake":
+                self.client = FakeLLMClient()
+            else:
+                self.client = OpenAIChatClient(self._api_key)
+        return self.client
+
+    # ---------------- in-memory LRU ----------------
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key, recipe):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, recipe)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ---------------- llm_cache table ----------------
+    def _load_persisted(self, key):
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT recipe_json FROM llm_cache
+                WHERE query_key = %s AND created_at > NOW() - INTERVAL %s SECOND
+            """, (key, self.ttl))
+            row = cursor.fetchone()
+            recipe = json.loads(row[0]) if row else None
+            # Rows written before incomplete replies were rejected
+            return recipe if is_complete(recipe) else None
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+    def _save_persisted(self, key, recipe):
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO llm_cache (query_key, recipe_json, created_at)
+                VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE recipe_json = VALUES(recipe_json), created_at = NOW()
+            """, (key, json.dumps(recipe)))
+            conn.commit()
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+    # ---------------- bounded upstream calls ----------------
+    def _get_executor(self):
+        # Executor threads do not survive fork(), so each worker builds its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix="llm"
+                    )
+                    self._slots = threading.BoundedSemaphore(self.max_concurrency + self.max_queue)
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _take_slot(self):
+        self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise GeneratorBusy("Too many recipe generations in progress")
+
+    def _generate(self, query):
+        prompt = PROMPT_TEMPLATE.format(query=query)
+        executor = self._get_executor()
+        self._take_slot()
+        try:
+            future = executor.submit(self._get_client().complete, prompt, self.timeout)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            text = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Drops it if still queued; a running call ends at its own request_timeout
+            future.cancel()
+            self._count("timeouts")
+            raise GenerationTimeout(f"No answer within {self.timeout}s")
+        return parse_recipe(text)
+
+    # ---------------- generation ----------------
+
+    def generate(self, query):
+        """
+        Recipe dict for `query`, or None when the model's reply was unusable.
+        Upstream errors propagate to every caller waiting on the same flight.
+        """
+        key = normalize_query(query)
+        if not key:
+            # Nothing to key a cache entry or a shared flight on
+            self._count("misses")
+            recipe = self._generate(query)
+            return recipe if is_complete(recipe) else None
+
+        recipe = self._lookup(key)
+        if recipe is not None:
+            self._count("hits")
+            return copy.deepcopy(recipe)
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            self._count("coalesced")
+            if not flight.done.wait(self.timeout):
+                raise GenerationTimeout(f"No answer within {self.timeout}s")
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        self._count("misses")
+        try:
+            recipe = None
+            if self.persist:
+                try:
+                    recipe = self._load_persisted(key)
+                except Exception as e:
+                    print(f"LLM cache read error: {e}")
+                if recipe is not None:
+                    self._count("persisted_hits")
+            if recipe is None:
+                recipe = self._generate(query)
+                if not is_complete(recipe):
+                    recipe = None
+                if recipe is not None and self.persist:
+                    try:
+                        self._save_persisted(key, recipe)
+                    except Exception as e:
+                        print(f"LLM cache write error: {e}")
+            if recipe is not None:
+                self._store(key, recipe)
+            flight.result = recipe
+            return copy.deepcopy(recipe)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def stream(self, query):
+        """
+        Yield (field, value) pairs as each recipe field completes upstream.
+        Cached recipes are replayed at once. The stream holds an upstream
+        slot and stops with GenerationTimeout once LLM_TIMEOUT has passed
+        when the next chunk arrives, or when the client's read timeout
+        (also LLM_TIMEOUT) fires because no chunk arrives at all.
+        """
+        key = normalize_query(query)
+        recipe = self._lookup(key) if key else None
+        if recipe is not None:
+            self._count("hits")
+            for field, value in copy.deepcopy(recipe).items():
+                yield field, value
+            return
+
+        self._count("misses")
+        self._take_slot()
+        try:
+            deadline = time.monotonic() + self.timeout
+            parser = IncrementalRecipeParser()
+            prompt = PROMPT_TEMPLATE.format(query=query)
+            try:
+                for chunk in self._get_client().stream(prompt, self.timeout):
+                    if time.monotonic() > deadline:
+                        raise GenerationTimeout(f"No answer within {self.timeout}s")
+                    for field, value in parser.feed(chunk):
+                        yield field, value
+            except GenerationTimeout:
+                self._count("timeouts")
+                raise
+            recipe = parser.fields or parse_recipe(parser.buffer)
+            if recipe and not parser.fields:
+                for field, value in recipe.items():
+                    yield field, value
+            if not is_complete(recipe):
+                missing = [field for field in REQUIRED_FIELDS if field not in (recipe or {})]
+                raise IncompleteRecipe(f"Reply ended without {', '.join(missing)}")
+            if key:
+                self._store(key, recipe)
+        finally:
+            self._slots.release()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,184 @@
+"""
+Tag-invalidated cache for read-heavy JSON endpoints.
+
+Handlers opt in with @response_cache.cached(tags=...). Every entry stores
+the version of each of its tags when it was written; purging a tag bumps
+its version, so all entries carrying it turn into misses at once without
+having to find them. Tag versions live in the backend, so with a shared
+backend a purge in one worker is seen by all of them.
+
+Only requests with a logged-in session are served from cache, so the
+handlers' own check_auth() still guards anonymous traffic.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, session
+
+
+class MemoryBackend(object):
+    """Process-local LRU with per-entry TTL."""
+
+    # Tag versions are per process, so they mean nothing to another worker
+    shared = False
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._tags = {}             # tag -> version, never evicted
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            versions = []
+            for tag in tags:
+                version = self._tags.get(tag)
+                if version is None:
+                    version = self._tags[tag] = uuid.uuid4().hex
+                versions.append(version)
+            return versions
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = uuid.uuid4().hex
+
+
+class RedisBackend(object):
+    """Shared backend; any client with get/set/mget/set(nx=True) will do."""
+
+    shared = True
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self._redis = client
+
+    def get(self, key):
+        value = self._redis.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl):
+        self._redis.set(key, value, ex=int(ttl))
+
+    def tag_versions(self, tags):
+        keys = [f"tag:{tag}" for tag in tags]
+        versions = self._redis.mget(keys)
+        for i, version in enumerate(versions):
+            if version is None:
+                self._redis.set(keys[i], uuid.uuid4().hex, nx=True)
+                versions[i] = self._redis.get(keys[i])
+        return [v.decode("utf-8") if isinstance(v, bytes) else v for v in versions]
+
+    def bump(self, tags):
+        for tag in tags:
+            self._redis.set(f"tag:{tag}", uuid.uuid4().hex)
+
+
+class ResponseCache(object):
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.default_ttl = 30
+        self._lock = threading.Lock()
+        self._stats = {}            # endpoint -> [hits, misses]
+
+    def init_app(self, app, backend=None):
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", "memory")
+        app.config.setdefault("RESPONSE_CACHE_TTL", 30)
+        app.config.setdefault("RESPONSE_CACHE_MAX_ENTRIES", 2048)
+        app.config.setdefault("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        self.default_ttl = int(app.config["RESPONSE_CACHE_TTL"])
+        if backend is not None:
+            self.backend = backend
+        elif app.config["RESPONSE_CACHE_BACKEND"] == "redis":
+            self.backend = RedisBackend(app.config["RESPONSE_CACHE_REDIS_URL"])
+        else:
+            self.backend = MemoryBackend(int(app.config["RESPONSE_CACHE_MAX_ENTRIES"]))
+
+    def cached(self, tags, ttl=None, per_user=False):
+        """
+        Cache a GET view. `tags` may reference {user_id} and the view's URL
+        arguments, e.g. ("recipes:all", "user:{user_id}"). With per_user the
+        key includes the session user, for responses that differ per user.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                user_id = session.get("user_id")
+                if request.method != "GET" or user_id is None:
+                    return view(*args, **kwargs)
+
+                resolved = [tag.format(user_id=user_id, **kwargs) for tag in tags]
+                query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+                key = f"resp:{request.path}?{query}"
+                if per_user:
+                    key += f"|u={user_id}"
+
+                versions = self.backend.tag_versions(resolved)
+                raw = self.backend.get(key)
+                if raw is not None:
+                    entry = json.loads(raw)
+                    if entry["v"] == versions:
+                        self._count(view.__name__, hit=True)
+                        response = current_app.response_class(entry["b"], mimetype=entry["m"])
+                        response.headers["X-Cache"] = "HIT"
+                        return response
+
+                self._count(view.__name__, hit=False)
+                response = view(*args, **kwargs)
+                if isinstance(response, tuple) or response.status_code != 200:
+                    return response
+                entry = {
+                    "v": versions,
+                    "b": response.get_data(as_text=True),
+                    "m": response.mimetype,
+                }
+                self.backend.set(key, json.dumps(entry), ttl or self.default_ttl)
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+    def purge(self, *tags):
+        self.backend.bump(tags)
+
+    def _count(self, endpoint, hit):
+        with self._lock:
+            counts = self._stats.setdefault(endpoint, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for endpoint, (hits, misses) in self._stats.items():
+                total = hits + misses
+                result[endpoint] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": round(hits / total, 4) if total else 0.0,
+                }
+            return result
+
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from werkzeug.security import generate_password_hash, check_password_hash
-from extensions import mysql
+from extensions import db_pool, passwords
+from passwords import HasherBusy
 
 auth_bp = Blueprint("auth", __name__, template_folder="../templates/auth")
 
@@ -9,14 +9,20 @@ def register():
     if request.method=="POST":
         username = request.form["username"]
         email = request.form["email"]
-        password = generate_password_hash(request.form["password"])
-        cur = mysql.connection.cursor()
+        try:
+            password = passwords.hash(request.form["password"])
+        except HasherBusy as e:
+            flash(str(e),"danger")
+            return redirect(url_for("auth.register"))
+        conn = db_pool.connection()
+        cur = conn.cursor()
         try:
             cur.execute("INSERT INTO users (username,email,password) VALUES (%s,%s,%s)", (username,email,password))
-            mysql.connection.commit()
+            conn.commit()
             flash("Registration successful! Login now.","success")
             return redirect(url_for("auth.login"))
         except:
+            conn.rollback()
             flash("User exists or error!","danger")
             return redirect(url_for("auth.register"))
         finally:
@@ -28,11 +34,22 @@ def login():
     if request.method=="POST":
         email = request.form["email"]
         password = request.form["password"]
-        cur = mysql.connection.cursor()
+        conn = db_pool.connection()
+        cur = conn.cursor()
         cur.execute("SELECT * FROM users WHERE email=%s",(email,))
         user = cur.fetchone()
+        try:
+            matches, new_hash = passwords.verify(user[3],password) if user else (False, None)
+        except HasherBusy as e:
+            cur.close()
+            flash(str(e),"danger")
+            return redirect(url_for("auth.login"))
+        if new_hash:
+            # Legacy werkzeug hash or stale bcrypt cost, upgraded in place
+            cur.execute("UPDATE users SET password=%s WHERE id=%s AND password=%s",(new_hash,user[0],user[3]))
+            conn.commit()
         cur.close()
-        if user and check_password_hash(user[3],password):
+        if matches:
             session["user_id"]=user[0]
             session["username"]=user[1]
             flash("Login successful","success")
@@ -0,0 +1,109 @@
+-- SQLite schema (DB_BACKEND=sqlite): the MySQL schema with migrations
+-- 001-007 already applied. Applied automatically on startup while
+-- SQLITE_BOOTSTRAP=1, or with `flask --app app init-db`; every statement
+-- is idempotent. Column order matches MySQL, since some queries read
+-- rows positionally (SELECT c.*).
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(100) NOT NULL COLLATE NOCASE,
+    email VARCHAR(255) NOT NULL COLLATE NOCASE UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    profile_image VARCHAR(500),
+    bio TEXT,
+    location VARCHAR(255),
+    website VARCHAR(500),
+    created_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    likes_received INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    category VARCHAR(50) COLLATE NOCASE,
+    difficulty VARCHAR(20) COLLATE NOCASE,
+    prep_time INTEGER,
+    cook_time INTEGER,
+    servings INTEGER,
+    ingredients TEXT,
+    instructions TEXT,
+    image_url VARCHAR(500),
+    video_url VARCHAR(500),
+    tags VARCHAR(500),
+    views INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    likes_count INTEGER NOT NULL DEFAULT 0,
+    favorites_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    created_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    UNIQUE (recipe_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    created_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime')),
+    UNIQUE (recipe_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT (DATETIME('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    query_key VARCHAR(255) NOT NULL PRIMARY KEY,
+    recipe_json TEXT NOT NULL,
+    created_at DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ingredients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(191) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    ingredient_id INTEGER NOT NULL REFERENCES ingredients (id),
+    position SMALLINT NOT NULL,
+    raw_text VARCHAR(500) NOT NULL,
+    PRIMARY KEY (recipe_id, ingredient_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    tag VARCHAR(64) NOT NULL,
+    PRIMARY KEY (recipe_id, tag)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS trending_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL,
+    weight DOUBLE NOT NULL,
+    created_at DATETIME NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_recipes_created ON recipes (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_user_created ON recipes (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_category_created ON recipes (category, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_recipes_difficulty_created ON recipes (difficulty, created_at, id);
+-- migrations/007_recipes_updated_index.sql
+CREATE INDEX IF NOT EXISTS idx_recipes_updated ON recipes (updated_at);
+CREATE INDEX IF NOT EXISTS idx_comments_recipe_created ON comments (recipe_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_likes_user_recipe ON likes (user_id, recipe_id);
+CREATE INDEX IF NOT EXISTS idx_favorites_user_recipe ON favorites (user_id, recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_ingredient ON recipe_ingredients (ingredient_id, recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipe_tags_tag ON recipe_tags (tag, recipe_id);
@@ -0,0 +1,349 @@
+"""
+In-process inverted index for /api/search.
+
+Recipes are indexed over title, description, ingredients (one per line) and
+tags (comma separated) with per-field weights, and ranked with BM25. The
+last query token is matched as a prefix so the dashboard search box can
+query as the user types. All query tokens must match (AND).
+
+Each worker keeps its own copy, maintained by a background thread started
+by init_worker(): a bulk load from the database unless the launcher
+already built the index before forking (workers then inherit it and start
+syncing right away), then a delta sync every SEARCH_SYNC_INTERVAL seconds
+that picks up rows written by other workers. Writes made by this worker
+are applied immediately by the recipe handlers.
+"""
+import base64
+import bisect
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from pagination import InvalidCursor
+
+logger = logging.getLogger("recipe_app.search")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "ingredients": 2.0, "description": 1.0}
+K1 = 1.2
+B = 0.75
+# Prefix "c" must not fan out to the whole vocabulary
+MAX_PREFIX_EXPANSIONS = 64
+RESULT_CACHE_SIZE = 256
+BUILD_BATCH = 5000
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def document_terms(title, description, ingredients, tags):
+    """Weighted term frequencies and weighted length for one recipe."""
+    fields = {
+        "title": [title or ""],
+        "description": [description or ""],
+        "ingredients": (ingredients or "").split("\n"),
+        "tags": (tags or "").split(","),
+    }
+    terms = {}
+    length = 0.0
+    for field, values in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for value in values:
+            for token in tokenize(value):
+                terms[token] = terms.get(token, 0.0) + weight
+                length += weight
+    return terms, length
+
+
+def _impact(tf, length, avg_length):
+    norm = K1 * (1 - B + B * length / avg_length) if avg_length else K1
+    return tf * (K1 + 1) / (tf + norm)
+
+
+def encode_cursor(sort_key, doc_id):
+    raw = f"{sort_key!r}|{doc_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_key, doc_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return float(sort_key), int(doc_id)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+class SearchIndex(object):
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.RLock()
+        # Postings hold BM25 impacts, the tf saturation already normalized by
+        # document length, so scoring a term is idf * impact
+        self._postings = {}         # term -> {doc_id: impact}
+        self._docs = {}             # doc_id -> indexed terms
+        self._vocab = []            # sorted terms, for prefix lookups
+        self._avg_length = 0.0      # fixed at each bulk build
+        self._total_length = 0.0
+        self._impact_order = {}     # term -> sorted [(-impact, -doc_id)], built on first query
+        self._generation = 0
+        self._results = OrderedDict()
+        self._thread = None
+        self._pid = None
+        self._synced_at = None
+        self.ready = False
+        self.sync_interval = 30.0
+
+    def init_app(self, app, pool):
+        app.config.setdefault("SEARCH_SYNC_INTERVAL", 30.0)
+        self.sync_interval = float(app.config["SEARCH_SYNC_INTERVAL"])
+        self._pool = pool
+
+    # ---------------- maintenance ----------------
+    def add(self, doc_id, title, description, ingredients, tags):
+        terms, length = document_terms(title, description, ingredients, tags)
+        with self._lock:
+            self._remove(doc_id)
+            self._total_length += length
+            avg_length = self._avg_length or self._total_length / (len(self._docs) + 1)
+            for term, tf in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocab, term)
+                impact = postings[doc_id] = _impact(tf, length, avg_length)
+                order = self._impact_order.get(term)
+                if order is not None:
+                    bisect.insort(order, (-impact, -doc_id))
+            self._docs[doc_id] = (tuple(terms), length)
+            self._generation += 1
+
+    def remove(self, doc_id):
+        with self._lock:
+            if self._remove(doc_id):
+                self._generation += 1
+
+    def _remove(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        terms, length = doc
+        for term in terms:
+            postings = self._postings[term]
+            impact = postings.pop(doc_id)
+            order = self._impact_order.get(term)
+            if order is not None:
+                del order[bisect.bisect_left(order, (-impact, -doc_id))]
+            if not postings:
+                del self._postings[term]
+                del self._vocab[bisect.bisect_left(self._vocab, term)]
+                self._impact_order.pop(term, None)
+        self._total_length -= length
+        return True
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ---------------- querying ----------------
+    def _expand(self, token, prefix):
+        if not prefix:
+            return [token] if token in self._postings else []
+        start = bisect.bisect_left(self._vocab, token)
+        end = bisect.bisect_left(self._vocab, token + "\uffff")
+        matches = self._vocab[start:end]
+        if len(matches) > MAX_PREFIX_EXPANSIONS:
+            matches.sort(key=lambda term: len(self._postings[term]), reverse=True)
+            matches = matches[:MAX_PREFIX_EXPANSIONS]
+        return matches
+
+    def _idf(self, term):
+        df = len(self._postings[term])
+        return math.log(1 + (len(self._docs) - df + 0.5) / (df + 0.5))
+
+    def _rank(self, tokens, prefix):
+        """
+        Sorted list of (-key, -doc_id), ascending == best first, and the factor
+        turning a key into its BM25 score. The key is what cursors carry.
+        """
+        groups = []
+        for i, token in enumerate(tokens):
+            terms = self._expand(token, prefix and i == len(tokens) - 1)
+            if not terms:
+                return [], 1.0
+            groups.append(terms)
+
+        if len(groups) == 1 and len(groups[0]) == 1:
+            # Single exact term: idf is a constant factor, so impact order is
+            # score order; the sorted list is kept up to date by add/remove
+            term = groups[0][0]
+            order = self._impact_order.get(term)
+            if order is None:
+                order = self._impact_order[term] = sorted(
+                    (-impact, -doc_id) for doc_id, impact in self._postings[term].items()
+                )
+            return order, self._idf(term)
+
+        # Intersect starting from the most selective token
+        def group_size(terms):
+            return sum(len(self._postings[term]) for term in terms)
+        groups.sort(key=group_size)
+        candidates = None
+        for terms in groups:
+            matched = set()
+            for term in terms:
+                postings = self._postings[term]
+                if candidates is None:
+                    matched.update(postings)
+                elif len(postings) < len(candidates):
+                    matched.update(doc_id for doc_id in postings if doc_id in candidates)
+                else:
+                    matched.update(doc_id for doc_id in candidates if doc_id in postings)
+            candidates = matched
+            if not candidates:
+                return [], 1.0
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for terms in groups:
+            for term in terms:
+                postings = self._postings[term]
+                idf = self._idf(term)
+                if len(postings) < len(candidates):
+                    for doc_id, impact in postings.items():
+                        if doc_id in scores:
+                            scores[doc_id] += idf * impact
+                else:
+                    for doc_id in candidates:
+                        impact = postings.get(doc_id)
+                        if impact is not None:
+                            scores[doc_id] += idf * impact
+        return sorted((-score, -doc_id) for doc_id, score in scores.items()), 1.0
+
+    def search(self, query, limit, cursor=None):
+        """One page of (doc_id, score) best first, plus the next cursor (or None)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return [], None
+        prefix = not query[-1:].isspace()
+        key = (tuple(tokens), prefix)
+
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] == self._generation:
+                self._results.move_to_end(key)
+                ranked, scale = cached[1:]
+            else:
+                ranked, scale = self._rank(tokens, prefix)
+                self._results[key] = (self._generation, ranked, scale)
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+
+            start = 0
+            if cursor:
+                sort_key, doc_id = decode_cursor(cursor)
+                start = bisect.bisect_right(ranked, (-sort_key, -doc_id))
+            page = ranked[start:start + limit]
+            more = start + limit < len(ranked)
+
+        hits = [(-neg_id, -neg_key * scale) for neg_key, neg_id in page]
+        next_cursor = None
+        if more and page:
+            next_cursor = encode_cursor(-page[-1][0], -page[-1][1])
+        return hits, next_cursor
+
+    # ---------------- loading from MySQL ----------------
+    def ensure_started(self):
+        # Background threads do not survive fork(), so track the owning pid
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                if self.ready:
+                    self.sync()
+                else:
+                    self.rebuild()
+            except Exception:
+                logger.exception("Search index sync error")
+            time.sleep(self.sync_interval)
+
+    def rebuild(self):
+        """Bulk load every recipe, keyset-batched by id so memory stays flat."""
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT NOW()")
+            started_at = cursor.fetchone()[0]
+            docs = {}
+            postings = {}
+            total_length = 0.0
+            last_id = 0
+            while True:
+                cursor.execute("""
+                    SELECT id, title, description, ingredients, tags
+                    FROM recipes WHERE id > %s ORDER BY id LIMIT %s
+                """, (last_id, BUILD_BATCH))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    terms, length = document_terms(*row[1:])
+                    for term, tf in terms.items():
+                        postings.setdefault(term, {})[row[0]] = tf
+                    docs[row[0]] = (tuple(terms), length)
+                    total_length += length
+                last_id = rows[-1][0]
+            conn.commit()
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+        # Impacts need the average length, so convert raw tf once at the end
+        avg_length = total_length / len(docs) if docs else 0.0
+        for term_postings in postings.values():
+            for doc_id, tf in term_postings.items():
+                term_postings[doc_id] = _impact(tf, docs[doc_id][1], avg_length)
+        vocab = sorted(postings)
+        with self._lock:
+            self._postings = postings
+            self._docs = docs
+            self._vocab = vocab
+            self._avg_length = avg_length
+            self._total_length = total_length
+            self._impact_order = {}
+            self._generation += 1
+            self._synced_at = started_at
+            self.ready = True
+
+    def sync(self):
+        """Apply rows created or edited (by any worker) since the last sync."""
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT NOW()")
+            started_at = cursor.fetchone()[0]
+            # Two index range scans (created_at, updated_at); an OR would scan the table
+            cursor.execute("""
+                SELECT id, title, description, ingredients, tags FROM recipes WHERE created_at >= %s
+                UNION
+                SELECT id, title, description, ingredients, tags FROM recipes WHERE updated_at >= %s
+            """, (self._synced_at, self._synced_at))
+            rows = cursor.fetchall()
+            conn.commit()
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+        for row in rows:
+            self.add(*row)
+        self._synced_at = started_at
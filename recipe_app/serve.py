@@ -0,0 +1,290 @@
+"""
+Production launcher: preforked workers, each serving on a thread pool.
+
+    python serve.py
+    SERVER_WORKERS=4 SERVER_THREADS=16 python serve.py
+
+The master binds SERVER_BIND once, runs the app's prepare() step (upload
+folders, SQLite schema, asset bundle) and forks SERVER_WORKERS workers
+that all accept from that socket; a worker that dies is replaced. With
+SERVER_PRELOAD the master builds the app and the read-only state every
+worker needs (search index, asset manifest) before forking, so workers
+start instantly and share those pages copy-on-write instead of each
+building a copy. Per-process pieces (connection pool, metrics, executors,
+background threads) start fresh in every worker; see init_worker().
+
+Each worker handles at most SERVER_THREADS requests at a time. A worker
+with every thread busy stops accepting, so new connections wait in the
+SERVER_BACKLOG queue for whichever worker frees up first.
+
+Signals to the master:
+  TERM, INT  graceful stop: workers stop accepting, finish in-flight
+             requests (up to SERVER_GRACEFUL_TIMEOUT), flush buffered view
+             counts and exit
+  HUP        graceful reload: start a new set of workers, and once they
+             accept, drain the old set. Without preload the new workers
+             import the code afresh, so this deploys a new release; with
+             preload, restart the master instead.
+
+Responses are HTTP/1.0 (one request per connection), which keeps a
+draining worker from waiting on idle keep-alive clients. Run it behind a
+reverse proxy that keeps the client connections alive. wsgi.py exposes
+the app for other WSGI servers instead.
+"""
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from config import Config
+
+RESPAWN_BACKOFF = 1.0      # seconds between restarts of a worker that keeps crashing
+
+
+class RequestHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.0"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug's server on an inherited socket, with a bounded thread pool."""
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, sock, app, threads):
+        host, port = sock.getsockname()[:2]
+        super().__init__(host, port, app, handler=RequestHandler, fd=sock.fileno())
+        # Every worker polls the same socket; the losers of an accept()
+        # race must get EAGAIN, not block until the next connection
+        self.socket.setblocking(False)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def process_request(self, request, client_address):
+        request.setblocking(True)
+        # Blocks the accept loop while every thread is busy
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._handle, request, client_address)
+        except RuntimeError:
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self):
+        """Wait for the requests already accepted."""
+        self._executor.shutdown(wait=True)
+
+
+class Launcher(object):
+    def __init__(self, config=Config):
+        host, _, port = config.SERVER_BIND.rpartition(":")
+        self.address = (host or "0.0.0.0", int(port))
+        self.workers = int(config.SERVER_WORKERS) or os.cpu_count() or 1
+        self.threads = int(config.SERVER_THREADS)
+        self.preload = str(config.SERVER_PRELOAD).lower() in ("1", "true", "yes")
+        self.backlog = int(config.SERVER_BACKLOG)
+        self.graceful_timeout = float(config.SERVER_GRACEFUL_TIMEOUT)
+        self.app = None
+        self.sock = None
+        self.children = {}         # pid -> (generation, started)
+        self.ready = set()
+        self.generation = 0
+        self._last_crash = 0.0
+        self._stopping = False
+        self._reloading = False
+        self._ready_r = self._ready_w = None
+
+    # ---------------- master ----------------
+    def run(self):
+        self.sock = socket.create_server(self.address, backlog=self.backlog)
+        self._ready_r, self._ready_w = os.pipe()
+        os.set_blocking(self._ready_r, False)
+        if self.preload:
+            import app as app_module
+            self.app = app_module.create_app()
+            app_module.prepare(self.app)
+            app_module.preload(self.app)
+        else:
+            self._prepare()
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        print(f"Serving on http://{self.address[0]}:{self.address[1]} with {self.workers} workers "
+              f"x {self.threads} threads (preload {'on' if self.preload else 'off'}), master {os.getpid()}",
+              flush=True)
+
+        while not self._stopping:
+            self._reap()
+            self._read_ready()
+            if self._reloading:
+                self._reloading = False
+                self._reload()
+            self._maintain()
+            time.sleep(0.5)
+        self._stop()
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reloading = True
+
+    def _current(self):
+        return [pid for pid, (generation, _) in self.children.items() if generation == self.generation]
+
+    def _maintain(self):
+        missing = self.workers - len(self._current())
+        if missing <= 0:
+            return
+        if time.monotonic() - self._last_crash < RESPAWN_BACKOFF:
+            return
+        for _ in range(missing):
+            self._spawn()
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation, started = self.children.pop(pid, (None, 0.0))
+            self.ready.discard(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and not self._stopping:
+                print(f"Worker {pid} exited with status {code}", flush=True)
+                if time.monotonic() - started < RESPAWN_BACKOFF:
+                    self._last_crash = time.monotonic()
+
+    def _read_ready(self):
+        try:
+            data = os.read(self._ready_r, 4096)
+        except BlockingIOError:
+            return
+        for line in data.split():
+            self.ready.add(int(line))
+
+    def _prepare(self):
+        """prepare() in a throwaway child, keeping the app's modules out of the master."""
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                import app as app_module
+                app_module.prepare(app_module.create_app())
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            print("prepare() failed; starting workers anyway", flush=True)
+
+    def _reload(self):
+        if not self.preload:
+            # A new release may ship new assets or tables
+            self._prepare()
+        old = self._current()
+        self.generation += 1
+        new = [self._spawn() for _ in range(self.workers)]
+        print(f"Reloading: {len(new)} new workers, draining {len(old)}", flush=True)
+        # Keep the old set serving until the new one accepts (or gave up)
+        deadline = time.monotonic() + self.graceful_timeout
+        while time.monotonic() < deadline and not self._stopping:
+            self._reap()
+            self._read_ready()
+            if all(pid in self.ready or pid not in self.children for pid in new):
+                break
+            time.sleep(0.1)
+        self._signal(old, signal.SIGTERM)
+
+    def _stop(self):
+        print("Shutting down: draining workers", flush=True)
+        self._signal(list(self.children), signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        if self.children:
+            print(f"Killing {len(self.children)} workers still busy after "
+                  f"{self.graceful_timeout}s", flush=True)
+            self._signal(list(self.children), signal.SIGKILL)
+            while self.children:
+                pid, _ = os.waitpid(-1, 0)
+                self.children.pop(pid, None)
+        self.sock.close()
+
+    def _signal(self, pids, signum):
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (self.generation, time.monotonic())
+            return pid
+        code = 0
+        try:
+            self._worker()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # Never unwind back into the master's loop
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    # ---------------- worker ----------------
+    def _worker(self):
+        # Ctrl-C reaches the whole process group; the master coordinates the stop
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.close(self._ready_r)
+
+        import app as app_module
+        app = self.app or app_module.create_app()
+        app_module.init_worker(app)
+        server = PooledWSGIServer(self.sock, app, self.threads)
+
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever() to return, so not on this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        os.write(self._ready_w, f"{os.getpid()}\n".encode())
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            server.server_close()
+            self.sock.close()
+            server.drain()
+            app_module.shutdown_worker(app)
+
+
+if __name__ == "__main__":
+    Launcher().run()
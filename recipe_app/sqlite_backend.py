@@ -0,0 +1,282 @@
+"""
+SQLite engine for single-node installs, CI and in-process benchmarks.
+
+The app's SQL is written for MySQL through pymysql: "%s" placeholders,
+INSERT IGNORE, ON DUPLICATE KEY UPDATE ... VALUES(col), NOW(), RAND(),
+NOW() - INTERVAL n SECOND, TRUNCATE and SET FOREIGN_KEY_CHECKS. Connection
+and Cursor wrap sqlite3 with the pymysql surface the app relies on and
+rewrite each statement once (memoized per query string). The functions
+SQLite lacks (NOW, CRC32, CONCAT_WS, BIT_XOR) are registered on every
+connection.
+
+DATETIME columns come back as datetime objects, and datetime parameters
+are stored in MySQL's "YYYY-MM-DD HH:MM:SS" form, so keyset cursors and
+timestamp comparisons behave the same on both engines. NOW() and the
+column defaults use local time, like MySQL.
+
+Connections run in WAL mode, so readers never block the writer or each
+other, including across worker processes. Writes open with BEGIN
+IMMEDIATE and wait up to SQLITE_BUSY_TIMEOUT for the single write lock.
+They never fail halfway through on a read-to-write lock upgrade.
+"""
+import os
+import re
+import sqlite3
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_sqlite.sql")
+
+# Quoted literals are copied through untouched; placeholders become "?"
+_TOKEN_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|%\((\w+)\)s|%s|%%")
+_INSERT_IGNORE_RE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_RAND_RE = re.compile(r"\bRAND\(\s*\)", re.IGNORECASE)
+_INTERVAL_RE = re.compile(
+    r"\bNOW\(\)\s*([-+])\s*INTERVAL\s+(%s|\d+)\s+(SECOND|MINUTE|HOUR|DAY)\b", re.IGNORECASE
+)
+_UPSERT_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FN_RE = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+_TRUNCATE_RE = re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?`?(\w+)`?\s*;?\s*$", re.IGNORECASE)
+_FOREIGN_KEYS_RE = re.compile(r"^\s*SET\s+FOREIGN_KEY_CHECKS\s*=\s*([01])\s*;?\s*$", re.IGNORECASE)
+_INSERT_RE = re.compile(r"^\s*INSERT\b", re.IGNORECASE)
+
+
+def _interval(match):
+    sign, amount, unit = match.groups()
+    return f"DATETIME(NOW(), '{sign}' || {amount} || ' {unit.lower()}s')"
+
+
+def _placeholder(match):
+    text = match.group(0)
+    if text == "%s":
+        return "?"
+    if text == "%%":
+        return "%"
+    if match.group(1):
+        return f":{match.group(1)}"
+    return text
+
+
+@lru_cache(maxsize=1024)
+def translate(query, with_args=True):
+    """MySQL statement -> tuple of SQLite statements (TRUNCATE needs two)."""
+    match = _TRUNCATE_RE.match(query)
+    if match:
+        table = match.group(1)
+        return (f"DELETE FROM {table}", f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+
+    sql = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", query)
+    sql = _RAND_RE.sub("RANDOM()", sql)
+    sql = _INTERVAL_RE.sub(_interval, sql)
+    parts = _UPSERT_RE.split(sql, 1)
+    if len(parts) == 2:
+        sql = parts[0] + "ON CONFLICT DO UPDATE SET" + _VALUES_FN_RE.sub(r"excluded.\1", parts[1])
+    # Like pymysql, only format the statement when parameters were passed
+    if with_args:
+        sql = _TOKEN_RE.sub(_placeholder, sql)
+    return (sql,)
+
+
+def _param(value):
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _params(args):
+    if args is None:
+        return ()
+    if isinstance(args, dict):
+        return {key: _param(value) for key, value in args.items()}
+    if isinstance(args, (tuple, list)):
+        return tuple(_param(value) for value in args)
+    return (_param(args),)
+
+
+def _to_datetime(value):
+    return datetime.fromisoformat(value.decode("utf-8"))
+
+
+def _to_date(value):
+    return date.fromisoformat(value.decode("utf-8")[:10])
+
+
+sqlite3.register_converter("DATETIME", _to_datetime)
+sqlite3.register_converter("TIMESTAMP", _to_datetime)
+sqlite3.register_converter("DATE", _to_date)
+
+
+# ---------------- MySQL functions ----------------
+def _now():
+    return datetime.now().strftime(DATETIME_FORMAT)
+
+
+def _crc32(value):
+    if value is None:
+        return None
+    return zlib.crc32(str(value).encode("utf-8"))
+
+
+def _concat_ws(separator, *values):
+    if separator is None:
+        return None
+    return str(separator).join(str(value) for value in values if value is not None)
+
+
+class _BitXor(object):
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+class Cursor(object):
+    """The slice of pymysql's Cursor the app uses, over a sqlite3 cursor."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self.rowcount = -1
+        self.lastrowid = None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, args=None):
+        match = _FOREIGN_KEYS_RE.match(query)
+        if match:
+            self.connection.set_foreign_keys(match.group(1) == "1")
+            self.rowcount = 0
+            return 0
+        statements = translate(query, args is not None)
+        for sql in statements[:-1]:
+            self._cursor.execute(sql)
+        self._cursor.execute(statements[-1], _params(args))
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        return self.rowcount
+
+    def executemany(self, query, args):
+        rows = [_params(row) for row in args]
+        if not rows:
+            return None
+        (sql,) = translate(query, True)
+        self._cursor.executemany(sql, rows)
+        self.rowcount = self._cursor.rowcount
+        if _INSERT_RE.match(sql) and self.rowcount > 0:
+            # MySQL reports the first id of a multi-row INSERT, and the ids of
+            # one statement under the write lock are consecutive
+            last = self.connection.raw.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.lastrowid = last - self.rowcount + 1
+        return self.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection(object):
+    def __init__(self, raw):
+        self.raw = raw
+        self.cursorclass = Cursor
+        self._foreign_keys = None     # deferred PRAGMA, see set_foreign_keys()
+
+    def cursor(self, cursorclass=None):
+        return (cursorclass or self.cursorclass)(self)
+
+    def set_foreign_keys(self, enabled):
+        # PRAGMA foreign_keys is a no-op inside a transaction, so a toggle
+        # issued mid-transaction is applied once it ends
+        if self.raw.in_transaction:
+            self._foreign_keys = enabled
+        else:
+            self.raw.execute(f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'}")
+
+    def _transaction_ended(self):
+        if self._foreign_keys is not None:
+            enabled, self._foreign_keys = self._foreign_keys, None
+            self.set_foreign_keys(enabled)
+
+    def commit(self):
+        self.raw.commit()
+        self._transaction_ended()
+
+    def rollback(self):
+        self.raw.rollback()
+        self._transaction_ended()
+
+    def ping(self, reconnect=False):
+        self.raw.execute("SELECT 1").fetchone()
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteEngine(object):
+    def __init__(self, path, busy_timeout=5.0, cache_mb=64, mmap_mb=256, synchronous="NORMAL"):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.cache_mb = cache_mb
+        self.mmap_mb = mmap_mb
+        self.synchronous = synchronous
+
+    def connect(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level="IMMEDIATE",
+            check_same_thread=False,     # the pool hands a connection to one thread at a time
+            cached_statements=256,
+            uri=self.path.startswith("file:"),
+        )
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute(f"PRAGMA synchronous = {self.synchronous}")
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.execute("PRAGMA temp_store = MEMORY")
+        raw.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        raw.execute(f"PRAGMA cache_size = -{int(self.cache_mb * 1024)}")
+        raw.execute(f"PRAGMA mmap_size = {int(self.mmap_mb * 1024 * 1024)}")
+        raw.create_function("NOW", 0, _now)
+        raw.create_function("CRC32", 1, _crc32, deterministic=True)
+        raw.create_function("CONCAT_WS", -1, _concat_ws, deterministic=True)
+        raw.create_aggregate("BIT_XOR", 1, _BitXor)
+        return Connection(raw)
+
+    def bootstrap(self):
+        """Create any missing tables and indexes (idempotent)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not self.path.startswith("file:"):
+            os.makedirs(directory, exist_ok=True)
+        with open(SCHEMA_PATH, encoding="utf-8") as f:
+            script = f.read()
+        conn = self.connect()
+        try:
+            conn.raw.executescript(script)
+            conn.commit()
+        finally:
+            conn.close()
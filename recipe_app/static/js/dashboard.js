@@ -0,0 +1,1041 @@
+    /* ================= GLOBAL VARIABLES ================= */
+let currentTab = 'dashboard';
+let allRecipesCache = [];
+let myRecipesCache = [];
+let currentEditId = null;
+
+/* ================= DUMMY RECIPES ================= */
+const dummyRecipes = [
+    {
+        id: 1,
+        title: "Creamy Garlic Pasta",
+        description: "Delicious pasta with creamy garlic sauce and fresh herbs.",
+        image_url: "https://images.unsplash.com/photo-1565958011703-44f9829ba187?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "dinner",
+        difficulty: "easy",
+        prep_time: 10,
+        cook_time: 15,
+        servings: 2,
+        likes_count: 145,
+        video_url: "https://www.youtube.com/embed/example1",
+        ingredients: ["2 cups pasta", "4 cloves garlic", "1 cup heavy cream", "Parmesan cheese", "Fresh parsley"],
+        instructions: ["Cook pasta according to package directions.", "Sauté garlic in butter until fragrant.", "Add heavy cream and bring to simmer.", "Stir in Parmesan until melted.", "Toss pasta in sauce and serve."],
+        tags: ["pasta", "italian", "creamy", "garlic"],
+        author: "maria",
+        date: "2024-03-15"
+    },
+    {
+        id: 2,
+        title: "Grilled Salmon",
+        description: "Healthy salmon with lemon butter and asparagus.",
+        image_url: "https://images.unsplash.com/photo-1563379926898-05f4575a45d8?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "dinner",
+        difficulty: "medium",
+        prep_time: 15,
+        cook_time: 15,
+        servings: 2,
+        likes_count: 203,
+        video_url: "https://www.youtube.com/embed/example2",
+        ingredients: ["2 salmon fillets", "1 lemon", "2 tbsp butter", "Asparagus bunch", "Garlic powder"],
+        instructions: ["Season salmon with salt, pepper, and garlic powder.", "Grill for 6-7 minutes per side.", "Melt butter with lemon juice.", "Grill asparagus alongside salmon.", "Serve with lemon butter sauce."],
+        tags: ["salmon", "healthy", "grilled", "seafood"],
+        author: "maria",
+        date: "2024-03-10"
+    },
+    {
+        id: 3,
+        title: "Blueberry Pancakes",
+        description: "Fluffy pancakes with fresh blueberries and maple syrup.",
+        image_url: "https://images.unsplash.com/photo-1567620905732-2d1ec7ab7445?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "breakfast",
+        difficulty: "easy",
+        prep_time: 10,
+        cook_time: 15,
+        servings: 4,
+        likes_count: 98,
+        video_url: "",
+        ingredients: ["2 cups flour", "1 cup milk", "2 eggs", "1 cup blueberries", "Maple syrup"],
+        instructions: ["Mix dry ingredients in bowl.", "Whisk wet ingredients separately.", "Combine until just mixed.", "Fold in blueberries.", "Cook on griddle until golden."],
+        tags: ["breakfast", "pancakes", "sweet", "blueberries"],
+        author: "maria",
+        date: "2024-03-05"
+    },
+    {
+        id: 4,
+        title: "Bangladeshi Biryani",
+        description: "Aromatic Bangladeshi biryani with fragrant rice and tender meat.",
+        image_url: "https://images.unsplash.com/photo-1563379091339-03246963d9d6?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "dinner",
+        difficulty: "hard",
+        prep_time: 30,
+        cook_time: 60,
+        servings: 6,
+        likes_count: 342,
+        video_url: "https://www.youtube.com/embed/biryani",
+        ingredients: ["2 cups basmati rice", "1 kg chicken/goat", "2 onions", "4 tbsp biryani masala", "Yogurt", "Saffron", "Ghee"],
+        instructions: ["Marinate meat with spices and yogurt", "Fry onions until golden", "Layer rice and meat", "Cook on dum for 30 minutes", "Serve with raita"],
+        tags: ["biryani", "bangladeshi", "rice", "spicy"],
+        author: "chef_rana",
+        date: "2024-03-20"
+    },
+    {
+        id: 5,
+        title: "Hilsha Fish Curry",
+        description: "Traditional hilsha fish cooked with mustard and spices.",
+        image_url: "https://images.unsplash.com/photo-1574673360781-2cc27e1e6e2f?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "lunch",
+        difficulty: "medium",
+        prep_time: 20,
+        cook_time: 25,
+        servings: 4,
+        likes_count: 198,
+        video_url: "",
+        ingredients: ["4 pieces hilsha fish", "2 tbsp mustard paste", "Turmeric", "Green chilies", "Mustard oil", "Coriander leaves"],
+        instructions: ["Marinate fish with turmeric", "Heat mustard oil", "Add mustard paste and spices", "Add fish and cook gently", "Garnish with coriander"],
+        tags: ["hilsha", "bangladeshi", "fish", "mustard"],
+        author: "chef_rana",
+        date: "2024-03-18"
+    },
+    {
+        id: 6,
+        title: "Pitha",
+        description: "Traditional Bangladeshi rice cakes for winter.",
+        image_url: "https://images.unsplash.com/photo-1546833999-b9f581a1996d?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80",
+        category: "dessert",
+        difficulty: "hard",
+        prep_time: 60,
+        cook_time: 30,
+        servings: 8,
+        likes_count: 156,
+        video_url: "",
+        ingredients: ["2 cups rice flour", "1 cup coconut", "Jaggery", "Cardamom powder", "Milk", "Ghee"],
+        instructions: ["Make rice flour batter", "Prepare coconut-jaggery filling", "Shape pithas", "Steam or fry as desired", "Serve warm"],
+        tags: ["pitha", "bangladeshi", "dessert", "traditional"],
+        author: "chef_rana",
+        date: "2024-03-22"
+    }
+];
+
+/* ================= INITIALIZATION ================= */
+document.addEventListener('DOMContentLoaded', () => {
+    loadUser();
+
+    // Load dummy recipes immediately
+    renderDummyRecipes();
+
+    // Load real data from API
+    loadDashboard();
+    loadAllRecipes();
+
+    // Initialize search functionality
+    initializeSearch();
+});
+
+/* ================= USER FUNCTIONS ================= */
+async function loadUser() {
+    try {
+        const res = await fetch('/api/me');
+        const data = await res.json();
+
+        if (!data.success) {
+            location.href = '/login';
+            return;
+        }
+
+        document.querySelector('.top-bar h3').innerText = `Welcome, Chef ${data.user.username}!`;
+        document.querySelector('#profile-tab h2').innerText = data.user.username;
+    } catch (error) {
+        console.error('Error loading user:', error);
+        document.querySelector('.top-bar h3').innerText = 'Welcome, Chef!';
+    }
+}
+
+/* ================= TAB MANAGEMENT ================= */
+function switchTab(tab) {
+    currentTab = tab;
+
+    // Update active tab in sidebar
+    document.querySelectorAll('.nav-item')
+        .forEach(item => item.classList.remove('active'));
+
+    const targetNavItem = Array.from(document.querySelectorAll('.nav-item'))
+        .find(item => item.getAttribute('onclick')?.includes(`switchTab('${tab}')`));
+
+    if (targetNavItem) {
+        targetNavItem.classList.add('active');
+    }
+
+    // Show selected tab content
+    document.querySelectorAll('.tab-content')
+        .forEach(t => t.classList.remove('active'));
+
+    document.getElementById(`${tab}-tab`).classList.add('active');
+
+    // Load data for the tab
+    switch(tab) {
+        case 'dashboard':
+            loadDashboard();
+            break;
+        case 'recipes':
+            loadAllRecipes();
+            break;
+        case 'categories':
+            loadCategories();
+            break;
+        case 'my-recipes':
+            loadMyRecipes();
+            break;
+        case 'profile':
+            loadProfile();
+            break;
+    }
+}
+
+/* ================= DASHBOARD FUNCTIONS ================= */
+async function loadDashboard() {
+    try {
+        const res = await fetch('/api/dashboard/stats');
+        const data = await res.json();
+
+        if (data.success) {
+            document.getElementById('totalRecipes').innerText = data.stats.total_recipes || '0';
+            document.getElementById('totalFavorites').innerText = data.stats.total_likes || '0';
+            document.getElementById('totalViews').innerText = data.stats.total_views || '0';
+
+            if (data.recent_recipes && data.recent_recipes.length > 0) {
+                renderRecipes(data.recent_recipes, 'recentRecipes');
+            }
+        }
+    } catch (error) {
+        console.error('Error loading dashboard:', error);
+    }
+}
+
+/* ================= RECIPE FUNCTIONS ================= */
+async function loadAllRecipes(filters = {}) {
+    try {
+        let url = '/api/recipes?';
+
+        Object.keys(filters).forEach(k => {
+            if (filters[k]) url += `${k}=${filters[k]}&`;
+        });
+
+        const res = await fetch(url);
+        const data = await res.json();
+
+        if (data.success && data.recipes && data.recipes.length > 0) {
+            allRecipesCache = data.recipes;
+            renderRecipes(allRecipesCache, 'allRecipes');
+        } else {
+            // Fallback to dummy recipes
+            renderDummyRecipesInSection('allRecipes');
+        }
+    } catch (error) {
+        console.error('Error loading recipes:', error);
+        renderDummyRecipesInSection('allRecipes');
+    }
+}
+
+async function loadMyRecipes() {
+    try {
+        const res = await fetch('/api/recipes?mine=1');
+        const data = await res.json();
+
+        if (data.success) {
+            myRecipesCache = data.recipes;
+            renderRecipes(myRecipesCache, 'allRecipes');
+        } else {
+            // Show message if no recipes
+            document.getElementById('allRecipes').innerHTML = `
+                <div style="text-align: center; padding: 40px;">
+                    <i class="fas fa-book" style="font-size: 60px; color: var(--gray); margin-bottom: 20px;"></i>
+                    <h3>No recipes yet</h3>
+                    <p>Create your first recipe to get started!</p>
+                    <button class="btn btn-primary" onclick="switchTab('create')" style="margin-top: 20px;">
+                        <i class="fas fa-plus"></i> Create Recipe
+                    </button>
+                </div>
+            `;
+        }
+    } catch (error) {
+        console.error('Error loading my recipes:', error);
+    }
+}
+
+async function loadCategories() {
+    try {
+        const res = await fetch('/api/categories');
+        const data = await res.json();
+
+        if (data.success) {
+            renderRecipes(data.recipes || dummyRecipes, 'categoryRecipes');
+        } else {
+            renderDummyRecipesInSection('categoryRecipes');
+        }
+    } catch (error) {
+        console.error('Error loading categories:', error);
+        renderDummyRecipesInSection('categoryRecipes');
+    }
+}
+
+/* ================= RENDER FUNCTIONS ================= */
+function renderDummyRecipes() {
+    // Render in dashboard
+    renderDummyRecipesInSection('recentRecipes');
+    // Render in all recipes
+    renderDummyRecipesInSection('allRecipes');
+    // Render in categories
+    renderDummyRecipesInSection('categoryRecipes');
+}
+
+function renderDummyRecipesInSection(containerId) {
+    const container = document.getElementById(containerId);
+    if (!container) return;
+
+    container.innerHTML = '';
+
+    // Select recipes based on container
+    let recipesToShow = [...dummyRecipes];
+
+    if (containerId === 'recentRecipes') {
+        recipesToShow = dummyRecipes.slice(0, 3);
+    }
+
+    recipesToShow.forEach(recipe => {
+        container.innerHTML += `
+            <div class="recipe-card" onclick="viewRecipe(${recipe.id})">
+                <div class="recipe-image">
+                    <img src="${recipe.image_url}" alt="${recipe.title}" onerror="this.src='https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80'">
+                    ${recipe.video_url ? `<div class="recipe-video-icon"><i class="fas fa-play"></i> Video</div>` : ''}
+                </div>
+                <div class="recipe-content">
+                    <h4>${recipe.title}</h4>
+                    <div class="recipe-meta">
+                        <span><i class="fas fa-clock"></i> ${recipe.prep_time + recipe.cook_time} min</span>
+                        <span><i class="fas fa-user-friends"></i> ${recipe.servings} servings</span>
+                        <span><i class="fas fa-heart"></i> ${recipe.likes_count}</span>
+                    </div>
+                    <p style="color: var(--gray); margin: 10px 0; font-size: 14px; height: 40px; overflow: hidden;">${recipe.description}</p>
+                    <div class="recipe-tags">
+                        ${recipe.tags.slice(0, 3).map(tag => `<span class="tag">${tag}</span>`).join('')}
+                        ${recipe.tags.length > 3 ? `<span class="tag">+${recipe.tags.length - 3}</span>` : ''}
+                    </div>
+                    <div class="recipe-actions">
+                        <button class="btn-small btn-view" onclick="event.stopPropagation(); viewRecipe(${recipe.id})">
+                            <i class="fas fa-eye"></i> View
+                        </button>
+                        <button class="btn-small btn-edit" onclick="event.stopPropagation(); editRecipe(${recipe.id})">
+                            <i class="fas fa-edit"></i> Edit
+                        </button>
+                        <button class="btn-small btn-delete" onclick="event.stopPropagation(); deleteRecipe(${recipe.id})">
+                            <i class="fas fa-trash"></i> Delete
+                        </button>
+                    </div>
+                </div>
+            </div>
+        `;
+    });
+}
+
+function renderRecipes(recipes, containerId) {
+    const container = document.getElementById(containerId);
+    if (!container || !recipes || recipes.length === 0) return;
+
+    container.innerHTML = '';
+
+    recipes.forEach(recipe => {
+        const hasVideo = recipe.video_url && recipe.video_url.trim() !== '';
+        const totalTime = (recipe.prep_time || 0) + (recipe.cook_time || 0);
+
+        container.innerHTML += `
+            <div class="recipe-card" onclick="viewRecipe(${recipe.id})">
+                <div class="recipe-image">
+                    <img src="${recipe.image_url || 'https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80'}" 
+                         alt="${recipe.title}"
+                         onerror="this.src='https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80'">
+                    ${hasVideo ? `<div class="recipe-video-icon"><i class="fas fa-play"></i> Video</div>` : ''}
+                </div>
+                <div class="recipe-content">
+                    <h4>${recipe.title || 'Untitled Recipe'}</h4>
+                    <div class="recipe-meta">
+                        <span><i class="fas fa-clock"></i> ${totalTime} min</span>
+                        <span><i class="fas fa-user-friends"></i> ${recipe.servings || 2} servings</span>
+                        <span><i class="fas fa-heart"></i> ${recipe.likes_count || 0}</span>
+                    </div>
+                    <p style="color: var(--gray); margin: 10px 0; font-size: 14px; height: 40px; overflow: hidden;">
+                        ${recipe.description || 'No description available.'}
+                    </p>
+                    <div class="recipe-tags">
+                        ${Array.isArray(recipe.tags) && recipe.tags.length > 0 
+                            ? recipe.tags.slice(0, 3).map(tag => `<span class="tag">${tag}</span>`).join('') 
+                            : '<span class="tag">No tags</span>'}
+                    </div>
+                    <div class="recipe-actions">
+                        <button class="btn-small btn-view" onclick="event.stopPropagation(); viewRecipe(${recipe.id})">
+                            <i class="fas fa-eye"></i> View
+                        </button>
+                        <button class="btn-small btn-edit" onclick="event.stopPropagation(); editRecipe(${recipe.id})">
+                            <i class="fas fa-edit"></i> Edit
+                        </button>
+                        <button class="btn-small btn-delete" onclick="event.stopPropagation(); deleteRecipe(${recipe.id})">
+                            <i class="fas fa-trash"></i> Delete
+                        </button>
+                    </div>
+                </div>
+            </div>
+        `;
+    });
+}
+
+/* ================= SEARCH FUNCTIONALITY ================= */
+function initializeSearch() {
+    const searchInput = document.getElementById('searchInput');
+    const searchResults = document.getElementById('searchResults');
+
+    if (!searchInput) return;
+
+    function debounce(fn, delay = 500) {
+        let timeout;
+        return (...args) => {
+            clearTimeout(timeout);
+            timeout = setTimeout(() => fn(...args), delay);
+        };
+    }
+
+    // Search in dummy recipes
+    function searchInDummyRecipes(query) {
+        const lowerQuery = query.toLowerCase().trim();
+        if (!lowerQuery) return [];
+
+        return dummyRecipes.filter(recipe => 
+            recipe.title.toLowerCase().includes(lowerQuery) ||
+            recipe.description.toLowerCase().includes(lowerQuery) ||
+            recipe.tags.some(tag => tag.toLowerCase().includes(lowerQuery)) ||
+            recipe.ingredients.some(ing => ing.toLowerCase().includes(lowerQuery)) ||
+            recipe.category.toLowerCase().includes(lowerQuery)
+        );
+    }
+
+    searchInput.addEventListener('input', debounce(async function() {
+        const query = this.value.trim();
+
+        if (!query) {
+            if (searchResults) searchResults.innerHTML = '';
+            return;
+        }
+
+        // Server-side search first, dummy recipes only as an offline fallback
+        let localResults = [];
+        try {
+            const res = await fetch(`/api/search?q=${encodeURIComponent(this.value)}&limit=12`);
+            const data = await res.json();
+            if (data.success) localResults = data.results;
+        } catch (error) {
+            console.error('Search API error:', error);
+        }
+        if (localResults.length === 0) {
+            localResults = searchInDummyRecipes(query);
+        }
+
+        if (localResults.length > 0) {
+            renderSearchResults(localResults);
+        } else {
+            // Try Gemini API
+            try {
+                const recipe = await fetchRecipeFromGemini(query);
+                if (recipe) {
+                    renderGeminiRecipe(recipe);
+                } else {
+                    showNoResults();
+                }
+            } catch (error) {
+                console.error('Search error:', error);
+                showSearchError();
+                renderSearchResults(dummyRecipes.slice(0, 3));
+            }
+        }
+    }, 500));
+}
+
+function renderSearchResults(recipes) {
+    const searchResults = document.getElementById('searchResults');
+    if (!searchResults) return;
+
+    if (recipes.length === 0) {
+        showNoResults();
+        return;
+    }
+
+    searchResults.innerHTML = `
+        <div class="search-results">
+            <h3 style="margin-bottom: 15px; color: var(--dark);">
+                <i class="fas fa-search"></i> Search Results (${recipes.length})
+            </h3>
+            <div class="recipes-grid">
+                ${recipes.map(recipe => `
+                    <div class="recipe-card" onclick="viewRecipe(${recipe.id})">
+                        <div class="recipe-image">
+                            <img src="${recipe.image_url}" alt="${recipe.title}">
+                            ${recipe.video_url ? `<div class="recipe-video-icon"><i class="fas fa-play"></i> Video</div>` : ''}
+                        </div>
+                        <div class="recipe-content">
+                            <h4>${recipe.title}</h4>
+                            <div class="recipe-meta">
+                                <span><i class="fas fa-clock"></i> ${recipe.prep_time + recipe.cook_time} min</span>
+                                <span><i class="fas fa-heart"></i> ${recipe.likes_count}</span>
+                            </div>
+                            <p style="color: var(--gray); font-size: 14px;">${recipe.description}</p>
+                            <div class="recipe-tags">
+                                ${recipe.tags.slice(0, 3).map(tag => `<span class="tag">${tag}</span>`).join('')}
+                            </div>
+                            <button class="btn-small btn-view" onclick="event.stopPropagation(); viewRecipe(${recipe.id})" style="margin-top: 10px; width: 100%;">
+                                <i class="fas fa-eye"></i> View Recipe
+                            </button>
+                        </div>
+                    </div>
+                `).join('')}
+            </div>
+        </div>
+    `;
+}
+
+function showNoResults() {
+    const searchResults = document.getElementById('searchResults');
+    if (!searchResults) return;
+
+    searchResults.innerHTML = `
+        <div class="no-results" style="text-align: center; padding: 40px; background: white; border-radius: 15px; box-shadow: var(--shadow);">
+            <i class="fas fa-search" style="font-size: 60px; color: var(--gray); margin-bottom: 20px;"></i>
+            <h3 style="margin-bottom: 10px;">No recipes found</h3>
+            <p style="color: var(--gray);">Try searching with different keywords</p>
+            <button class="btn btn-primary" onclick="switchTab('create')" style="margin-top: 20px;">
+                <i class="fas fa-plus"></i> Create this Recipe
+            </button>
+        </div>
+    `;
+}
+
+function showSearchError() {
+    const searchResults = document.getElementById('searchResults');
+    if (!searchResults) return;
+
+    searchResults.innerHTML = `
+        <div class="search-error" style="text-align: center; padding: 20px; color: var(--primary); background: white; border-radius: 10px;">
+            <i class="fas fa-exclamation-triangle"></i>
+            <p>Search service unavailable. Showing popular recipes instead.</p>
+        </div>
+    `;
+}
+
+/* ================= GEMINI API FUNCTIONS ================= */
+async function fetchRecipeFromGemini(query) {
+    try {
+        const res = await fetch('/api/gemini/recipe', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ prompt: query })
+        });
+
+        const data = await res.json();
+
+        if (data.success) {
+            // Generate a unique ID for the Gemini recipe
+            const geminiRecipe = {
+                id: Date.now(),
+                title: data.title || query,
+                description: data.description || `A delicious ${query} recipe created by AI`,
+                image_url: data.image_url || `https://source.unsplash.com/600x400/?${query.replace(/\s+/g, ',')}`,
+                ingredients: Array.isArray(data.ingredients) ? data.ingredients : 
+                            typeof data.ingredients === 'string' ? data.ingredients.split('\n') : 
+                            ["Main ingredient", "Seasoning", "Oil"],
+                instructions: Array.isArray(data.instructions) ? data.instructions :
+                            typeof data.instructions === 'string' ? data.instructions.split('\n') :
+                            ["Prepare ingredients", "Cook as directed", "Serve hot"],
+                category: data.category || 'dinner',
+                difficulty: data.difficulty || 'medium',
+                servings: data.servings || 4,
+                prep_time: data.prep_time || 15,
+                cook_time: data.cook_time || 30,
+                likes_count: 0,
+                tags: query.split(' ').slice(0, 3).concat(['ai-generated']),
+                author: 'AI Chef',
+                video_url: ''
+            };
+
+            return geminiRecipe;
+        }
+        return null;
+    } catch (err) {
+        console.error('Gemini API error:', err);
+        return null;
+    }
+}
+
+function renderGeminiRecipe(recipe) {
+    const searchResults = document.getElementById('searchResults');
+    if (!searchResults) return;
+
+    searchResults.innerHTML = `
+        <div class="search-results">
+            <h3 style="margin-bottom: 15px; color: var(--dark);">
+                <i class="fas fa-robot"></i> AI Generated Recipe
+            </h3>
+            <div class="recipe-card" style="max-width: 800px; margin: 0 auto;">
+                <div class="recipe-image">
+                    <img src="${recipe.image_url}" alt="${recipe.title}">
+                    <div class="recipe-video-icon" style="background: var(--accent);">
+                        <i class="fas fa-robot"></i> AI Generated
+                    </div>
+                </div>
+                <div class="recipe-content">
+                    <h4>${recipe.title}</h4>
+                    <div class="recipe-meta">
+                        <span><i class="fas fa-clock"></i> ${recipe.prep_time + recipe.cook_time} min</span>
+                        <span><i class="fas fa-user-friends"></i> ${recipe.servings} servings</span>
+                        <span><i class="fas fa-robot"></i> AI Chef</span>
+                    </div>
+                    <p style="color: var(--gray); margin: 15px 0;">${recipe.description}</p>
+
+                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin: 20px 0;">
+                        <div>
+                            <h5 style="margin-bottom: 10px; color: var(--dark);">
+                                <i class="fas fa-list"></i> Ingredients
+                            </h5>
+                            <ul style="padding-left: 20px; color: var(--gray);">
+                                ${recipe.ingredients.map(ing => `<li>${ing}</li>`).join('')}
+                            </ul>
+                        </div>
+                        <div>
+                            <h5 style="margin-bottom: 10px; color: var(--dark);">
+                                <i class="fas fa-tasks"></i> Instructions
+                            </h5>
+                            <ol style="padding-left: 20px; color: var(--gray);">
+                                ${recipe.instructions.map((step, i) => `<li>${step}</li>`).join('')}
+                            </ol>
+                        </div>
+                    </div>
+
+                    <div class="recipe-tags">
+                        ${recipe.tags.map(tag => `<span class="tag">${tag}</span>`).join('')}
+                    </div>
+
+                    <div class="recipe-actions" style="margin-top: 20px; display: flex; gap: 10px;">
+                        <button class="btn btn-success" onclick="saveGeminiRecipe(${JSON.stringify(recipe).replace(/"/g, '&quot;')})">
+                            <i class="fas fa-save"></i> Save Recipe
+                        </button>
+                        <button class="btn btn-primary" onclick="customizeGeminiRecipe(${JSON.stringify(recipe).replace(/"/g, '&quot;')})">
+                            <i class="fas fa-edit"></i> Customize
+                        </button>
+                        <button class="btn" onclick="document.getElementById('searchResults').innerHTML = ''">
+                            <i class="fas fa-times"></i> Close
+                        </button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+function saveGeminiRecipe(recipe) {
+    // Convert string to object if needed
+    const recipeObj = typeof recipe === 'string' ? JSON.parse(recipe) : recipe;
+
+    alert(`Recipe "${recipeObj.title}" has been saved! You can find it in "My Recipes" section.`);
+
+    // Add to dummy recipes temporarily
+    recipeObj.id = Date.now();
+    dummyRecipes.unshift(recipeObj);
+
+    // Update UI
+    if (currentTab === 'my-recipes') {
+        loadMyRecipes();
+    }
+
+    // Clear search results
+    const searchResults = document.getElementById('searchResults');
+    if (searchResults) searchResults.innerHTML = '';
+
+    document.getElementById('searchInput').value = '';
+}
+
+function customizeGeminiRecipe(recipe) {
+    const recipeObj = typeof recipe === 'string' ? JSON.parse(recipe) : recipe;
+
+    // Switch to create tab and populate form
+    switchTab('create');
+
+    // Populate form with AI recipe
+    setTimeout(() => {
+        document.getElementById('recipeTitle').value = recipeObj.title;
+        document.getElementById('recipeDescription').value = recipeObj.description;
+        document.getElementById('recipeCategory').value = recipeObj.category;
+        document.getElementById('recipeDifficulty').value = recipeObj.difficulty;
+        document.getElementById('prepTime').value = recipeObj.prep_time;
+        document.getElementById('cookTime').value = recipeObj.cook_time;
+        document.getElementById('servings').value = recipeObj.servings;
+        document.getElementById('recipeIngredients').value = Array.isArray(recipeObj.ingredients) 
+            ? recipeObj.ingredients.join('\n') 
+            : recipeObj.ingredients;
+        document.getElementById('recipeInstructions').value = Array.isArray(recipeObj.instructions)
+            ? recipeObj.instructions.join('\n')
+            : recipeObj.instructions;
+        document.getElementById('recipeImage').value = recipeObj.image_url;
+        document.getElementById('recipeTags').value = Array.isArray(recipeObj.tags)
+            ? recipeObj.tags.join(', ')
+            : recipeObj.tags;
+
+        // Show success message
+        const formSection = document.querySelector('#create-tab .form-section');
+        if (formSection) {
+            const message = document.createElement('div');
+            message.innerHTML = `
+                <div style="background: var(--success); color: white; padding: 10px 15px; border-radius: 8px; margin-bottom: 20px;">
+                    <i class="fas fa-magic"></i> AI Recipe loaded! Customize it as you like.
+                </div>
+            `;
+            formSection.insertBefore(message, formSection.firstChild);
+        }
+    }, 300);
+}
+
+/* ================= RECIPE DETAIL VIEW ================= */
+async function viewRecipe(id) {
+    // Try to find recipe in dummy recipes first
+    let recipe = dummyRecipes.find(r => r.id === id);
+
+    if (!recipe) {
+        try {
+            const res = await fetch(`/api/recipes/${id}`);
+            const data = await res.json();
+            if (data.success) {
+                recipe = data.recipe;
+            } else {
+                alert('Recipe not found');
+                return;
+            }
+        } catch (error) {
+            console.error('Error fetching recipe:', error);
+            alert('Error loading recipe');
+            return;
+        }
+    }
+
+    // Set modal content
+    document.getElementById('modalRecipeTitle').innerText = recipe.title;
+
+    document.getElementById('modalIngredients').innerHTML = 
+        `<ul>${Array.isArray(recipe.ingredients) 
+            ? recipe.ingredients.map(i => `<li>${i}</li>`).join('') 
+            : '<li>No ingredients listed</li>'}</ul>`;
+
+    document.getElementById('modalInstructions').innerHTML = 
+        `<ol>${Array.isArray(recipe.instructions) 
+            ? recipe.instructions.map(i => `<li>${i}</li>`).join('') 
+            : '<li>No instructions provided</li>'}</ol>`;
+
+    document.getElementById('modalDetails').innerHTML = `
+        <p><b>Category:</b> ${recipe.category || 'Not specified'}</p>
+        <p><b>Difficulty:</b> ${recipe.difficulty || 'Not specified'}</p>
+        <p><b>Prep Time:</b> ${recipe.prep_time || 0} min</p>
+        <p><b>Cook Time:</b> ${recipe.cook_time || 0} min</p>
+        <p><b>Total Time:</b> ${(recipe.prep_time || 0) + (recipe.cook_time || 0)} min</p>
+        <p><b>Servings:</b> ${recipe.servings || 2}</p>
+        <p><b>Author:</b> ${recipe.author || 'Unknown'}</p>
+        <p><b>Likes:</b> ${recipe.likes_count || 0}</p>
+    `;
+
+    // Handle video
+    const modalVideoContainer = document.getElementById('modalVideoContainer');
+    if (recipe.video_url && recipe.video_url.trim() !== '') {
+        let embedUrl = recipe.video_url;
+
+        // Convert YouTube URL to embed URL
+        if (recipe.video_url.includes('youtube.com') || recipe.video_url.includes('youtu.be')) {
+            let videoId = '';
+            if (recipe.video_url.includes('youtu.be')) {
+                videoId = recipe.video_url.split('/').pop();
+            } else {
+                const urlParams = new URLSearchParams(new URL(recipe.video_url).search);
+                videoId = urlParams.get('v');
+            }
+            if (videoId) {
+                embedUrl = `https://www.youtube.com/embed/${videoId}`;
+            }
+        }
+
+        modalVideoContainer.innerHTML = `
+            <iframe src="${embedUrl}" 
+                    width="100%" 
+                    height="400" 
+                    frameborder="0" 
+                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" 
+                    allowfullscreen>
+            </iframe>
+        `;
+    } else {
+        modalVideoContainer.innerHTML = `
+            <img src="${recipe.image_url || 'https://images.unsplash.com/photo-1546069901-ba9599a7e63c?ixlib=rb-4.0.3&auto=format&fit=crop&w=600&q=80'}" 
+                 style="width: 100%; height: 400px; object-fit: cover; border-radius: 10px;"
+                 alt="${recipe.title}">
+        `;
+    }
+
+    // Show modal
+    document.getElementById('recipeModal').style.display = 'block';
+}
+
+function closeModal() {
+    document.getElementById('recipeModal').style.display = 'none';
+}
+
+/* ================= CREATE/EDIT RECIPE ================= */
+async function createRecipe(e) {
+    e.preventDefault();
+
+    const recipeData = {
+        title: document.getElementById('recipeTitle').value,
+        description: document.getElementById('recipeDescription').value,
+        category: document.getElementById('recipeCategory').value,
+        difficulty: document.getElementById('recipeDifficulty').value,
+        prep_time: parseInt(document.getElementById('prepTime').value) || 0,
+        cook_time: parseInt(document.getElementById('cookTime').value) || 0,
+        servings: parseInt(document.getElementById('servings').value) || 2,
+        ingredients: document.getElementById('recipeIngredients').value.split('\n').filter(line => line.trim()),
+        instructions: document.getElementById('recipeInstructions').value.split('\n').filter(line => line.trim()),
+        tags: document.getElementById('recipeTags').value.split(',').map(tag => tag.trim()).filter(tag => tag),
+        image_url: document.getElementById('recipeImage').value,
+        video_url: document.getElementById('recipeVideo').value
+    };
+
+    // Validate required fields
+    if (!recipeData.title || !recipeData.description) {
+        alert('Title and description are required!');
+        return;
+    }
+
+    try {
+        const url = currentEditId ? `/api/recipes/${currentEditId}` : '/api/recipes';
+        const method = currentEditId ? 'PUT' : 'POST';
+
+        const res = await fetch(url, {
+            method: method,
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(recipeData)
+        });
+
+        const data = await res.json();
+
+        if (data.success) {
+            alert(currentEditId ? 'Recipe updated successfully!' : 'Recipe created successfully!');
+
+            // Reset form
+            document.getElementById('recipeForm').reset();
+            currentEditId = null;
+
+            // Reload data
+            if (currentTab === 'dashboard') loadDashboard();
+            if (currentTab === 'recipes') loadAllRecipes();
+            if (currentTab === 'my-recipes') loadMyRecipes();
+
+            // Switch to dashboard
+            switchTab('dashboard');
+        } else {
+            alert(data.message || 'Error saving recipe');
+        }
+    } catch (error) {
+        console.error('Error saving recipe:', error);
+        alert('Error saving recipe. Please try again.');
+    }
+}
+
+function saveAsDraft() {
+    alert('Draft saved! (This feature would save to database in a real app)');
+}
+
+async function editRecipe(id) {
+    // Try to find recipe in dummy recipes first
+    let recipe = dummyRecipes.find(r => r.id === id);
+
+    if (!recipe) {
+        try {
+            const res = await fetch(`/api/recipes/${id}`);
+            const data = await res.json();
+            if (data.success) {
+                recipe = data.recipe;
+            } else {
+                alert('Recipe not found');
+                return;
+            }
+        } catch (error) {
+            console.error('Error fetching recipe:', error);
+            alert('Error loading recipe');
+            return;
+        }
+    }
+
+    currentEditId = id;
+    switchTab('create');
+
+    // Populate form with recipe data
+    setTimeout(() => {
+        document.getElementById('recipeTitle').value = recipe.title || '';
+        document.getElementById('recipeDescription').value = recipe.description || '';
+        document.getElementById('recipeCategory').value = recipe.category || '';
+        document.getElementById('recipeDifficulty').value = recipe.difficulty || '';
+        document.getElementById('prepTime').value = recipe.prep_time || 0;
+        document.getElementById('cookTime').value = recipe.cook_time || 0;
+        document.getElementById('servings').value = recipe.servings || 2;
+        document.getElementById('recipeIngredients').value = Array.isArray(recipe.ingredients) 
+            ? recipe.ingredients.join('\n') 
+            : recipe.ingredients || '';
+        document.getElementById('recipeInstructions').value = Array.isArray(recipe.instructions)
+            ? recipe.instructions.join('\n')
+            : recipe.instructions || '';
+        document.getElementById('recipeImage').value = recipe.image_url || '';
+        document.getElementById('recipeVideo').value = recipe.video_url || '';
+        document.getElementById('recipeTags').value = Array.isArray(recipe.tags)
+            ? recipe.tags.join(', ')
+            : recipe.tags || '';
+
+        // Scroll to top
+        window.scrollTo(0, 0);
+    }, 300);
+}
+
+async function deleteRecipe(id) {
+    if (!confirm('Are you sure you want to delete this recipe?')) return;
+
+    // Remove from dummy recipes if exists
+    const dummyIndex = dummyRecipes.findIndex(r => r.id === id);
+    if (dummyIndex !== -1) {
+        dummyRecipes.splice(dummyIndex, 1);
+    }
+
+    try {
+        const res = await fetch(`/api/recipes/${id}`, { method: 'DELETE' });
+        const data = await res.json();
+
+        if (data.success) {
+            alert('Recipe deleted successfully!');
+
+            // Reload data
+            if (currentTab === 'dashboard') loadDashboard();
+            if (currentTab === 'recipes') loadAllRecipes();
+            if (currentTab === 'my-recipes') loadMyRecipes();
+        } else {
+            alert(data.message || 'Error deleting recipe');
+        }
+    } catch (error) {
+        console.error('Error deleting recipe:', error);
+        alert('Error deleting recipe. Please try again.');
+    }
+}
+
+/* ================= FILTER FUNCTIONS ================= */
+function filterRecipes() {
+    const filters = {
+        category: document.getElementById('categoryFilter').value,
+        difficulty: document.getElementById('difficultyFilter').value,
+        time: document.getElementById('timeFilter').value
+    };
+
+    loadAllRecipes(filters);
+}
+
+function filterByCategory(category) {
+    // Switch to recipes tab
+    switchTab('recipes');
+
+    // Set category filter
+    document.getElementById('categoryFilter').value = category;
+
+    // Apply filter
+    setTimeout(() => {
+        filterRecipes();
+    }, 100);
+}
+
+/* ================= PROFILE FUNCTIONS ================= */
+async function loadProfile() {
+    try {
+        const res = await fetch('/api/me');
+        const data = await res.json();
+
+        if (data.success) {
+            document.getElementById('profileName').value = data.user.username || '';
+            document.getElementById('profileEmail').value = data.user.email || '';
+            document.getElementById('profileBio').value = data.user.bio || '';
+            document.getElementById('profileLocation').value = data.user.location || '';
+            document.getElementById('profileWebsite').value = data.user.website || '';
+            document.getElementById('profileInterests').value = data.user.interests || '';
+        }
+    } catch (error) {
+        console.error('Error loading profile:', error);
+    }
+}
+
+async function updateProfile() {
+    const profileData = {
+        username: document.getElementById('profileName').value,
+        email: document.getElementById('profileEmail').value,
+        bio: document.getElementById('profileBio').value,
+        location: document.getElementById('profileLocation').value,
+        website: document.getElementById('profileWebsite').value,
+        interests: document.getElementById('profileInterests').value
+    };
+
+    try {
+        const res = await fetch('/api/profile', {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(profileData)
+        });
+
+        const data = await res.json();
+
+        if (data.success) {
+            alert('Profile updated successfully!');
+            // Update welcome message
+            document.querySelector('.top-bar h3').innerText = `Welcome, Chef ${profileData.username}!`;
+        } else {
+            alert(data.message || 'Error updating profile');
+        }
+    } catch (error) {
+        console.error('Error updating profile:', error);
+        alert('Error updating profile');
+    }
+}
+
+/* ================= SETTINGS FUNCTIONS ================= */
+function deleteAccount() {
+    if (confirm('Are you sure you want to delete your account? This action cannot be undone.')) {
+        alert('Account deletion would be processed here. (This is a demo feature)');
+        // In real app: fetch('/api/account', { method: 'DELETE' });
+    }
+}
+
+/* ================= UTILITY FUNCTIONS ================= */
+function logout() {
+    if (confirm('Are you sure you want to logout?')) {
+        window.location.href = '/logout';
+    }
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('recipeModal');
+    if (event.target === modal) {
+        closeModal();
+    }
+}
+
+// Handle Escape key to close modal
+document.addEventListener('keydown', function(event) {
+    if (event.key === 'Escape') {
+        closeModal();
+    }
+});
@@ -0,0 +1,274 @@
+    // DOM Elements
+    const authModal = document.getElementById('authModal');
+    const loginBtn = document.getElementById('loginBtn');
+    const registerBtn = document.getElementById('registerBtn');
+    const closeModal = document.getElementById('closeModal');
+    const exploreRecipesBtn = document.getElementById('exploreRecipes');
+    const joinCommunityBtn = document.getElementById('joinCommunityBtn');
+    const authTabs = document.querySelectorAll('.auth-tab');
+    const authForms = document.querySelectorAll('.auth-form form');
+    const switchLinks = document.querySelectorAll('.switch-link');
+    const forgotLinks = document.querySelectorAll('.forgot-link');
+    const mobileMenuBtn = document.getElementById('mobileMenuBtn');
+    const navLinks = document.querySelector('.nav-links');
+
+    // Open modal functions
+    function openAuthModal(tabName) {
+        authModal.classList.add('active');
+        switchTab(tabName);
+    }
+
+    // Close modal
+    closeModal.addEventListener('click', () => {
+        authModal.classList.remove('active');
+    });
+
+    // Close modal when clicking outside
+    authModal.addEventListener('click', (e) => {
+        if (e.target === authModal) {
+            authModal.classList.remove('active');
+        }
+    });
+
+
+    function switchTab(tabName) {
+
+        authTabs.forEach(tab => {
+            if (tab.dataset.tab === tabName) {
+                tab.classList.add('active');
+            } else {
+                tab.classList.remove('active');
+            }
+        });
+
+
+        authForms.forEach(form => {
+            if (form.id === `${tabName}Form`) {
+                form.classList.add('active');
+            } else {
+                form.classList.remove('active');
+            }
+        });
+    }
+
+
+    authTabs.forEach(tab => {
+        tab.addEventListener('click', () => {
+            switchTab(tab.dataset.tab);
+        });
+    });
+
+
+    switchLinks.forEach(link => {
+        link.addEventListener('click', (e) => {
+            e.preventDefault();
+            switchTab(link.dataset.tab);
+        });
+    });
+
+
+    forgotLinks.forEach(link => {
+        link.addEventListener('click', (e) => {
+            e.preventDefault();
+            openAuthModal('forgot');
+        });
+    });
+
+
+    loginBtn.addEventListener('click', () => openAuthModal('login'));
+    registerBtn.addEventListener('click', () => openAuthModal('register'));
+    exploreRecipesBtn.addEventListener('click', () => {
+        document.querySelector('#recipes').scrollIntoView({ behavior: 'smooth' });
+    });
+    joinCommunityBtn.addEventListener('click', () => openAuthModal('register'));
+
+
+    document.getElementById('loginForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+
+        const email = document.getElementById('loginEmail').value;
+        const password = document.getElementById('loginPassword').value;
+
+        try {
+            const response = await fetch('/api/login', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({username: email, password: password})
+            });
+
+            const data = await response.json();
+
+            if (data.success) {
+                         alert('login successful!');
+                        window.location.href = "/dashboard";
+                } else {
+                alert('Login failed: ' + data.message);
+            }
+        } catch (error) {
+            alert('netword error');
+        }
+    });
+
+
+    document.getElementById('registerForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+
+        const name = document.getElementById('registerName').value;
+        const email = document.getElementById('registerEmail').value;
+        const password = document.getElementById('registerPassword').value;
+        const confirmPassword = document.getElementById('registerConfirmPassword').value;
+
+
+        if (password !== confirmPassword) {
+            alert('password not matched');
+            return;
+        }
+
+        try {
+            const response = await fetch('/api/register', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({
+                    username: email,
+                    email: email,
+                    password: password
+                })
+            });
+
+            const data = await response.json();
+
+            if (data.success) {
+                alert('registration successful! Please login.');
+                switchTab('login');
+            } else {
+                alert('Registration failed: ' + data.message);
+            }
+        } catch (error) {
+            alert('Network error. Please try again.');
+        }
+    });
+
+
+ document.getElementById('forgotForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const email = document.getElementById('forgotEmail').value;
+
+    try {
+        const response = await fetch('/api/forgot-password', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({email: email})
+        });
+
+        const data = await response.json();
+
+       if (data.success) {
+    alert('6-digit reset code sent! (demo: console check)');
+
+    // hide forgot form
+    document.getElementById('forgotForm').style.display = 'none';
+
+    // show verify form
+    document.getElementById('verifyForm').style.display = 'block';
+
+    // auto fill email
+    document.getElementById('verifyEmail').value = email;
+}
+ else {
+            alert('Error: ' + data.message);
+        }
+    } catch (error) {
+        alert('Network error. Please try again.');
+    }
+});
+
+window.addEventListener('DOMContentLoaded', function() {
+    checkLoginStatus();
+});
+
+
+document.getElementById('verifyForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const email = document.getElementById('verifyEmail').value;
+    const code = document.getElementById('resetCode').value;
+    const password = document.getElementById('newPassword').value;
+
+    // Step 1: verify code
+    const verifyRes = await fetch('/api/verify-code', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({ email, code })
+    });
+
+    const verifyData = await verifyRes.json();
+    if (!verifyData.success) {
+        alert('Invalid or expired code');
+        return;
+    }
+
+    // Step 2: reset password
+    const resetRes = await fetch('/api/reset-password', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({ password })
+    });
+
+    const resetData = await resetRes.json();
+    if (resetData.success) {
+        alert('Password reset successful!');
+        location.reload(); // back to login
+    }
+});
+
+
+    function checkLoginStatus() {
+        fetch('/api/check-auth')
+            .then(response => response.json())
+            .then(data => {
+                const authButtons = document.querySelector('.auth-buttons');
+                if (data.is_logged_in) {
+
+                    authButtons.innerHTML = `
+                        <span style="color: #ff6b6b; margin-right: 15px;">
+                            <i class="fas fa-user"></i> ${data.user.username}
+                        </span>
+                        <button class="btn btn-outline" onclick="window.location.href='/dashboard'">
+                            Dashboard
+                        </button>
+                        <button class="btn btn-primary" onclick="logout()">
+                            Logout
+                        </button>
+                    `;
+                }
+            })
+            .catch(error => {
+                console.log('Error checking login status:', error);
+            });
+    }
+
+
+
+    // Mobile menu toggle
+    mobileMenuBtn.addEventListener('click', () => {
+        navLinks.style.display = navLinks.style.display === 'flex' ? 'none' : 'flex';
+    });
+
+    // Close mobile menu on window resize
+    window.addEventListener('resize', () => {
+        if (window.innerWidth > 768) {
+            navLinks.style.display = '';
+        }
+    });
+
+    // Add some interactive effects to recipe cards
+    document.querySelectorAll('.recipe-card').forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.querySelector('.recipe-content h3').style.color = 'var(--primary)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.querySelector('.recipe-content h3').style.color = '';
+        });
+    });
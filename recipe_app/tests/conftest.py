@@ -0,0 +1,79 @@
+"""
+Fixtures for the test suite: one app per session on a throwaway SQLite
+file, with the fake LLM client and cheap bcrypt hashes.
+
+Run from the app folder: `python -m pytest -q tests`.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    os.environ["LLM_CLIENT"] = "fake"
+    from app import create_app, prepare, init_worker, shutdown_worker
+
+    folder = tmp_path_factory.mktemp("recipe_app")
+    app = create_app({
+        "TESTING": True,
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": str(folder / "test.db"),
+        "LLM_CLIENT": "fake",
+        "PASSWORD_BCRYPT_ROUNDS": 4,
+        "ASSETS_BUILD_ON_STARTUP": False,
+        "SIMILAR_INDEX_DIR": str(folder / "similar"),
+        "TRENDING_DIR": str(folder / "trending"),
+        "RESPONSE_CACHE_BACKEND": "memory",
+    })
+    prepare(app)
+    init_worker(app)
+    yield app
+    shutdown_worker(app)
+
+
+_users = iter(range(1, 1000000))
+
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as a fresh user."""
+    client = app.test_client()
+    number = next(_users)
+    response = client.post("/api/register", json={
+        "username": f"tester{number}",
+        "email": f"tester{number}@example.com",
+        "password": "test-password",
+    })
+    assert response.get_json()["success"]
+    return client
+
+
+@pytest.fixture
+def create_recipe():
+    """create_recipe(client, title, **fields) -> the new recipe id."""
+    return _create_recipe
+
+
+def _create_recipe(client, title, **fields):
+    data = {
+        "title": title,
+        "description": f"{title} for tests",
+        "category": "dinner",
+        "difficulty": "easy",
+        "prep_time": 10,
+        "cook_time": 20,
+        "servings": 2,
+        "ingredients": ["1 cup rice", "salt"],
+        "instructions": ["Cook", "Serve"],
+        "tags": ["test"],
+    }
+    data.update(fields)
+    body = client.post("/api/recipes", json=data).get_json()
+    assert body["success"], body
+    return body["recipe_id"]
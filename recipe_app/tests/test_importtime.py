@@ -0,0 +1,55 @@
+"""
+Cold-start guard: a fresh interpreter importing the app and running
+create_app() must stay under the budget and leave the heavy libraries
+(numpy for the similar index, Pillow / multiprocessing for media, bcrypt,
+openai, ...) unloaded. bench/importtime.py reports the same numbers in detail.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "bench"))
+
+from importtime import CHILD, LAZY_MODULES, package_times  # noqa: E402
+
+BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 400))
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def cold_start(tmp_path_factory):
+    env = dict(os.environ)
+    env.update({
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": str(tmp_path_factory.mktemp("importtime") / "importtime.db"),
+        # The real client, to show it still is not imported
+        "LLM_CLIENT": "openai",
+    })
+    samples = []
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        assert proc.returncode == 0, proc.stderr[-2000:]
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample["packages"] = package_times(proc.stderr)
+        samples.append(sample)
+    return min(samples, key=lambda sample: sample["import_ms"] + sample["create_app_ms"])
+
+
+@pytest.mark.parametrize("lazy", LAZY_MODULES)
+def test_heavy_module_is_not_imported_at_startup(cold_start, lazy):
+    loaded = [name for name in cold_start["modules"] if name == lazy or name.startswith(lazy + ".")]
+    assert not loaded, f"{lazy} is imported at start-up; import it on first use"
+    assert lazy.split(".")[0] not in cold_start["packages"]
+
+
+def test_cold_start_within_budget(cold_start):
+    total = cold_start["import_ms"] + cold_start["create_app_ms"]
+    slowest = sorted(cold_start["packages"].items(), key=lambda item: -item[1])[:5]
+    assert total <= BUDGET_MS, f"cold start {total:.1f} ms > {BUDGET_MS:g} ms; slowest: {slowest}"
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from recipe_generator import (
+    CONNECT_TIMEOUT, FakeLLMClient, GenerationTimeout, IncompleteRecipe, IncrementalRecipeParser,
+    OpenAIChatClient, RecipeGenerator, normalize_query,
+)
+
+
+@pytest.fixture
+def fake():
+    return FakeLLMClient()
+
+
+@pytest.fixture
+def generator(fake):
+    app = Flask(__name__)
+    app.config.update(LLM_CLIENT="fake", LLM_TIMEOUT=5.0)
+    generator = RecipeGenerator()
+    generator.init_app(app, pool=None, client=fake)
+    return generator
+
+
+# ---------------- normalize_query ----------------
+def test_normalize_query_ignores_case_order_and_stopwords():
+    assert normalize_query("Chicken CURRY") == normalize_query("a curry with chicken, please")
+
+
+def test_normalize_query_falls_back_to_stopwords():
+    # A prompt made only of stopwords still gets a key of its own
+    assert normalize_query("how to make") == "how make to"
+    assert normalize_query("the") != normalize_query("a")
+
+
+def test_normalize_query_folds_accents():
+    assert normalize_query("Crème Brûlée") == normalize_query("creme brulee")
+
+
+def test_normalize_query_keeps_other_scripts_apart():
+    rice = normalize_query("ভাত রান্না")
+    tofu = normalize_query("麻婆豆腐")
+    assert rice and tofu and rice != tofu
+    # Vowel signs are part of the word, not accents
+    assert normalize_query("ভাত") != normalize_query("ভত")
+
+
+def test_normalize_query_empty_without_words():
+    assert normalize_query("?!? ...") == ""
+
+
+# ---------------- cache and coalescing ----------------
+def test_cache_hit_and_miss(generator, fake):
+    first = generator.generate("chicken curry")
+    second = generator.generate("a curry with chicken")
+    assert first == second
+    assert fake.calls == 1
+    stats = generator.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    generator.generate("beef stew")
+    assert fake.calls == 2
+
+
+def test_cached_recipe_is_a_copy(generator):
+    generator.generate("chicken curry")["title"] = "changed"
+    assert generator.generate("chicken curry")["title"] != "changed"
+
+
+def test_empty_key_is_never_cached(generator, fake):
+    generator.generate("?!?")
+    generator.generate("...")
+    assert fake.calls == 2
+    assert generator.stats()["entries"] == 0
+
+
+def test_concurrent_misses_share_one_call(generator):
+    slow = FakeLLMClient(latency=0.2)
+    generator.client = slow
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(generator.generate("chicken curry")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert slow.calls == 1
+    assert len(results) == 4 and all(result == results[0] for result in results)
+    assert generator.stats()["coalesced"] == 3
+
+
+def test_stream_then_replay_from_cache(generator, fake):
+    streamed = dict(generator.stream("chicken curry"))
+    assert fake.calls == 1
+    assert dict(generator.stream("curry chicken")) == streamed
+    assert generator.generate("chicken curry") == streamed
+    assert fake.calls == 1
+
+
+def test_truncated_stream_is_not_cached(generator):
+    class Truncated(FakeLLMClient):
+        def stream(self, prompt, timeout=None):
+            text = self._reply(prompt)
+            yield text[:text.index('"instructions"')]
+
+    generator.client = Truncated()
+    with pytest.raises(IncompleteRecipe):
+        list(generator.stream("chicken curry"))
+    assert generator.stats()["entries"] == 0
+
+
+# ---------------- streaming parser ----------------
+def test_parser_emits_fields_across_partial_chunks():
+    text = json.dumps({"title": "Soup", "servings": 45, "ingredients": ["a", "b"]})
+    parser = IncrementalRecipeParser()
+    emitted = []
+    for i in range(0, len(text), 3):
+        emitted.extend(parser.feed(text[i:i + 3]))
+    assert emitted == [("title", "Soup"), ("servings", 45), ("ingredients", ["a", "b"])]
+
+
+def test_parser_waits_for_the_end_of_a_number():
+    parser = IncrementalRecipeParser()
+    assert parser.feed('{"servings": 4') == []
+    assert parser.feed('5, ') == [("servings", 45)]
+
+
+def test_parser_skips_text_before_the_object():
+    parser = IncrementalRecipeParser()
+    assert parser.feed("Sure! Here it is: ") == []
+    assert parser.feed('{"title": "Stew"') == [("title", "Stew")]
+
+
+def test_stalled_stream_times_out(generator):
+    generator.timeout = 0.05
+    # One chunk every ~0.5s: each read outlasts the timeout
+    generator.client = FakeLLMClient(latency=0.5 * 40)
+    started = time.monotonic()
+    with pytest.raises(GenerationTimeout):
+        list(generator.stream("chicken curry"))
+    assert time.monotonic() - started < 1
+    assert generator.stats()["timeouts"] == 1
+
+
+def test_openai_client_sets_connect_and_read_timeouts(monkeypatch):
+    import openai
+
+    calls = []
+    monkeypatch.setattr(openai.ChatCompletion, "create", lambda **kwargs: calls.append(kwargs) or [])
+    client = OpenAIChatClient("test-key")
+    list(client.stream("prompt", timeout=20))
+    list(client.stream("prompt", timeout=3))
+    assert [call["request_timeout"] for call in calls] == [(CONNECT_TIMEOUT, 20), (3, 3)]
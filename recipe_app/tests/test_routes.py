@@ -0,0 +1,139 @@
+"""Route tests against the SQLite backend: pagination, counters, caches and SSE."""
+
+import json
+
+
+def recipe_page(client, **args):
+    body = client.get("/api/recipes", query_string=dict(mine="1", **args)).get_json()
+    assert body["success"], body
+    return body
+
+
+def get_recipe(client, recipe_id):
+    body = client.get(f"/api/recipes/{recipe_id}").get_json()
+    assert body["success"], body
+    return body["recipe"]
+
+
+# ---------------- keyset pagination ----------------
+def test_cursor_walks_every_recipe_once(client, create_recipe):
+    ids = [create_recipe(client, f"Paged {i}") for i in range(5)]
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        args = {"limit": 2}
+        if cursor:
+            args["cursor"] = cursor
+        page = recipe_page(client, **args)
+        seen.extend(recipe["id"] for recipe in page["recipes"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Same created_at second for all of them: the id breaks the tie
+    assert seen == sorted(ids, reverse=True)
+    assert pages == 3
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/recipes", query_string={"mine": "1", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+# ---------------- like / unlike counters ----------------
+def test_like_and_unlike_move_the_counter_once(app, client, create_recipe):
+    recipe_id = create_recipe(client, "Likeable")
+    other = app.test_client()
+    other.post("/api/register", json={
+        "username": "liker", "email": "liker@example.com", "password": "test-password",
+    })
+
+    for _ in range(2):
+        assert other.post(f"/api/recipes/{recipe_id}/like").get_json()["success"]
+    assert get_recipe(client, recipe_id)["likes_count"] == 1
+
+    for _ in range(2):
+        assert other.delete(f"/api/recipes/{recipe_id}/like").get_json()["success"]
+    assert get_recipe(client, recipe_id)["likes_count"] == 0
+
+
+# ---------------- response cache ----------------
+def test_recipe_list_is_cached_until_a_write(client, create_recipe):
+    create_recipe(client, "Cached one")
+    first = client.get("/api/recipes", query_string={"mine": "1"})
+    second = client.get("/api/recipes", query_string={"mine": "1"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+
+    recipe_id = create_recipe(client, "Cached two")
+    third = client.get("/api/recipes", query_string={"mine": "1"})
+    assert third.headers["X-Cache"] == "MISS"
+    assert recipe_id in [recipe["id"] for recipe in third.get_json()["recipes"]]
+
+
+def test_like_purges_the_cached_list(client, create_recipe):
+    recipe_id = create_recipe(client, "Liked in list")
+    recipe_page(client)
+    client.post(f"/api/recipes/{recipe_id}/like")
+    response = client.get("/api/recipes", query_string={"mine": "1"})
+    assert response.headers["X-Cache"] == "MISS"
+    liked = next(recipe for recipe in response.get_json()["recipes"] if recipe["id"] == recipe_id)
+    assert liked["likes_count"] == 1
+
+
+# ---------------- AI recipe stream ----------------
+def test_recipe_stream_sends_fields_then_done(client):
+    response = client.post("/api/gemini/recipe/stream", json={"prompt": "mushroom risotto"})
+    assert response.mimetype == "text/event-stream"
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+
+    assert [event for event, _ in events[:-1]] == ["field"] * (len(events) - 1)
+    done, recipe = events[-1]
+    assert done == "done" and recipe["success"]
+    assert {payload["field"]: payload["value"] for _, payload in events[:-1]}["title"] == recipe["title"]
+
+
+# ---------------- profile snapshot ----------------
+def test_session_keeps_no_profile_body(client):
+    with client.session_transaction() as session:
+        # The in-memory backend's versions are per worker: no marker at all
+        assert "profile" not in session
+        user_id = session["user_id"]
+    body = client.get("/api/check-auth").get_json()
+    assert body["is_logged_in"] and body["user"]["id"] == user_id
+
+
+def test_recipe_list_revalidates_from_the_cached_body(client, create_recipe):
+    create_recipe(client, "Tagged")
+    first = client.get("/api/recipes", query_string={"mine": "1"})
+    etag = first.headers["ETag"]
+    second = client.get("/api/recipes", query_string={"mine": "1"}, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+
+    create_recipe(client, "Tagged again")
+    third = client.get("/api/recipes", query_string={"mine": "1"}, headers={"If-None-Match": etag})
+    assert third.status_code == 200 and third.headers["ETag"] != etag
+
+
+# ---------------- bulk import ----------------
+def test_bulk_import_reports_fixed_messages(client):
+    good = {
+        "title": "Bulk", "description": "Imported", "category": "dinner", "difficulty": "easy",
+        "prep_time": 5, "cook_time": 10, "servings": 2, "ingredients": ["rice"],
+    }
+    records = [good, dict(good, servings={"nested": True}), dict(good, ingredients=[1, 2]),
+               dict(good, title=None), "not an object"]
+    body = client.post("/api/recipes/bulk", json=records).get_json()
+    assert body["inserted"] == 1
+    assert body["errors"] == [
+        {"line": 2, "message": "Invalid field value"},
+        {"line": 3, "message": "Invalid field value"},
+        {"line": 4, "message": "title is required"},
+        {"line": 5, "message": "Record must be an object"},
+    ]
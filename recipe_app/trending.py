@@ -0,0 +1,528 @@
+"""
+Trending recipes: time-decayed engagement scores kept sorted in memory.
+
+A recipe's score is the sum of its engagement (WEIGHTS per view, like,
+favorite and comment), each event counting half as much every
+TRENDING_HALF_LIFE seconds. Scores are stored as
+
+    sum(weight * 2 ** ((event time - base) / half_life))
+
+against a fixed base time, so time passing never has to touch them:
+every score shrinks by the same factor and the order stays put. The
+current value is that times 2 ** ((base - now) / half_life). The base
+moves forward (rescaling every score once) when it is REBASE_AFTER
+half-lives old, and recipes whose score decayed below MIN_SCORE are
+dropped, so memory follows the recipes that are actually active.
+
+For the whole catalog and for each category, (score, recipe id) pairs
+live in a sorted list: an event is one bisect removal and one insertion,
+and the top N is a slice. /api/trending only reads the recipes table to
+hydrate those N ids.
+
+Every event is logged in trending_events (migrations/006) inside the
+transaction of the write that caused it (record()), and applied in
+memory once that commits (apply()). Taking a like or favorite back logs
+a negative weight at the time of the original, so the two cancel out
+exactly as they decay. Views are buffered per worker and logged in one
+INSERT per sync. A background thread (started by init_worker()) tails
+the table by id every TRENDING_SYNC_INTERVAL seconds to pick up the
+other workers' events; ids skipped because their transaction had not
+committed yet are re-checked for GAP_TIMEOUT seconds.
+
+Every TRENDING_SNAPSHOT_INTERVAL seconds one worker (holding
+trending.lock) writes the scores and the last event id it applied to
+trending.json in TRENDING_DIR, then deletes the events the previous
+snapshot already covered. Workers start from the snapshot and tail from
+its id; one that fell behind the deleted range reloads it. Without any
+snapshot the scores are seeded from the likes, favorites and comments of
+the last RETENTION half-lives (views carry no timestamp, so they start
+from zero).
+"""
+import bisect
+import fcntl
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+WEIGHTS = {
+    "view": 0.2,
+    "like": 3.0,
+    "favorite": 5.0,
+    "comment": 4.0,
+}
+SEED_TABLES = (("likes", "like"), ("favorites", "favorite"), ("comments", "comment"))
+RETENTION = 8                  # half-lives of history used to seed the scores
+REBASE_AFTER = 64              # half-lives before scores are rescaled to a new base
+MIN_SCORE = 0.01               # below this (current value) a recipe leaves the board
+GAP_TIMEOUT = 60.0             # seconds to wait for an id skipped by an open transaction
+MAX_GAP = 1000                 # larger id jumps are not tracked (rolled-back bulk inserts)
+SYNC_BATCH = 5000
+VIEW_CHUNK = 500
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+EVENT_COLUMNS = "e.id, e.recipe_id, r.id, r.category, e.weight, e.created_at"
+
+
+def category_key(category):
+    return (category or "").strip().lower()
+
+
+def _timestamp(value):
+    # DATETIME columns come back as datetimes, NOW() on SQLite as a string
+    if isinstance(value, str):
+        value = datetime.strptime(value[:19], DATETIME_FORMAT)
+    return value.timestamp()
+
+
+def _event(row):
+    """(event id, recipe id, category or None when the recipe is gone, weight, time)"""
+    category = None if row[2] is None else category_key(row[3])
+    return (row[0], row[1], category, float(row[4]), _timestamp(row[5]))
+
+
+class Trending(object):
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()
+        self.directory = None
+        self.half_life = 24 * 3600.0
+        self.sync_interval = 10.0
+        self.snapshot_interval = 300.0
+        self._base = time.time()
+        self._scores = {}           # recipe id -> (category, raw score)
+        self._all = []              # sorted (raw score, recipe id)
+        self._by_category = {}      # category -> sorted (raw score, recipe id)
+        self._last_id = 0           # highest event id read from trending_events
+        self._gaps = {}             # skipped event id -> monotonic time first missed
+        self._applied = set()       # ids applied locally that the tail has not passed yet
+        self._views = {}
+        self._snapshot_mtime = None
+        self._compacted = time.monotonic()
+        self._thread = None
+        self._pid = None
+        self.ready = False
+
+    def init_app(self, app, pool):
+        app.config.setdefault("TRENDING_DIR", os.path.join(app.instance_path, "trending"))
+        app.config.setdefault("TRENDING_HALF_LIFE", 24 * 3600)
+        app.config.setdefault("TRENDING_SYNC_INTERVAL", 10.0)
+        app.config.setdefault("TRENDING_SNAPSHOT_INTERVAL", 300.0)
+        directory = app.config["TRENDING_DIR"]
+        if not os.path.isabs(directory):
+            directory = os.path.join(app.root_path, directory)
+        self.directory = directory
+        self.half_life = float(app.config["TRENDING_HALF_LIFE"])
+        self.sync_interval = float(app.config["TRENDING_SYNC_INTERVAL"])
+        self.snapshot_interval = float(app.config["TRENDING_SNAPSHOT_INTERVAL"])
+        self._pool = pool
+
+    def __len__(self):
+        return len(self._scores)
+
+    # ---------------- scores ----------------
+    def _scale(self, now):
+        """Raw score -> current value."""
+        return 2.0 ** ((self._base - now) / self.half_life)
+
+    def _rank(self, recipe_id, category, raw):
+        bisect.insort(self._all, (raw, recipe_id))
+        bisect.insort(self._by_category.setdefault(category, []), (raw, recipe_id))
+
+    def _unrank(self, recipe_id, category, raw):
+        ranked = self._by_category[category]
+        for entries in (self._all, ranked):
+            del entries[bisect.bisect_left(entries, (raw, recipe_id))]
+        if not ranked:
+            del self._by_category[category]
+
+    def _apply(self, recipe_id, category, weight, timestamp, floor):
+        """Add one event; the caller holds the lock. floor is MIN_SCORE as a raw score."""
+        old = self._scores.pop(recipe_id, None)
+        raw = 0.0
+        if old is not None:
+            self._unrank(recipe_id, *old)
+            raw = old[1]
+        if category is None:
+            return
+        raw += weight * 2.0 ** ((timestamp - self._base) / self.half_life)
+        if raw < floor:
+            return
+        self._scores[recipe_id] = (category, raw)
+        self._rank(recipe_id, category, raw)
+
+    def _set_scores(self, scores, base):
+        """Replace every score at once; the caller holds the lock."""
+        self._base = base
+        self._scores = scores
+        self._all = sorted((raw, recipe_id) for recipe_id, (_, raw) in scores.items())
+        by_category = {}
+        for raw, recipe_id in self._all:
+            by_category.setdefault(scores[recipe_id][0], []).append((raw, recipe_id))
+        self._by_category = by_category
+
+    def top(self, category=None, limit=10):
+        """[(recipe id, current score)], best first."""
+        now = time.time()
+        with self._lock:
+            if category is None:
+                entries = self._all[-limit:]
+            else:
+                entries = self._by_category.get(category_key(category), [])[-limit:]
+            scale = self._scale(now)
+        return [(recipe_id, raw * scale) for raw, recipe_id in reversed(entries)]
+
+    def discard(self, recipe_id):
+        """Drop a recipe found deleted while hydrating."""
+        with self._lock:
+            old = self._scores.pop(recipe_id, None)
+            if old is not None:
+                self._unrank(recipe_id, *old)
+
+    def compact(self):
+        """Drop recipes that decayed off the board; move the base forward when it is old."""
+        now = time.time()
+        with self._lock:
+            scale = self._scale(now)
+            scores = {recipe_id: entry for recipe_id, entry in self._scores.items()
+                      if entry[1] * scale >= MIN_SCORE}
+            if now - self._base > REBASE_AFTER * self.half_life:
+                scores = {recipe_id: (category, raw * scale)
+                          for recipe_id, (category, raw) in scores.items()}
+                self._set_scores(scores, now)
+            elif len(scores) < len(self._scores):
+                self._set_scores(scores, self._base)
+        self._compacted = time.monotonic()
+
+    # ---------------- write paths ----------------
+    def _category(self, cursor, recipe_id):
+        entry = self._scores.get(recipe_id)
+        if entry is not None:
+            return entry[0]
+        cursor.execute("SELECT category FROM recipes WHERE id = %s", (recipe_id,))
+        row = cursor.fetchone()
+        return None if row is None else category_key(row[0])
+
+    def _log(self, cursor, recipe_id, weight, created_at=None):
+        if created_at is None:
+            cursor.execute("""
+                INSERT INTO trending_events (recipe_id, weight, created_at)
+                VALUES (%s, %s, NOW())
+            """, (recipe_id, weight))
+        else:
+            cursor.execute("""
+                INSERT INTO trending_events (recipe_id, weight, created_at)
+                VALUES (%s, %s, %s)
+            """, (recipe_id, weight, created_at))
+        return cursor.lastrowid
+
+    def record(self, cursor, recipe_id, kind, undo_of=None):
+        """
+        Log a like / favorite / comment in the caller's transaction and
+        return the event for apply() once it commits. undo_of is the time
+        of the like or favorite being taken back.
+        """
+        weight = WEIGHTS[kind]
+        if undo_of is None:
+            event_id = self._log(cursor, recipe_id, weight)
+            timestamp = time.time()
+        else:
+            weight = -weight
+            event_id = self._log(cursor, recipe_id, weight, undo_of)
+            timestamp = _timestamp(undo_of)
+        return (event_id, recipe_id, self._category(cursor, recipe_id), weight, timestamp)
+
+    def recategorized(self, cursor, recipe_id, category):
+        """An edit moved the recipe; the empty event tells the other workers."""
+        event_id = self._log(cursor, recipe_id, 0.0)
+        return (event_id, recipe_id, category_key(category), 0.0, time.time())
+
+    def deleted(self, cursor, recipe_id):
+        event_id = self._log(cursor, recipe_id, 0.0)
+        return (event_id, recipe_id, None, 0.0, time.time())
+
+    def apply(self, event):
+        """Apply an event from record() after its transaction committed."""
+        event_id, recipe_id, category, weight, timestamp = event
+        with self._lock:
+            if not self.ready:
+                return      # the first sync reads it from the table
+            self._applied.add(event_id)
+            self._apply(recipe_id, category, weight, timestamp, MIN_SCORE / self._scale(time.time()))
+
+    def record_view(self, recipe_id):
+        """Buffered; logged with the next sync, and counted once the tail reads it back."""
+        with self._lock:
+            self._views[recipe_id] = self._views.get(recipe_id, 0) + 1
+
+    def flush_views(self):
+        with self._lock:
+            batch, self._views = self._views, {}
+        if not batch:
+            return 0
+        conn = None
+        try:
+            conn = self._pool.acquire()
+            cursor = conn.cursor()
+            items = list(batch.items())
+            for start in range(0, len(items), VIEW_CHUNK):
+                chunk = items[start:start + VIEW_CHUNK]
+                cursor.execute(f"""
+                    INSERT INTO trending_events (recipe_id, weight, created_at)
+                    VALUES {", ".join(["(%s, %s, NOW())"] * len(chunk))}
+                """, tuple(value for recipe_id, count in chunk
+                           for value in (recipe_id, count * WEIGHTS["view"])))
+            conn.commit()
+            cursor.close()
+            return sum(batch.values())
+        except Exception as e:
+            print(f"Trending view flush error: {e}")
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            # Put the views back so the next sync retries them
+            with self._lock:
+                for recipe_id, count in batch.items():
+                    self._views[recipe_id] = self._views.get(recipe_id, 0) + count
+            return 0
+        finally:
+            if conn is not None:
+                self._pool.release(conn)
+
+    # ---------------- tailing trending_events ----------------
+    def sync(self):
+        """Apply the events every worker logged since the last sync."""
+        self.flush_views()
+        start = self._last_id
+        gap_ids = list(self._gaps)
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            late = []
+            if gap_ids:
+                cursor.execute(f"""
+                    SELECT {EVENT_COLUMNS}
+                    FROM trending_events e LEFT JOIN recipes r ON r.id = e.recipe_id
+                    WHERE e.id IN ({", ".join(["%s"] * len(gap_ids))})
+                """, tuple(gap_ids))
+                late = cursor.fetchall()
+            rows = []
+            last_id = start
+            while True:
+                cursor.execute(f"""
+                    SELECT {EVENT_COLUMNS}
+                    FROM trending_events e LEFT JOIN recipes r ON r.id = e.recipe_id
+                    WHERE e.id > %s ORDER BY e.id LIMIT %s
+                """, (last_id, SYNC_BATCH))
+                batch = cursor.fetchall()
+                rows.extend(batch)
+                if len(batch) < SYNC_BATCH:
+                    break
+                last_id = batch[-1][0]
+            conn.commit()
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+        now = time.monotonic()
+        with self._lock:
+            if self._last_id != start:
+                return      # a snapshot was loaded meanwhile
+            floor = MIN_SCORE / self._scale(time.time())
+            for row in late:
+                self._gaps.pop(row[0], None)
+            expected = start + 1
+            for row in rows:
+                if 0 < row[0] - expected <= MAX_GAP:
+                    for missing in range(expected, row[0]):
+                        self._gaps[missing] = now
+                expected = row[0] + 1
+            for row in late + rows:
+                if row[0] in self._applied:
+                    self._applied.discard(row[0])
+                    continue
+                self._apply(*_event(row)[1:], floor)
+            if rows:
+                self._last_id = rows[-1][0]
+            self._gaps = {event_id: missed for event_id, missed in self._gaps.items()
+                          if now - missed < GAP_TIMEOUT}
+            # Ids the tail has passed and no longer waits for cannot come back
+            self._applied = {event_id for event_id in self._applied
+                             if event_id > self._last_id or event_id in self._gaps}
+
+        if self._behind(start):
+            # Events we had not read yet were deleted under us
+            self.load(force=True)
+
+    # ---------------- snapshots ----------------
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_snapshot(self):
+        try:
+            mtime = os.stat(self._path("trending.json")).st_mtime
+            with open(self._path("trending.json")) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if data.get("half_life") != self.half_life:
+            return None, None       # written with another half-life; reseed
+        return data, mtime
+
+    def _behind(self, last_id):
+        """True when a newer snapshot deleted events past last_id."""
+        try:
+            mtime = os.stat(self._path("trending.json")).st_mtime
+        except OSError:
+            return False
+        if mtime == self._snapshot_mtime:
+            return False
+        data, mtime = self._read_snapshot()
+        if data is None:
+            return False
+        self._snapshot_mtime = mtime
+        return data["pruned_through"] > last_id
+
+    def load(self, force=False):
+        """Start from the snapshot in TRENDING_DIR; False when there is none yet."""
+        if self.ready and not force:
+            return True
+        data, mtime = self._read_snapshot()
+        if data is None:
+            return False
+        scores = {int(recipe_id): (category, raw) for recipe_id, category, raw in data["scores"]}
+        now = time.monotonic()
+        with self._lock:
+            self._set_scores(scores, data["base"])
+            self._last_id = data["last_id"]
+            self._gaps = {event_id: now for event_id in data["gaps"]}
+            self._applied = set(data["applied"])
+            self._snapshot_mtime = mtime
+            self.ready = True
+        return True
+
+    def rebuild(self):
+        """Seed the scores from recent likes, favorites and comments."""
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            # Events logged from here on are read by the tail
+            cursor.execute("SELECT MAX(id) FROM trending_events")
+            last_id = cursor.fetchone()[0] or 0
+            events = []
+            for table, kind in SEED_TABLES:
+                cursor.execute(f"""
+                    SELECT t.recipe_id, r.category, t.created_at
+                    FROM {table} t JOIN recipes r ON r.id = t.recipe_id
+                    WHERE t.created_at >= NOW() - INTERVAL %s SECOND
+                """, (int(self.half_life * RETENTION),))
+                events.extend((row[0], category_key(row[1]), WEIGHTS[kind], _timestamp(row[2]))
+                              for row in cursor.fetchall())
+            conn.commit()
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+        base = time.time()
+        scores = {}
+        for recipe_id, category, weight, timestamp in events:
+            raw = scores.get(recipe_id, (None, 0.0))[1]
+            scores[recipe_id] = (category, raw + weight * 2.0 ** ((timestamp - base) / self.half_life))
+        scores = {recipe_id: entry for recipe_id, entry in scores.items() if entry[1] >= MIN_SCORE}
+        with self._lock:
+            self._set_scores(scores, base)
+            self._last_id = last_id
+            self._gaps = {}
+            self._applied = set()
+            self.ready = True
+
+    def snapshot(self, force=False):
+        """
+        Write the scores to trending.json and delete the events the previous
+        snapshot covered. One process at a time; returns False when another
+        one holds the lock or a fresh snapshot already exists.
+        """
+        if not self.ready:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("trending.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                previous, mtime = self._read_snapshot()
+                if not force and mtime is not None and time.time() - mtime < self.snapshot_interval:
+                    return False
+                pruned_through = previous["last_id"] if previous else 0
+                with self._lock:
+                    data = {
+                        "half_life": self.half_life,
+                        "base": self._base,
+                        "saved_at": time.time(),
+                        "last_id": self._last_id,
+                        "pruned_through": pruned_through,
+                        "gaps": sorted(self._gaps),
+                        "applied": sorted(self._applied),
+                        "scores": [[recipe_id, category, raw]
+                                   for recipe_id, (category, raw) in self._scores.items()],
+                    }
+                tmp = self._path("trending.json.tmp")
+                with open(tmp, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self._path("trending.json"))
+                self._snapshot_mtime = os.stat(self._path("trending.json")).st_mtime
+                if pruned_through:
+                    self._prune(pruned_through)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return True
+
+    def _prune(self, through):
+        conn = self._pool.acquire()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM trending_events WHERE id <= %s", (through,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            self._pool.release(conn)
+
+    # ---------------- background sync ----------------
+    def ensure_started(self):
+        # Background threads do not survive fork(), so track the owning pid
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="trending", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Trending sync error: {e}")
+            time.sleep(self.sync_interval)
+
+    def refresh(self):
+        """Load (or seed) the scores, apply recent events, compact and snapshot."""
+        if not self.load():
+            self.rebuild()
+        self.sync()
+        if time.monotonic() - self._compacted > self.snapshot_interval:
+            self.compact()
+            self.snapshot()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self.flush_views()
@@ -0,0 +1,57 @@
+"""
+Per-user aggregates shared by /api/me and /api/dashboard/stats.
+
+All three numbers come from one grouped query and are memoized per user.
+A memo entry is tied to the response cache's "user:<id>" tag version, so
+every write that already purges that tag (recipe CRUD, likes on the
+user's recipes) invalidates the stats as well, across workers when the
+cache backend is shared. STATS_TTL bounds how stale buffered view counts
+can look.
+"""
+import threading
+import time
+
+MAX_MEMO_ENTRIES = 10000
+
+STATS_QUERY = """
+    SELECT COUNT(r.id), IFNULL(SUM(r.views), 0), u.likes_received
+    FROM users u
+    LEFT JOIN recipes r ON r.user_id = u.id
+    WHERE u.id = %s
+    GROUP BY u.id, u.likes_received
+"""
+
+
+class UserStats(object):
+    def __init__(self):
+        self._cache = None
+        self._lock = threading.Lock()
+        self._memo = {}             # user_id -> (tag_version, expires_at, stats)
+        self.ttl = 30
+
+    def init_app(self, app, cache):
+        app.config.setdefault("STATS_TTL", 30)
+        self.ttl = int(app.config["STATS_TTL"])
+        self._cache = cache
+
+    def get(self, cursor, user_id):
+        version = self._cache.backend.tag_versions([f"user:{user_id}"])[0]
+        with self._lock:
+            memo = self._memo.get(user_id)
+        if memo is not None and memo[0] == version and memo[1] > time.monotonic():
+            return dict(memo[2])
+
+        cursor.execute(STATS_QUERY, (user_id,))
+        row = cursor.fetchone() or (0, 0, 0)
+        stats = {
+            "recipe_count": row[0] or 0,
+            "like_count": row[2] or 0,
+            "view_count": int(row[1] or 0),
+        }
+        now = time.monotonic()
+        with self._lock:
+            if len(self._memo) >= MAX_MEMO_ENTRIES:
+                self._memo = {uid: memo for uid, memo in self._memo.items() if memo[1] > now}
+            self._memo[user_id] = (version, now + self.ttl, stats)
+        return dict(stats)
+
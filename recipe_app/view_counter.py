@@ -0,0 +1,141 @@
+"""
+Write-behind view counter for recipe detail reads.
+
+Views are coalesced per recipe_id in process memory and written with one
+batched UPDATE ... CASE statement, either every VIEW_FLUSH_INTERVAL seconds
+or as soon as VIEW_FLUSH_THRESHOLD views are pending, and once more at
+interpreter shutdown.
+
+Loss bound: a failed flush puts its counts back in the buffer, so while
+the database is reachable views are only lost when the worker dies without
+running its exit hooks (SIGKILL, OOM, power loss), and then at most
+VIEW_FLUSH_THRESHOLD views (plus whatever arrived while the final flush was
+in flight) per worker. During a database outage the buffer keeps growing,
+up to VIEW_MAX_PENDING views per worker; views past that are dropped and
+counted in stats()["dropped"], and a worker killed during the outage loses
+up to VIEW_MAX_PENDING. SUM(views) in the stats endpoints lags by at most
+one flush interval under normal operation.
+"""
+import atexit
+import os
+import threading
+
+# Ids per UPDATE statement, keeps the CASE expression a sane size
+FLUSH_CHUNK = 500
+
+
+class ViewCounter(object):
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_total = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.interval = 5.0
+        self.threshold = 500
+        self.max_pending = 100000
+        self._dropped = 0
+
+    def init_app(self, app, pool):
+        app.config.setdefault("VIEW_FLUSH_INTERVAL", 5.0)
+        app.config.setdefault("VIEW_FLUSH_THRESHOLD", 500)
+        app.config.setdefault("VIEW_MAX_PENDING", 100000)
+        self.interval = float(app.config["VIEW_FLUSH_INTERVAL"])
+        self.threshold = int(app.config["VIEW_FLUSH_THRESHOLD"])
+        self.max_pending = int(app.config["VIEW_MAX_PENDING"])
+        self._pool = pool
+        atexit.register(self.shutdown)
+
+    def _add(self, recipe_id, count):
+        """Buffer views up to max_pending; the caller holds the lock."""
+        room = self.max_pending - self._pending_total
+        if count > room:
+            self._dropped += count - max(room, 0)
+            count = room
+        if count > 0:
+            self._pending[recipe_id] = self._pending.get(recipe_id, 0) + count
+            self._pending_total += count
+
+    def record(self, recipe_id, count=1):
+        with self._lock:
+            self._add(recipe_id, count)
+            full = self._pending_total >= self.threshold
+        self._ensure_flusher()
+        if full:
+            self._wakeup.set()
+
+    def pending(self, recipe_id):
+        with self._lock:
+            return self._pending.get(recipe_id, 0)
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self._pending_total, "dropped": self._dropped}
+
+    def _ensure_flusher(self):
+        # The flusher thread does not survive fork(), so track the owning pid
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._pending_total = 0
+        if not batch:
+            return 0
+
+        conn = None
+        try:
+            conn = self._pool.acquire()
+            cursor = conn.cursor()
+            items = list(batch.items())
+            for start in range(0, len(items), FLUSH_CHUNK):
+                chunk = items[start:start + FLUSH_CHUNK]
+                cases = " ".join("WHEN %s THEN %s" for _ in chunk)
+                ids = ", ".join("%s" for _ in chunk)
+                params = [value for pair in chunk for value in pair]
+                params.extend(recipe_id for recipe_id, _ in chunk)
+                cursor.execute(
+                    f"UPDATE recipes SET views = views + CASE id {cases} ELSE 0 END "
+                    f"WHERE id IN ({ids})",
+                    tuple(params)
+                )
+            conn.commit()
+            cursor.close()
+            return sum(batch.values())
+        except Exception as e:
+            print(f"View counter flush error: {e}")
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            # Put the counts back so the next flush retries them (up to max_pending)
+            with self._lock:
+                for recipe_id, count in batch.items():
+                    self._add(recipe_id, count)
+            return 0
+        finally:
+            if conn is not None:
+                self._pool.release(conn)
+
+    def shutdown(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._pool is not None:
+            self.flush()
@@ -0,0 +1,98 @@
+"""
+Per-viewer "liked_by_me" / "favorited_by_me" flags for recipe lists.
+
+attach() answers a whole page with one UNION ALL over likes and favorites
+restricted to the page's ids, instead of one lookup per recipe. Answers
+are remembered per user (both yes and no), so paging back and forth or
+reopening a recipe skips the query entirely.
+
+The memo is process-local and tied to the response cache's "viewer:<id>"
+tag version, like user_stats: record() bumps the tag on every like or
+favorite write, so other workers drop their copy for that user and the
+writing worker starts over from the fact it just wrote.
+"""
+import threading
+from collections import OrderedDict
+
+MAX_USERS = 5000
+MAX_RECIPES_PER_USER = 2000
+
+KINDS = ("likes", "favorites")
+
+
+class ViewerState(object):
+    def __init__(self):
+        self._cache = None
+        self._lock = threading.Lock()
+        self._memo = OrderedDict()  # user_id -> (tag_version, {recipe_id: (liked, favorited)})
+
+    def init_app(self, app, cache):
+        self._cache = cache
+
+    def _version(self, user_id):
+        return self._cache.backend.tag_versions([f"viewer:{user_id}"])[0]
+
+    def _known(self, user_id, version):
+        with self._lock:
+            entry = self._memo.get(user_id)
+            if entry is None or entry[0] != version:
+                return {}
+            self._memo.move_to_end(user_id)
+            return dict(entry[1])
+
+    def _remember(self, user_id, version, states):
+        with self._lock:
+            entry = self._memo.get(user_id)
+            if entry is None or entry[0] != version:
+                entry = (version, OrderedDict())
+                self._memo[user_id] = entry
+            known = entry[1]
+            known.update(states)
+            while len(known) > MAX_RECIPES_PER_USER:
+                known.popitem(last=False)
+            self._memo.move_to_end(user_id)
+            while len(self._memo) > MAX_USERS:
+                self._memo.popitem(last=False)
+
+    def lookup(self, cursor, user_id, recipe_ids):
+        """{recipe_id: (liked, favorited)} for every id, one query at most."""
+        version = self._version(user_id)
+        states = self._known(user_id, version)
+        missing = list(dict.fromkeys(rid for rid in recipe_ids if rid not in states))
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            cursor.execute(f"""
+                SELECT recipe_id, 'likes' FROM likes
+                WHERE user_id = %s AND recipe_id IN ({placeholders})
+                UNION ALL
+                SELECT recipe_id, 'favorites' FROM favorites
+                WHERE user_id = %s AND recipe_id IN ({placeholders})
+            """, (user_id, *missing, user_id, *missing))
+            found = {rid: [False, False] for rid in missing}
+            for recipe_id, kind in cursor.fetchall():
+                found[recipe_id][KINDS.index(kind)] = True
+            fresh = {rid: tuple(flags) for rid, flags in found.items()}
+            self._remember(user_id, version, fresh)
+            states.update(fresh)
+        return {rid: states[rid] for rid in recipe_ids}
+
+    def attach(self, cursor, user_id, items):
+        """Set liked_by_me / favorited_by_me on serialized recipes (dicts with "id")."""
+        if not items:
+            return items
+        states = self.lookup(cursor, user_id, [item["id"] for item in items])
+        for item in items:
+            item["liked_by_me"], item["favorited_by_me"] = states[item["id"]]
+        return items
+
+    def record(self, user_id, kind, recipe_id, value):
+        """Called after a committed like/favorite write by `user_id`."""
+        version = self._version(user_id)
+        state = self._known(user_id, version).get(recipe_id)
+        self._cache.purge(f"viewer:{user_id}")
+        if state is None:
+            # Only the written flag is known; let the next lookup fetch both
+            return
+        flags = list(state)
+        flags[KINDS.index(kind)] = value
+        self._remember(user_id, self._version(user_id), {recipe_id: tuple(flags)})
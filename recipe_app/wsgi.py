@@ -0,0 +1,15 @@
+"""
+WSGI entry point for servers other than serve.py, e.g.
+
+    gunicorn --workers 4 --threads 8 wsgi:app
+
+Builds the app in each worker process; do not combine with a server-side
+preload, since init_worker() starts per-process threads. prepare() runs in
+every worker too, unless the deploy runs `flask --app app init-db` and
+`build-assets` itself and sets SQLITE_BOOTSTRAP=0 / ASSETS_BUILD_ON_STARTUP=0.
+"""
+from app import create_app, init_worker, prepare
+
+app = create_app()
+prepare(app)
+init_worker(app)